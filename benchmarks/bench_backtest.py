@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+
+"""Replay the playbook over synthetic history and compare threshold settings."""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks.synthetic import synthetic_history
+from k8s_balancer.core.backtest import backtest_grid
+
+
+GRID = (
+    {},
+    {'memory_overload_pct': 85},
+    {'idle_pct': 15},
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pods', type=int, default=10000)
+    parser.add_argument('--days', type=float, default=30)
+    parser.add_argument('--step', type=float, default=300)
+    parser.add_argument('--evaluate-every', default='1h')
+    parser.add_argument('--cooldown', default='0')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    history = synthetic_history(args.pods, days=args.days, step=args.step)
+    generate_seconds = time.perf_counter() - start
+    reports = backtest_grid(history, GRID, evaluate_every=args.evaluate_every, cooldown=float(args.cooldown) or 0)
+    print(json.dumps({
+        'generate_seconds': round(generate_seconds, 2),
+        'reports': [{key: value for key, value in report.items() if key != 'thresholds'} | {'overrides': overrides}
+                    for overrides, report in zip(GRID, reports)],
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
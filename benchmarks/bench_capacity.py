@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+
+"""Time the what-if capacity simulator for the playbook's planned updates on large namespaces."""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks.synthetic import synthetic_fixtures
+from k8s_balancer.core.capacity import simulate_capacity
+from k8s_balancer.core.remediation import plan_namespace
+
+
+def run(pods, node_cpu, node_memory):
+    fixtures = synthetic_fixtures(pods)
+    start = time.perf_counter()
+    updates = plan_namespace(fixtures, 'default')
+    plan_seconds = time.perf_counter() - start
+    # About ten average synthetic pods fit a 4-core/8Gi node, so the pool is nearly full.
+    nodes = [{'name': 'pool', 'cpu': node_cpu, 'memory': node_memory, 'count': max(1, pods // 10)}]
+    report = simulate_capacity(fixtures, updates=updates, nodes=nodes, namespace='default')
+    return {
+        'pods': pods,
+        'updates': len(updates),
+        'nodes': report['nodes'],
+        'plan_seconds': round(plan_seconds, 3),
+        'simulate_seconds': report['seconds'],
+        'nodes_used_before': report['nodes_used_before'],
+        'nodes_used_after': report['nodes_used_after'],
+        'nodes_needed': report['nodes_needed'],
+        'unschedulable_before': len(report['unschedulable_before']),
+        'unschedulable_after': len(report['unschedulable']),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pods', default='5000,50000', help='Comma separated namespace sizes')
+    parser.add_argument('--node-cpu', default='4')
+    parser.add_argument('--node-memory', default='8Gi')
+    args = parser.parse_args()
+    results = [run(int(count), args.node_cpu, args.node_memory) for count in args.pods.split(',')]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+
+"""Insert throughput and last-N lookup latency of the decision history as it grows."""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from k8s_balancer.core.decision_history import DecisionHistory
+
+
+ACTIONS = ('skip', 'increase_memory_limit', 'decrease_requests', 'escalate_inconsistent')
+
+
+def run(rows, pods, lookups=2000, batch=10000, seed=0):
+    rng = random.Random(seed)
+    directory = tempfile.mkdtemp(prefix='k8s_balancer_history_')
+    history = DecisionHistory(os.path.join(directory, 'history.db'))
+    start = time.perf_counter()
+    written = 0
+    timestamp = 1_700_000_000.0
+    while written < rows:
+        count = min(batch, rows - written)
+        decisions = [
+            ('pod-%06d' % rng.randrange(pods), {'classification': 'bench', 'recommended_action': rng.choice(ACTIONS)})
+            for _ in range(count)
+        ]
+        history.record_many(decisions, timestamp=timestamp)
+        timestamp += 300
+        written += count
+    insert_seconds = time.perf_counter() - start
+
+    latencies = []
+    for _ in range(lookups):
+        pod = 'pod-%06d' % rng.randrange(pods)
+        start = time.perf_counter()
+        history.last(pod, limit=10)
+        history.last_applied(pod)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    history.close()
+    shutil.rmtree(directory, ignore_errors=True)
+    return {
+        'rows': rows,
+        'pods': pods,
+        'insert_rows_per_second': round(rows / insert_seconds),
+        'lookup_p50_ms': round(latencies[len(latencies) // 2] * 1000, 3),
+        'lookup_p99_ms': round(latencies[int(len(latencies) * 0.99)] * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', default='100000,1000000', help='Comma separated history sizes')
+    parser.add_argument('--pods', type=int, default=5000)
+    args = parser.parse_args()
+    print(json.dumps([run(int(rows), args.pods) for rows in args.rows.split(',')], indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+
+"""Load-time benchmark for JSON vs memory-mapped binary fixture files."""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks.synthetic import synthetic_fixtures
+from k8s_balancer.agent.agent_runner import MCPToolAgentRunner
+from k8s_balancer.mcp.server import _load_fixtures_from_file
+
+
+def _measure(path, probe):
+    start = time.perf_counter()
+    fixtures = _load_fixtures_from_file(path)
+    opened = time.perf_counter() - start
+    fixtures['metrics'].get(probe)
+    first_lookup = time.perf_counter() - start - opened
+    scan_start = time.perf_counter()
+    for key in list(fixtures['metrics'])[:10_000]:
+        fixtures['metrics'][key]
+    return {
+        'bytes': os.path.getsize(path),
+        'open_seconds': opened,
+        'first_lookup_seconds': first_lookup,
+        'lookups_10k_seconds': time.perf_counter() - scan_start,
+    }
+
+
+def run(pods):
+    fixtures = synthetic_fixtures(pods)
+    probe = next(iter(fixtures['metrics']))
+    results = {'pods': pods, 'metric_series': len(fixtures['metrics'])}
+    with tempfile.TemporaryDirectory() as tmp:
+        for fixture_format in ('json', 'binary'):
+            runner = MCPToolAgentRunner(None, client_config={'mcpServers': {'bench': {}}}, fixture_format=fixture_format)
+            path = os.path.join(tmp, 'fixtures.' + fixture_format)
+            start = time.perf_counter()
+            runner._write_fixture_file(fixtures, path)
+            write_seconds = time.perf_counter() - start
+            results[fixture_format] = dict(_measure(path, probe), write_seconds=write_seconds)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pods', type=int, default=100_000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.pods), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+
+"""Query latency of the metrics store per window as ingested history grows."""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from k8s_balancer.core.metrics_store import MetricsStore
+
+
+WINDOWS = ('1h', '6h', '24h', '7d')
+
+
+def run(days, step, seed=0):
+    rng = random.Random(seed)
+    store = MetricsStore()
+    samples = int(days * 86400 // step)
+    start = time.perf_counter()
+    for index in range(samples):
+        store.add('bench-pod', 'cpu', index * step, rng.uniform(0, 100))
+    ingest_seconds = time.perf_counter() - start
+    queries = {}
+    for window in WINDOWS:
+        start = time.perf_counter()
+        store.query('bench-pod', 'cpu', window)
+        queries[window] = time.perf_counter() - start
+    return {
+        'samples': samples,
+        'ingest_samples_per_second': round(samples / ingest_seconds),
+        'query_seconds': queries,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--days', type=float, default=7)
+    parser.add_argument('--steps', default='60,15,1', help='Comma separated sample intervals in seconds')
+    args = parser.parse_args()
+    results = [dict(run(args.days, float(step)), step_seconds=float(step)) for step in args.steps.split(',')]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+
+"""Ingest rate and peak memory for streaming a Prometheus text dump into the metrics store."""
+
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks.synthetic import write_prometheus_dump
+from k8s_balancer.core.metrics_store import MetricsStore
+from k8s_balancer.integrations.prometheus import ingest_file
+
+
+def _peak_rss_mb():
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def run(path):
+    store = MetricsStore()
+    report = ingest_file(path, store)
+    report.pop('pods')
+    report['peak_rss_mb'] = _peak_rss_mb()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('dump', nargs='?', help='Existing dump to ingest; a synthetic one is generated otherwise')
+    parser.add_argument('--pods', type=int, default=200)
+    parser.add_argument('--hours', type=float, default=24)
+    parser.add_argument('--step', type=int, default=60)
+    args = parser.parse_args()
+    if args.dump:
+        print(json.dumps(run(args.dump), indent=2))
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'dump.prom')
+        start = time.perf_counter()
+        write_prometheus_dump(path, args.pods, hours=args.hours, step=args.step)
+        generated = time.perf_counter() - start
+        print(json.dumps(dict(run(path), generate_seconds=round(generated, 3)), indent=2))
+
+
+if __name__ == '__main__':
+    main()
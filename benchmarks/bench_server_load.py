@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+
+"""Drive N concurrent clients against the MCP server tools; report throughput and tail latency.
+
+`--transport direct` calls the async tool implementations in-process (no extra
+dependencies); `--transport fastmcp` goes through FastMCP's in-memory client so
+protocol overhead is included. Each client issues a mix of reads and writes; at
+the end the recorded state is checked for lost or torn writes.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks.synthetic import synthetic_fixtures
+from k8s_balancer.mcp.server import BalancerTools
+
+
+# (tool, share of calls); the rest of each client's budget is split accordingly.
+MIX = (
+    ('k8s_query_metrics', 0.55),
+    ('k8s_describe_pod', 0.2),
+    ('k8s_list_pods', 0.05),
+    ('k8s_triage_namespace', 0.02),
+    ('k8s_update_resources', 0.13),
+    ('slack_post_message', 0.05),
+)
+WRITE_TOOLS = ('k8s_update_resources', 'slack_post_message')
+
+
+def _arguments(tool, rng, pods, client):
+    pod = rng.choice(pods)
+    if tool == 'k8s_query_metrics':
+        return {'pod': pod, 'metric': rng.choice(('cpu', 'memory', 'oom_kills')), 'window': '24h'}
+    if tool == 'k8s_describe_pod':
+        return {'pod': pod}
+    if tool in ('k8s_list_pods', 'k8s_triage_namespace'):
+        return {'namespace': 'default'}
+    if tool == 'k8s_update_resources':
+        return {'pod': pod, 'mem_limit': '%dMi' % rng.choice((256, 512, 1024))}
+    return {'channel': '#load', 'text': 'client %d' % client}
+
+
+def _direct_caller(tools):
+    methods = {
+        'k8s_query_metrics': tools.query_metrics,
+        'k8s_describe_pod': tools.describe,
+        'k8s_list_pods': tools.list_pods,
+        'k8s_triage_namespace': tools.triage,
+        'k8s_update_resources': tools.update_resources,
+        'slack_post_message': tools.post_message,
+    }
+
+    async def call(tool, arguments):
+        return await methods[tool](**arguments)
+    return call
+
+
+async def _client(index, call, calls, pods, latencies, seed):
+    rng = random.Random(seed + index)
+    names = [tool for tool, _ in MIX]
+    weights = [share for _, share in MIX]
+    writes = 0
+    for _ in range(calls):
+        tool = rng.choices(names, weights)[0]
+        arguments = _arguments(tool, rng, pods, index)
+        start = time.perf_counter()
+        await call(tool, arguments)
+        latencies.setdefault(tool, []).append(time.perf_counter() - start)
+        writes += tool in WRITE_TOOLS
+    return writes
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def _drive(clients, calls, pods, seed, transport, fixtures, state_file):
+    latencies = {}
+    if transport == 'fastmcp':
+        from fastmcp import Client
+
+        from k8s_balancer.mcp.server import create_server
+
+        os.environ['K8S_BALANCER_STATE_FILE'] = state_file
+        server = create_server(fixtures)
+        sessions = [Client(server) for _ in range(clients)]
+        for session in sessions:
+            await session.__aenter__()
+        try:
+            callers = [
+                (lambda session: (lambda tool, arguments: session.call_tool(tool, arguments)))(session)
+                for session in sessions
+            ]
+            start = time.perf_counter()
+            writes = await asyncio.gather(*(
+                _client(index, callers[index], calls, pods, latencies, seed) for index in range(clients)
+            ))
+            elapsed = time.perf_counter() - start
+        finally:
+            for session in sessions:
+                await session.__aexit__(None, None, None)
+    else:
+        tools = BalancerTools(fixtures, state_file=state_file)
+        call = _direct_caller(tools)
+        start = time.perf_counter()
+        writes = await asyncio.gather(*(_client(index, call, calls, pods, latencies, seed) for index in range(clients)))
+        elapsed = time.perf_counter() - start
+    return latencies, sum(writes), elapsed
+
+
+def run(clients=32, calls=200, pods=200, seed=0, transport='direct'):
+    fixtures = synthetic_fixtures(pods)
+    pod_names = fixtures['pods']['default']
+    with tempfile.TemporaryDirectory() as tmp:
+        state_file = os.path.join(tmp, 'state.json')
+        latencies, writes, elapsed = asyncio.run(
+            _drive(clients, calls, pod_names, seed, transport, fixtures, state_file)
+        )
+        with open(state_file) as handle:
+            state = json.load(handle)
+    recorded = len(state['updates']) + len(state['slack_messages'])
+    total = sum(len(values) for values in latencies.values())
+    return {
+        'transport': transport,
+        'clients': clients,
+        'calls': total,
+        'seconds': round(elapsed, 3),
+        'calls_per_second': round(total / elapsed, 1),
+        'writes_issued': writes,
+        'writes_recorded': recorded,
+        'tools': {
+            tool: {
+                'calls': len(values),
+                'p50_ms': round(statistics.median(values) * 1000, 3),
+                'p95_ms': round(_percentile(values, 0.95) * 1000, 3),
+                'p99_ms': round(_percentile(values, 0.99) * 1000, 3),
+            }
+            for tool, values in sorted(latencies.items())
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--calls', type=int, default=200, help='Calls per client')
+    parser.add_argument('--pods', type=int, default=200)
+    parser.add_argument('--transport', choices=('direct', 'fastmcp'), default='direct')
+    args = parser.parse_args()
+    result = run(args.clients, args.calls, args.pods, transport=args.transport)
+    print(json.dumps(result, indent=2))
+    if result['writes_recorded'] != result['writes_issued']:
+        sys.exit('Lost writes: issued %(writes_issued)d, recorded %(writes_recorded)d' % result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+
+"""Scaling benchmark for shared-memory sharded classification."""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks.synthetic import synthetic_snapshots
+from k8s_balancer.core.decision_engine import evaluate_pod
+from k8s_balancer.core.sharded_engine import build_columns, classify_columns, decisions_from_codes
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def run(pods, worker_counts):
+    snapshots = synthetic_snapshots(pods)
+    expected, serial_seconds = _timed(lambda: [evaluate_pod(snapshot) for snapshot in snapshots])
+    (names, columns), build_seconds = _timed(lambda: build_columns(snapshots))
+    results = {
+        'pods': pods,
+        'cpu_count': os.cpu_count(),
+        'serial_evaluate_pod_seconds': serial_seconds,
+        'build_columns_seconds': build_seconds,
+        'sharded': [],
+    }
+    for workers in worker_counts:
+        codes, classify_seconds = _timed(lambda: classify_columns(columns, workers=workers, min_pods_per_worker=1))
+        decisions, merge_seconds = _timed(lambda: decisions_from_codes(names, codes))
+        results['sharded'].append({
+            'workers': workers,
+            'classify_seconds': classify_seconds,
+            'merge_seconds': merge_seconds,
+            'speedup_vs_serial': serial_seconds / (classify_seconds + merge_seconds),
+            'matches_serial': decisions == expected,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pods', type=int, default=100_000)
+    parser.add_argument('--workers', type=int, nargs='*')
+    args = parser.parse_args()
+    cpu_count = os.cpu_count() or 1
+    worker_counts = args.workers or sorted({1, 2, 4, cpu_count})
+    print(json.dumps(run(args.pods, worker_counts), indent=2))
+
+
+if __name__ == '__main__':
+    main()
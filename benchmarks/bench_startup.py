@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+
+"""Startup benchmarks: package import time and time-to-first-tool-call."""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+
+HEAVY_MODULES = (
+    'mcp_use', 'langchain', 'langchain_core', 'langchain_openai', 'fastmcp', 'dotenv',
+    # Standard-library and numeric modules only specific code paths need.
+    'asyncio', 'multiprocessing', 'concurrent', 'sqlite3', 'numpy',
+)
+# The dry run takes its fixtures from the MCP server module, which needs these itself.
+SERVER_MODULES = ('asyncio', 'concurrent', 'sqlite3')
+
+IMPORT_BUDGET_SECONDS = float(os.environ.get('K8S_BALANCER_IMPORT_BUDGET', '0.3'))
+DRY_RUN_BUDGET_SECONDS = float(os.environ.get('K8S_BALANCER_DRY_RUN_BUDGET', '1.0'))
+
+IMPORT_SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = sorted(name for name in sys.modules if name.split('.')[0] in {heavy!r})
+print(json.dumps({{'elapsed': elapsed, 'heavy': heavy}}))
+"""
+
+DRY_RUN_SNIPPET = """
+import contextlib, io, json, sys
+sys.path.insert(0, 'scripts')
+import run_agent
+with contextlib.redirect_stdout(io.StringIO()):
+    run_agent.main(['--dry-run'])
+heavy = sorted(name for name in sys.modules if name.split('.')[0] in {heavy!r})
+print(json.dumps({{'heavy': heavy}}))
+"""
+
+FIRST_TOOL_CALL_SNIPPET = """
+import asyncio, json, time
+start = time.perf_counter()
+from k8s_balancer.mcp.server import create_server
+from fastmcp import Client
+
+async def first_call():
+    async with Client(create_server()) as client:
+        await client.call_tool('k8s_list_pods', {'namespace': 'default'})
+
+asyncio.run(first_call())
+print(json.dumps({'elapsed': time.perf_counter() - start}))
+"""
+
+
+def _run_snippet(snippet):
+    completed = subprocess.run(
+        [sys.executable, '-c', snippet],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def measure_import(module='k8s_balancer.runner', repeat=5):
+    """Import the module in fresh interpreters; return the median time and any heavy modules loaded."""
+    samples = [_run_snippet(IMPORT_SNIPPET.format(module=module, heavy=HEAVY_MODULES)) for _ in range(repeat)]
+    return {
+        'module': module,
+        'median_seconds': statistics.median(sample['elapsed'] for sample in samples),
+        'heavy_modules': samples[-1]['heavy'],
+    }
+
+
+def dry_run_modules():
+    """Heavy modules a `run_agent.py --dry-run` loads, from a fresh interpreter."""
+    heavy = tuple(name for name in HEAVY_MODULES if name not in SERVER_MODULES)
+    return _run_snippet(DRY_RUN_SNIPPET.format(heavy=heavy))['heavy']
+
+
+def measure_first_tool_call(repeat=3):
+    """Time from a cold interpreter to the first answered MCP tool call (in-memory transport)."""
+    samples = [_run_snippet(FIRST_TOOL_CALL_SNIPPET)['elapsed'] for _ in range(repeat)]
+    return {'median_seconds': statistics.median(samples)}
+
+
+def measure_dry_run(repeat=3):
+    """Wall-clock time for a full `run_agent.py --dry-run` invocation, interpreter start included."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, str(REPO_ROOT / 'scripts' / 'run_agent.py'), '--dry-run'],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            check=True,
+        )
+        samples.append(time.perf_counter() - start)
+    return {'median_seconds': statistics.median(samples)}
+
+
+def main():
+    results = {
+        'import': measure_import(),
+        'dry_run': measure_dry_run(),
+    }
+    try:
+        results['first_tool_call'] = measure_first_tool_call()
+    except subprocess.CalledProcessError as exc:
+        results['first_tool_call'] = {'error': exc.stderr.strip().splitlines()[-1] if exc.stderr else str(exc)}
+    results['budgets'] = {'import_seconds': IMPORT_BUDGET_SECONDS, 'dry_run_seconds': DRY_RUN_BUDGET_SECONDS}
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
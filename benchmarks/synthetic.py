@@ -0,0 +1,120 @@
+"""Synthetic cluster generators shared by the benchmark scripts."""
+
+import random
+
+
+MEMORY_LIMITS = ('256Mi', '512Mi', '1Gi', '2Gi', '4Gi')
+
+
+def synthetic_snapshots(count, seed=7):
+    """Return `count` engine-ready pod snapshots with a realistic mix of classifications."""
+    rng = random.Random(seed)
+    snapshots = []
+    for index in range(count):
+        cpu_avg = rng.uniform(0, 100)
+        mem_avg = rng.uniform(0, 100)
+        snapshots.append({
+            'name': 'pod-%06d' % index,
+            'metrics': {
+                'cpu': {'avg': cpu_avg, 'p95': min(100, cpu_avg + rng.uniform(0, 70))},
+                'memory': {'avg': mem_avg, 'p95': min(100, mem_avg + rng.uniform(0, 70))},
+                'oom_kills': {'avg': rng.choice((0, 0, 0, 0, 1, 4)), 'p95': 0},
+            },
+            'description': {
+                'cpu_request': '%dm' % rng.choice((100, 250, 500)),
+                'cpu_limit': '%dm' % rng.choice((500, 750, 1000)),
+                'mem_request': rng.choice(MEMORY_LIMITS[:3]),
+                'mem_limit': rng.choice(MEMORY_LIMITS),
+            },
+        })
+    return snapshots
+
+
+def synthetic_fixtures(count, seed=7, namespace='default', window='24h'):
+    """Server fixtures (tuple-keyed metrics) for a synthetic cluster of `count` pods."""
+    fixtures = {
+        'pods': {namespace: []},
+        'descriptions': {},
+        'metrics': {},
+        'updates': [],
+        'slack_messages': [],
+        'jira_issues': [],
+    }
+    for snapshot in synthetic_snapshots(count, seed=seed):
+        name = snapshot['name']
+        fixtures['pods'][namespace].append(name)
+        fixtures['descriptions'][name] = snapshot['description']
+        for metric, values in snapshot['metrics'].items():
+            fixtures['metrics'][(name, metric, window)] = values
+    return fixtures
+
+
+def write_prometheus_dump(path, pods, hours=24, step=60, seed=7, namespace='default', start=1_700_000_000):
+    """Write a cAdvisor/kube-state-metrics style text dump (ms timestamps), series by series.
+
+    Returns the number of sample lines written.
+    """
+    rng = random.Random(seed)
+    lines = 0
+    steps = int(hours * 3600 // step)
+    with open(path, 'w') as handle:
+        for index in range(pods):
+            pod = 'pod-%06d' % index
+            labels = 'namespace="%s",pod="%s",container="app"' % (namespace, pod)
+            limit_bytes = rng.choice((256, 512, 1024, 2048)) * 1024 * 1024
+            handle.write('kube_pod_container_resource_limits{%s,resource="memory",unit="byte"} %d\n' % (labels, limit_bytes))
+            handle.write('kube_pod_container_resource_limits{%s,resource="cpu",unit="core"} 0.5\n' % labels)
+            load = rng.uniform(0.05, 0.95)
+            cpu_seconds = 0.0
+            ooms = 0
+            for tick in range(steps):
+                timestamp = (start + tick * step) * 1000
+                usage = min(1.0, max(0.0, load + rng.uniform(-0.05, 0.05)))
+                cpu_seconds += usage * 0.5 * step
+                if usage > 0.9 and rng.random() < 0.01:
+                    ooms += 1
+                handle.write('container_memory_working_set_bytes{%s} %d %d\n' % (labels, usage * limit_bytes, timestamp))
+                handle.write('container_cpu_usage_seconds_total{%s} %.3f %d\n' % (labels, cpu_seconds, timestamp))
+                handle.write('container_oom_events_total{%s} %d %d\n' % (labels, ooms, timestamp))
+                lines += 3
+    return lines
+
+
+def synthetic_history(pods, days=30, step=300, seed=7):
+    """Backtest history: float32 `(pods, samples)` usage with daily cycles, drift and spikes.
+
+    Each pod gets a base load (fraction of its limits) drawn so the playbook sees a
+    mix of idle, healthy, leaking and spiky pods.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    samples = int(days * 86400 // step)
+    cpu_limit = rng.choice([500.0, 1000.0, 2000.0], size=pods)
+    mem_limit = rng.choice([256.0, 512.0, 1024.0, 2048.0], size=pods)
+    base = rng.uniform(0.05, 0.85, size=(pods, 1)).astype(np.float32)
+    # Slow memory growth for some pods (leaks), none for most.
+    drift = (rng.random((pods, 1)) < 0.15) * rng.uniform(0.0, 0.3, size=(pods, 1))
+    hours = (np.arange(samples, dtype=np.float32) * step / 3600.0)[None, :]
+    daily = (0.15 * np.sin(2 * np.pi * hours / 24.0)).astype(np.float32)
+    cpu = base + daily + rng.standard_normal((pods, samples), dtype=np.float32) * np.float32(0.05)
+    spiky = rng.random((pods, 1)) < 0.1
+    spikes = (rng.random((pods, samples), dtype=np.float32) < 0.08) & spiky
+    cpu[spikes] = 0.95
+    del spikes
+    memory = base + (drift * hours / hours.max()).astype(np.float32)
+    memory += rng.standard_normal((pods, samples), dtype=np.float32) * np.float32(0.02)
+    np.clip(cpu, 0, 1.2, out=cpu)
+    np.clip(memory, 0, 1.5, out=memory)
+    cpu *= cpu_limit[:, None].astype(np.float32)
+    memory *= mem_limit[:, None].astype(np.float32)
+    return {
+        'names': ['pod-%06d' % index for index in range(pods)],
+        'step': float(step),
+        'cpu': cpu,
+        'memory': memory,
+        'cpu_request': cpu_limit * 0.6,
+        'cpu_limit': cpu_limit,
+        'mem_request': mem_limit * 0.6,
+        'mem_limit': mem_limit,
+    }
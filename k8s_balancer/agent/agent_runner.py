@@ -1,91 +1,310 @@
-import asyncio
+import contextlib
 import json
 import os
 import re
 import sys
 import tempfile
-from dataclasses import dataclass
+import uuid
+from dataclasses import dataclass, field
 from pathlib import Path
 
-from mcp_use import MCPClient
-from mcp_use.agents.mcpagent import MCPAgent
-
-from k8s_balancer.core.prompt_loader import load_prompt_text
+from k8s_balancer.agent.context_pruning import DEFAULT_KEEP_TURNS, ContextPruner
+from k8s_balancer.core.fixture_format import write_binary_fixtures
+from k8s_balancer.core.pod_model import deserialize_metrics, serialize_metrics
+from k8s_balancer.core.prompt_loader import get_prompt
+from k8s_balancer.core.run_state import RunState, resources_path
+from k8s_balancer.core.slack_renderer import is_summary, parse_summary, post_messages
+from k8s_balancer.core.summary_builder import SummaryBuilder
+from k8s_balancer.core.triage_queue import acted_on_pods, deferred_entries
+from k8s_balancer.core.usage import BudgetExceeded, UsageTracker, budget_exhausted, install_usage_callback, usage_scope
+from k8s_balancer.integrations.cassette import Cassette
 
 
 REPO_ROOT = Path(__file__).resolve().parents[2]
 
 
-def _serialize_metrics(metrics):
-    serialized = []
-    for (pod, metric, window), payload in metrics.items():
-        serialized.append({
-            'pod': pod,
-            'metric': metric,
-            'window': window,
-            'values': payload,
-        })
-    return serialized
+def _env_seconds(name):
+    value = os.environ.get(name)
+    return float(value) if value else None
 
 
 @dataclass
 class AgentExecutionResult:
     summary: dict
     slack_message: str | None
-    state: dict
+    state: RunState
+    prompt_versions: dict = field(default_factory=dict)
+    deferred: list = field(default_factory=list)
+    usage: dict = field(default_factory=dict)
+    slack_follow_ups: list = field(default_factory=list)
+    timeouts: list = field(default_factory=list)
+    run_id: str | None = None
+    # `{'tool', 'arguments', 'result'}` per MCP call, as the server logged it.
+    tool_calls: list = field(default_factory=list)
 
 
 class MCPToolAgentRunner:
     """Runs the rebalancing workflow by delegating to an MCP-driven LLM agent."""
 
-    def __init__(self, llm, client_config=None, system_prompt=None, fixtures=None):
+    system_prompt_name = 'orchestrator_system_prompt.txt'
+    user_prompt_name = 'orchestrator_user_prompt.txt'
+
+    def __init__(
+        self,
+        llm,
+        client_config=None,
+        system_prompt=None,
+        fixtures=None,
+        cassette=None,
+        fixture_format=None,
+        max_steps=None,
+        time_budget=None,
+        priority_pods=None,
+        metrics_store=None,
+        usage=None,
+        budget_mode=None,
+        history_db=None,
+        tool_timeout=None,
+        turn_timeout=None,
+        run_id=None,
+        checkpoint_db=None,
+        resume=False,
+        context_turns=None,
+    ):
         self.llm = llm
         self.client_config = client_config or self._default_client_config()
-        self.system_prompt = system_prompt or load_prompt_text('orchestrator_system_prompt.txt')
+        self.custom_system_prompt = system_prompt
         self.fixtures = fixtures
+        self.cassette = cassette if cassette is not None else Cassette.from_env()
+        # 'binary' is memory-mapped by the server; 'json' stays available for interchange.
+        self.fixture_format = fixture_format or os.environ.get('K8S_BALANCER_FIXTURE_FORMAT', 'binary')
+        self.max_steps = max_steps or int(os.environ.get('K8S_BALANCER_MAX_STEPS', '25'))
+        if time_budget is None:
+            time_budget = _env_seconds('K8S_BALANCER_TIME_BUDGET')
+        self.time_budget = time_budget
+        # Per MCP tool call and per LLM turn deadlines (seconds); see `RunDeadlines`.
+        self.tool_timeout = tool_timeout if tool_timeout is not None else _env_seconds('K8S_BALANCER_TOOL_TIMEOUT')
+        self.turn_timeout = turn_timeout if turn_timeout is not None else _env_seconds('K8S_BALANCER_TURN_TIMEOUT')
+        # Pods deferred by the previous cycle; the triage queue puts them first.
+        self.priority_pods = list(priority_pods or [])
+        # Optional MetricsStore answering windows the fixtures do not precompute.
+        self.metrics_store = metrics_store
+        # Token/cost accounting; a fresh tracker (budgets from env) per run unless one is given.
+        self.usage = usage
+        # What to do once the budget is spent: 'defer' leaves the remaining pods for the
+        # next cycle, 'deterministic' finishes them with the rule-based playbook.
+        self.budget_mode = budget_mode or os.environ.get('K8S_BALANCER_BUDGET_MODE', 'defer')
+        # SQLite decision history shared across runs for cooldown/hysteresis.
+        self.history_db = history_db or os.environ.get('K8S_BALANCER_HISTORY_DB')
+        # Per-pod progress checkpoints; `resume` continues run `run_id` from them.
+        self.checkpoint_db = checkpoint_db or os.environ.get('K8S_BALANCER_CHECKPOINT_DB')
+        if resume and not (run_id and self.checkpoint_db):
+            raise ValueError('Resuming needs the run_id of the interrupted run and a checkpoint_db')
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.resume = resume
+        # LLM turns of raw tool output the agent sees each turn; 0 sends everything.
+        if context_turns is None:
+            context_turns = int(os.environ.get('K8S_BALANCER_CONTEXT_TURNS') or DEFAULT_KEEP_TURNS)
+        self.context_turns = context_turns
+
+    @property
+    def system_prompt(self):
+        return self.custom_system_prompt or get_prompt(self.system_prompt_name).text
+
+    def _prompts(self, namespace, slack_channel):
+        """`(system_prompt, user_prompt, versions)` for one run.
+
+        Read from the registry once, so the agent and the reported versions refer to the same prompts even if one is reloaded mid-run.
+        """
+        user = get_prompt(self.user_prompt_name)
+        versions = {self.user_prompt_name: user.version}
+        system_prompt = self.custom_system_prompt
+        if not system_prompt:
+            system = get_prompt(self.system_prompt_name)
+            system_prompt = system.text
+            versions[self.system_prompt_name] = system.version
+        return system_prompt, user.format(namespace=namespace, slack_channel=slack_channel), versions
 
     def execute(self, namespace, slack_channel):
+        tracker = self.usage or UsageTracker.from_env()
+        install_usage_callback(self.llm)
+        with tracker.activate():
+            result = self._execute(namespace, slack_channel)
+        result.usage = tracker.summary()
+        export_path = os.environ.get('K8S_BALANCER_USAGE_EXPORT')
+        if export_path:
+            tracker.export(export_path)
+        return result
+
+    def _execute(self, namespace, slack_channel):
+        system_prompt, user_prompt, versions = self._prompts(namespace, slack_channel)
+        _, state, tool_calls = self._execute_live(namespace, slack_channel, system_prompt, user_prompt)
+        result = self._result_from_state(namespace, state, versions)
+        result.tool_calls = tool_calls
+        return result
+
+    @contextlib.contextmanager
+    def server_environment(self):
+        """Yield `(client_config, state_path)` for a server seeded with this runner's fixtures.
+
+        Temporary state, fixture and tool-log files are removed on exit.
+        """
         state_fd, state_path = tempfile.mkstemp(prefix='k8s_balancer_state_', suffix='.json')
         os.close(state_fd)
 
         fixture_fd = None
         fixture_path = None
+        tool_log_path = None
+        metrics_path = None
 
         try:
             client_config = json.loads(json.dumps(self.client_config))
             self._inject_state_path(client_config, state_path)
             if self.fixtures is not None:
-                fixture_fd, fixture_path = tempfile.mkstemp(prefix='k8s_balancer_fixtures_', suffix='.json')
+                suffix = '.json' if self.fixture_format == 'json' else '.k8sfix'
+                fixture_fd, fixture_path = tempfile.mkstemp(prefix='k8s_balancer_fixtures_', suffix=suffix)
                 os.close(fixture_fd)
                 self._write_fixture_file(self.fixtures, fixture_path)
                 self._inject_fixture_path(client_config, fixture_path)
-            result_text = asyncio.run(self._run_agent(client_config, namespace, slack_channel))
-            state = self._read_state(state_path)
-            slack_text = None
-            if state.get('slack_messages'):
-                message = state['slack_messages'][-1]
-                slack_text = self._normalize_slack_message(message)
-                # Persist normalization for downstream asserts
-                state['slack_messages'][-1] = message
-            summary = self._extract_summary_from_slack(slack_text)
-            expected_keys = {'namespace', 'pods_scanned', 'pods_rebalanced', 'pods_escalated', 'pods_skipped'}
-            list_keys = ('pods_rebalanced', 'pods_escalated', 'pods_skipped')
-            if (
-                not summary
-                or not expected_keys.issubset(summary.keys())
-                or any(not isinstance(summary.get(key), list) for key in list_keys)
-            ):
-                summary = self._build_summary_from_state(namespace, state)
-                slack_text = self._render_slack_message(summary, state.get('jira_issues', []))
-                if state.get('slack_messages'):
-                    state['slack_messages'][-1]['text'] = slack_text
-                    state['slack_messages'][-1]['blocks'] = f"```json\n{json.dumps(summary, indent=2)}\n```"
-            return AgentExecutionResult(summary=summary, slack_message=slack_text, state=state)
+            if self.tool_timeout is not None:
+                # The server cancels its own handler at the same deadline.
+                self._inject_env(client_config, 'K8S_BALANCER_TOOL_TIMEOUT', str(self.tool_timeout))
+            if self.priority_pods:
+                self._inject_env(client_config, 'K8S_BALANCER_PRIORITY_PODS', ','.join(self.priority_pods))
+            if self.history_db:
+                self._inject_env(client_config, 'K8S_BALANCER_HISTORY_DB', self.history_db)
+                for name in ('K8S_BALANCER_COOLDOWN', 'K8S_BALANCER_HYSTERESIS_BAND'):
+                    if os.environ.get(name):
+                        self._inject_env(client_config, name, os.environ[name])
+            if self.checkpoint_db:
+                self._inject_env(client_config, 'K8S_BALANCER_CHECKPOINT_DB', self.checkpoint_db)
+                self._inject_env(client_config, 'K8S_BALANCER_RUN_ID', self.run_id)
+                if self.resume:
+                    self._inject_env(client_config, 'K8S_BALANCER_RESUME', '1')
+            if self.metrics_store is not None:
+                metrics_fd, metrics_path = tempfile.mkstemp(prefix='k8s_balancer_metrics_', suffix='.json')
+                os.close(metrics_fd)
+                self.metrics_store.save(metrics_path)
+                self._inject_env(client_config, 'K8S_BALANCER_METRICS_STORE', metrics_path)
+            if self.cassette is not None:
+                tool_fd, tool_log_path = tempfile.mkstemp(prefix='k8s_balancer_tools_', suffix='.jsonl')
+                os.close(tool_fd)
+                self._inject_env(client_config, 'K8S_BALANCER_TOOL_LOG', tool_log_path)
+            yield client_config, state_path
         finally:
-            if os.path.exists(state_path):
-                os.remove(state_path)
-            if fixture_path and os.path.exists(fixture_path):
-                os.remove(fixture_path)
+            for path in (state_path, resources_path(state_path), fixture_path, tool_log_path, metrics_path):
+                if path and os.path.exists(path):
+                    os.remove(path)
+
+    def _execute_live(self, namespace, slack_channel, system_prompt, user_prompt):
+        import asyncio
+
+        from k8s_balancer.agent.deadlines import RunDeadlines
+
+        deadlines = RunDeadlines(tool=self.tool_timeout, turn=self.turn_timeout, run=self.time_budget)
+        with self.server_environment() as (client_config, state_path):
+            result_text = asyncio.run(self._run_agent(client_config, namespace, slack_channel, system_prompt, user_prompt, deadlines))
+            env = next(iter(client_config['mcpServers'].values())).get('env', {})
+            tool_calls = self._read_tool_log(env.get('K8S_BALANCER_TOOL_LOG'))
+            state = self._read_state(state_path)
+            if deadlines.timeouts:
+                # Kept with the state so replayed runs report the same deferrals.
+                state['timeouts'] = deadlines.timeouts
+            return result_text, state, tool_calls
+
+    def _result_from_state(self, namespace, state, prompt_versions=None):
+        deferred = self._deferred_from_state(namespace, state)
+        slack_text = None
+        follow_ups = []
+        index, follow_ups = self._summary_message(state)
+        if index is not None:
+            message = state['slack_messages'][index]
+            slack_text = self._normalize_slack_message(message)
+            # Persist normalization for downstream asserts
+            state['slack_messages'][index] = message
+        summary = self._extract_summary_from_slack(slack_text)
+        if not is_summary(summary):
+            # Only runs cut short before the agent posted any summary get here.
+            summary, messages = self._rendered_summary(namespace, state, deferred)
+            slack_text, follow_ups = messages[0], messages[1:]
+            if index is not None:
+                state['slack_messages'][index]['text'] = slack_text
+                state['slack_messages'][index]['blocks'] = slack_text[slack_text.index('```'):slack_text.rindex('```') + 3]
+        elif deferred:
+            summary['pods_deferred'] = deferred
+        return AgentExecutionResult(
+            summary=summary,
+            slack_message=slack_text,
+            state=state,
+            prompt_versions=dict(prompt_versions or {}),
+            deferred=[entry['name'] for entry in deferred],
+            slack_follow_ups=follow_ups,
+            timeouts=list(state.get('timeouts') or []),
+            run_id=self.run_id,
+        )
+
+    def _summary_message(self, state):
+        """Index of the last top-level Slack message and the texts threaded under it."""
+        messages = state.get('slack_messages') or []
+        for index in range(len(messages) - 1, -1, -1):
+            if not messages[index].get('thread_ts'):
+                return index, [message.get('text', '') for message in messages[index + 1:]]
+        return None, []
+
+    def _rendered_summary(self, namespace, state, deferred):
+        """Summary built from the action log, rendered as `[head, *follow_ups]`."""
+        summary = self._build_summary_from_state(namespace, state)
+        if deferred:
+            summary['pods_deferred'] = deferred
+        return summary, SummaryBuilder().render(summary, state.get('jira_issues', []))
+
+    async def _post_rendered_summary(self, client, client_config, namespace, slack_channel):
+        """Post the rendered summary, threaded, when the agent's own summary is unusable."""
+        from k8s_balancer.mcp.tool_session import ToolSession
+
+        server_name, server_entry = next(iter(client_config['mcpServers'].items()))
+        state = RunState.from_files(server_entry['env']['K8S_BALANCER_STATE_FILE'])
+        index, _ = self._summary_message(state)
+        if index is None:
+            return None
+        message = dict(state['slack_messages'][index])
+        if is_summary(self._extract_summary_from_slack(self._normalize_slack_message(message))):
+            return None
+        _, messages = self._rendered_summary(namespace, state, self._deferred_from_state(namespace, state))
+        session = client.get_all_active_sessions().get(server_name) or await client.create_session(server_name)
+        return await post_messages(ToolSession.attach(session), slack_channel, messages)
+
+    def _deferred_from_state(self, namespace, state):
+        if self.fixtures is not None:
+            # Triage the input fixtures the runner already holds rather than
+            # loading the run's copy of every metric from the state backend.
+            fixtures = self.fixtures
+        else:
+            fixtures = {
+                'pods': state.get('pods', {}),
+                'descriptions': state.get('descriptions', {}),
+                'metrics': deserialize_metrics(state.get('metrics', [])),
+            }
+        deferred = deferred_entries(fixtures, state, namespace, priority_pods=self.priority_pods)
+        return self._with_timed_out(deferred, state, namespace)
+
+    def _with_timed_out(self, deferred, state, namespace):
+        """Mark deferred pods a deadline cut off and add those triage did not list."""
+        from k8s_balancer.agent.deadlines import timed_out_pods
+
+        timed_out = timed_out_pods(state.get('timeouts'))
+        if not timed_out:
+            return deferred
+        pods = state.get('pods', {}).get(namespace, []) or []
+        acted = acted_on_pods(state, pods)
+        listed = {entry['name'] for entry in deferred}
+        for entry in deferred:
+            if entry['name'] in timed_out:
+                entry['timed_out'] = True
+        for pod in timed_out:
+            if pod not in listed and pod not in acted:
+                deferred.append({'name': pod, 'classification': 'unknown', 'severity': 0, 'timed_out': True})
+        return deferred
 
     def _default_client_config(self):
         server_module = 'k8s_balancer.mcp.server'
@@ -101,45 +320,72 @@ class MCPToolAgentRunner:
     def _python_executable(self):
         return os.environ.get('PYTHON_EXECUTABLE', Path(sys.executable).as_posix())
 
-    def _inject_state_path(self, config, state_path):
+    def _inject_env(self, config, name, value):
         server_entry = next(iter(config['mcpServers'].values()))
         env = server_entry.setdefault('env', {})
-        env['K8S_BALANCER_STATE_FILE'] = state_path
+        env[name] = value
+
+    def _inject_state_path(self, config, state_path):
+        self._inject_env(config, 'K8S_BALANCER_STATE_FILE', state_path)
 
     def _inject_fixture_path(self, config, fixture_path):
-        server_entry = next(iter(config['mcpServers'].values()))
-        env = server_entry.setdefault('env', {})
-        env['K8S_BALANCER_FIXTURE_FILE'] = fixture_path
+        self._inject_env(config, 'K8S_BALANCER_FIXTURE_FILE', fixture_path)
 
-    def _write_fixture_file(self, fixtures, fixture_path):
-        payload = {
+    def _fixture_payload(self, fixtures):
+        return {
             'pods': fixtures.get('pods', {}),
             'descriptions': fixtures.get('descriptions', {}),
-            'metrics': _serialize_metrics(fixtures.get('metrics', {})),
+            'metrics': serialize_metrics(fixtures.get('metrics', {})),
             'updates': fixtures.get('updates', []),
             'slack_messages': fixtures.get('slack_messages', []),
             'jira_issues': fixtures.get('jira_issues', []),
+            'events': fixtures.get('events', []),
         }
+
+    def _write_fixture_file(self, fixtures, fixture_path):
+        if self.fixture_format != 'json':
+            write_binary_fixtures(fixtures, fixture_path)
+            return
         with open(fixture_path, 'w') as handle:
-            json.dump(payload, handle, indent=2)
+            json.dump(self._fixture_payload(fixtures), handle, indent=2)
+
+    async def _run_agent(self, client_config, namespace, slack_channel, system_prompt, user_prompt, deadlines=None):
+        # mcp_use pulls in langchain and the MCP SDK; keep it off the import path
+        from mcp_use import MCPClient
+        from mcp_use.agents.mcpagent import MCPAgent
 
-    async def _run_agent(self, client_config, namespace, slack_channel):
-        prompt_template = load_prompt_text('orchestrator_user_prompt.txt')
-        user_prompt = prompt_template.format(namespace=namespace, slack_channel=slack_channel)
+        from k8s_balancer.agent.deadlines import RunDeadlines
 
         client = MCPClient.from_dict(client_config)
         agent = MCPAgent(
             llm=self.llm,
             client=client,
-            max_steps=25,
+            max_steps=self.max_steps,
             auto_initialize=True,
-            system_prompt=self.system_prompt,
+            system_prompt=system_prompt,
             verbose=False,
         )
 
+        if deadlines is None:
+            deadlines = RunDeadlines(tool=self.tool_timeout, turn=self.turn_timeout, run=self.time_budget)
         await agent.initialize()
         try:
-            response = await agent.run(user_prompt)
+            if self.context_turns > 0:
+                ContextPruner(keep_turns=self.context_turns).attach(agent)
+            for session in client.get_all_active_sessions().values():
+                deadlines.guard(session.connector)
+                if self.cassette is not None:
+                    self.cassette.guard(session.connector)
+            try:
+                with usage_scope('agent'):
+                    response = await deadlines.supervise(agent.run(user_prompt))
+            except BudgetExceeded:
+                response = None
+            # A deadline or the token budget cut the run short (response is None): whatever
+            # reached the state file is reported, and untouched pods come back as deferred.
+            if budget_exhausted() and self.budget_mode == 'deterministic':
+                await self._finish_deterministically(client, client_config, namespace, slack_channel)
+            await self._post_rendered_summary(client, client_config, namespace, slack_channel)
         finally:
             await agent.close()
 
@@ -147,24 +393,46 @@ class MCPToolAgentRunner:
             return response.content
         return response
 
+    async def _finish_deterministically(self, client, client_config, namespace, slack_channel):
+        """Apply the rule-based playbook to actionable pods the agent did not reach.
+
+        Reuses the agent's server session, since a fresh server process would reset
+        the state file.
+        """
+        from k8s_balancer.agent.event_remediator import EventDrivenRemediator
+        from k8s_balancer.mcp.tool_session import ToolSession
+
+        server_name, server_entry = next(iter(client_config['mcpServers'].items()))
+        session = client.get_all_active_sessions().get(server_name) or await client.create_session(server_name)
+        state = RunState.from_files(server_entry['env']['K8S_BALANCER_STATE_FILE'])
+        acted = acted_on_pods(state, state.get('pods', {}).get(namespace, []) or [])
+        remediator = EventDrivenRemediator(self, namespace, slack_channel)
+        return await remediator.sweep(ToolSession.attach(session), skip=acted)
+
+    def _read_tool_log(self, tool_log_path):
+        if not tool_log_path or not os.path.exists(tool_log_path):
+            return []
+        with open(tool_log_path) as handle:
+            return [json.loads(line) for line in handle if line.strip()]
+
     def _read_state(self, state_path):
+        """Load the run's action log; descriptions and metrics stay on disk until accessed.
+
+        The server's `.resources` sidecar is moved out of the temporary environment
+        and removed once the returned RunState is garbage collected.
+        """
         if not os.path.exists(state_path):
-            return {}
-        with open(state_path) as handle:
-            return json.load(handle)
+            return RunState({})
+        sidecar = resources_path(state_path)
+        kept = None
+        if os.path.exists(sidecar):
+            kept_fd, kept = tempfile.mkstemp(prefix='k8s_balancer_resources_', suffix='.json')
+            os.close(kept_fd)
+            os.replace(sidecar, kept)
+        return RunState.from_files(state_path, kept, owns_resources=True)
 
     def _extract_summary_from_slack(self, slack_text):
-        if not slack_text:
-            return {}
-        if '```' not in slack_text:
-            return {}
-        try:
-            payload = slack_text.split('```')[1]
-            if payload.lower().startswith('json'):
-                payload = payload[4:].lstrip()
-            return json.loads(payload)
-        except Exception:
-            return {}
+        return parse_summary(slack_text)
 
     def _normalize_slack_message(self, message):
         text = message.get('text', '').strip()
@@ -223,7 +491,12 @@ class MCPToolAgentRunner:
             changed = {key: value for key, value in update.items() if key in {'cpu_request', 'cpu_limit', 'mem_request', 'mem_limit'} and value is not None}
             if not changed:
                 continue
-            rebalanced_entries.append({'pod_name': pod_name, 'changed_fields': changed})
+            entry = {'pod_name': pod_name, 'changed_fields': changed}
+            if update.get('pods'):
+                # Workload-level update: one entry, every replica counts as rebalanced.
+                entry['replicas'] = len(update['pods'])
+                rebalanced_pods.update(update['pods'])
+            rebalanced_entries.append(entry)
             rebalanced_pods.add(pod_name)
 
         escalated_entries = []
@@ -258,11 +531,3 @@ class MCPToolAgentRunner:
             if pod and pod in blob:
                 return pod
         return None
-
-    def _render_slack_message(self, summary, issues):
-        summary_json = json.dumps(summary, indent=2)
-        text = f"✅ Resource Rebalance Completed\n```json\n{summary_json}\n```"
-        urls = [issue.get('url') for issue in issues or [] if issue.get('url')]
-        if urls:
-            text = f"{text}\n" + '\n'.join(urls)
-        return text
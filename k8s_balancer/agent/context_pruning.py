@@ -0,0 +1,200 @@
+"""Bound the agent's per-turn prompt on long namespace scans.
+
+`MCPAgent.run` sends every earlier tool call and its raw output back to the LLM
+on each turn, so a scan of N pods costs O(N) tokens per turn and O(N^2) per run.
+`ContextPruner` sits between the run loop and the agent executor and rewrites
+the intermediate steps each turn before they are formatted into the scratchpad:
+
+- once a pod has been decided (an update or an escalation went out for it), the
+  raw describe/metrics output read for it is replaced by its one-line decision
+  record;
+- only the last `keep_turns` LLM turns are sent, plus the latest turn of each
+  listing tool (the triage queue is the agent's work list). Older turns are
+  dropped whole, so an assistant tool-call message never loses its tool
+  results, and are summarised in a short progress note appended to the input:
+  decided pods with their records, and pods read without an action as skipped,
+  with the percentiles that were read, so they are neither re-read nor lost
+  from the summary.
+
+The full step list is left untouched; only what reaches the LLM is pruned.
+`attach` hooks a private executor method; when it is missing or its signature
+changed, the agent runs unpruned.
+"""
+
+import inspect
+import json
+
+
+READ_TOOLS = ('k8s_describe_pod', 'k8s_query_metrics')
+ACTION_TOOLS = ('k8s_update_resources', 'jira_create_issue')
+# Kept (latest call only) whatever their age: they hold the work list.
+PINNED_TOOLS = ('k8s_triage_namespace', 'k8s_list_pods', 'k8s_list_workloads')
+
+# Keyword arguments MCPAgent.run passes to the executor's `_atake_next_step`.
+STEP_PARAMETERS = ('name_to_tool_map', 'color_mapping', 'inputs', 'intermediate_steps', 'run_manager')
+
+DEFAULT_KEEP_TURNS = 6
+RESULT_CHARS = 80
+
+
+def _arguments(action):
+    arguments = getattr(action, 'tool_input', None)
+    return arguments if isinstance(arguments, dict) else {}
+
+
+def _turn_key(action):
+    # Steps planned by one LLM turn share the message that issued their tool calls.
+    message_log = getattr(action, 'message_log', None)
+    return id(message_log[0]) if message_log else id(action)
+
+
+def _one_line(observation, limit=RESULT_CHARS):
+    text = observation if isinstance(observation, str) else json.dumps(observation, default=str, sort_keys=True)
+    text = ' '.join(text.split())
+    return text if len(text) <= limit else text[:limit - 3] + '...'
+
+
+def _issue_pod(arguments, known):
+    """The longest known pod name in an escalation's title or body."""
+    blob = '%s %s' % (arguments.get('title', ''), arguments.get('body', ''))
+    named = [pod for pod in known if pod in blob]
+    return max(named, key=len) if named else None
+
+
+def _payload(observation):
+    if isinstance(observation, str):
+        try:
+            return json.loads(observation)
+        except ValueError:
+            return None
+    return observation
+
+
+def _verdict(pod, metrics):
+    """`pod (memory p95=40, cpu p95=30)` from the metric reads that aged out."""
+    read = ['%s p95=%s' % (metric, value) for metric, value in metrics.items()]
+    return '%s (%s)' % (pod, ', '.join(read)) if read else pod
+
+
+def step_chars(steps):
+    """Rough prompt size of `steps`: tool arguments plus observations, in characters."""
+    return sum(len(str(_arguments(action))) + len(str(observation)) for action, observation in steps)
+
+
+class ContextPruner:
+    def __init__(self, keep_turns=DEFAULT_KEEP_TURNS):
+        self.keep_turns = keep_turns
+        # One entry per LLM turn: steps seen, steps sent and their size before/after.
+        self.turns = []
+
+    def decisions(self, steps):
+        """`{pod: record}` for every pod an action tool was called for, in call order."""
+        known = []
+        decisions = {}
+        for action, observation in steps:
+            arguments = _arguments(action)
+            pod = arguments.get('pod')
+            if pod and pod not in known:
+                known.append(pod)
+            if action.tool not in ACTION_TOOLS:
+                continue
+            if action.tool == 'jira_create_issue':
+                pod = _issue_pod(arguments, known)
+                details = 'escalated %r' % arguments.get('title', '')
+            else:
+                changes = {field: value for field, value in arguments.items() if field != 'pod' and value is not None}
+                details = 'updated %s' % ', '.join('%s=%s' % item for item in sorted(changes.items()))
+            if pod:
+                decisions[pod] = '%s: %s -> %s' % (pod, details, _one_line(observation))
+        return decisions
+
+    def prune(self, steps):
+        """Return `(steps, note)`: the steps to send this turn and a progress note for dropped turns (or None)."""
+        steps = list(steps)
+        decisions = self.decisions(steps)
+
+        turns = []
+        for step in steps:
+            key = _turn_key(step[0])
+            if not turns or turns[-1][0] != key:
+                turns.append((key, []))
+            turns[-1][1].append(step)
+
+        keep = set(range(max(len(turns) - self.keep_turns, 0), len(turns)))
+        pinned = {}
+        for index, (_, turn) in enumerate(turns):
+            for action, _ in turn:
+                if action.tool in PINNED_TOOLS:
+                    pinned[action.tool] = index
+        keep.update(pinned.values())
+
+        sent = []
+        skipped = {}
+        for index, (_, turn) in enumerate(turns):
+            for action, observation in turn:
+                arguments = _arguments(action)
+                pod = arguments.get('pod')
+                if index not in keep:
+                    if action.tool in READ_TOOLS and pod and pod not in decisions:
+                        metrics = skipped.setdefault(pod, {})
+                        payload = _payload(observation)
+                        if action.tool == 'k8s_query_metrics' and isinstance(payload, dict) and 'p95' in payload:
+                            metrics[arguments.get('metric', 'metric')] = payload['p95']
+                    continue
+                if action.tool in READ_TOOLS and pod in decisions:
+                    observation = '[compacted %s output] %s' % (action.tool, decisions[pod])
+                sent.append((action, observation))
+
+        note = None
+        if len(keep) < len(turns):
+            lines = ['Progress so far (earlier tool output was compacted; do not redo this work):']
+            lines.extend('- decided %s' % record for record in decisions.values())
+            if skipped:
+                lines.append('- skipped, no action needed (report under pods_skipped unless acted on later): %s' % (
+                    '; '.join(_verdict(pod, metrics) for pod, metrics in skipped.items())
+                ))
+            note = '\n'.join(lines)
+
+        self.turns.append({
+            'steps': len(steps),
+            'sent': len(sent),
+            'chars_before': step_chars(steps),
+            'chars_after': step_chars(sent) + len(note or ''),
+        })
+        return sent, note
+
+    def attach(self, agent):
+        """Prune the intermediate steps `agent`'s executor plans from; call after `agent.initialize()`.
+
+        Returns True when the hook is in place, False when the executor does not
+        expose the expected `_atake_next_step` (the agent then runs unpruned).
+        """
+        executor = getattr(agent, '_agent_executor', None)
+        take_next_step = getattr(executor, '_atake_next_step', None)
+        if take_next_step is None or not inspect.iscoroutinefunction(take_next_step):
+            return False
+        try:
+            parameters = inspect.signature(take_next_step).parameters
+        except (TypeError, ValueError):
+            return False
+        if not set(STEP_PARAMETERS).issubset(parameters):
+            return False
+
+        async def pruned(name_to_tool_map, color_mapping, inputs, intermediate_steps, run_manager=None):
+            steps, note = self.prune(intermediate_steps)
+            if note:
+                inputs = dict(inputs, input='%s\n\n%s' % (inputs['input'], note))
+            return await take_next_step(
+                name_to_tool_map=name_to_tool_map,
+                color_mapping=color_mapping,
+                inputs=inputs,
+                intermediate_steps=steps,
+                run_manager=run_manager,
+            )
+
+        try:
+            # AgentExecutor is a pydantic model, which rejects unknown attributes via setattr.
+            object.__setattr__(executor, '_atake_next_step', pruned)
+        except (AttributeError, TypeError):
+            return False
+        return True
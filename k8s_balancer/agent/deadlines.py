@@ -0,0 +1,122 @@
+"""Deadlines for agent runs: per MCP tool call, per LLM turn and per run.
+
+`MCPAgent.run` has no notion of a slow step, so one hung tool call or LLM turn
+stalls the whole run. `RunDeadlines` wraps the MCP connectors the agent's tools
+call through and supervises the run:
+
+- a tool call past `tool` seconds is cancelled, which abandons the pending MCP
+  request (the server, given the same deadline, cancels its own handler); the
+  agent sees a failed tool call and carries on;
+- an LLM turn is the time between tool calls: when no call is in flight and none
+  has finished for `turn` seconds, the run is cancelled;
+- the whole run is cancelled after `run` seconds.
+
+Every timeout is recorded with the pod it concerned, so the runner can report
+those pods as deferred instead of losing them.
+"""
+
+import asyncio
+import itertools
+import time
+
+
+class ToolTimeout(asyncio.TimeoutError):
+    """Raised to the agent when an MCP tool call exceeds its deadline."""
+
+
+def timed_out_pods(timeouts):
+    """Pods named by a timed-out or cancelled tool call, in the order they hit the deadline."""
+    pods = []
+    for entry in timeouts or ():
+        if entry.get('pod') and entry['pod'] not in pods:
+            pods.append(entry['pod'])
+    return pods
+
+
+class RunDeadlines:
+    def __init__(self, tool=None, turn=None, run=None):
+        self.tool = tool
+        self.turn = turn
+        self.run = run
+        self.timeouts = []
+        self._pending = {}
+        self._calls = itertools.count()
+        self._last_activity = time.monotonic()
+
+    def _record(self, kind, seconds, tool=None, arguments=None):
+        self.timeouts.append({
+            'kind': kind,
+            'seconds': seconds,
+            'tool': tool,
+            'pod': (arguments or {}).get('pod'),
+        })
+
+    def guard(self, connector):
+        """Route `connector.call_tool` through the tool deadline; returns the connector."""
+        if getattr(connector, '_deadline_guard', None) is self:
+            return connector
+        call_tool = connector.call_tool
+
+        async def guarded(name, arguments, *args, **kwargs):
+            call = next(self._calls)
+            self._pending[call] = (name, arguments)
+            self._last_activity = time.monotonic()
+            try:
+                if self.tool is None:
+                    return await call_tool(name, arguments, *args, **kwargs)
+                try:
+                    return await asyncio.wait_for(call_tool(name, arguments, *args, **kwargs), self.tool)
+                except asyncio.TimeoutError:
+                    self._record('tool', self.tool, name, arguments)
+                    raise ToolTimeout('%s exceeded its %ss deadline' % (name, self.tool)) from None
+            finally:
+                self._pending.pop(call, None)
+                self._last_activity = time.monotonic()
+
+        connector.call_tool = guarded
+        connector._deadline_guard = self
+        return connector
+
+    def _wait(self, started, now):
+        waits = []
+        if self.run is not None:
+            waits.append(self.run - (now - started))
+        if self.turn is not None:
+            waits.append(self.turn if self._pending else self.turn - (now - self._last_activity))
+        return max(min(waits), 0.01) if waits else None
+
+    def _expired(self, started, now):
+        if self.run is not None and now - started >= self.run:
+            return 'run', self.run
+        if self.turn is not None and not self._pending and now - self._last_activity >= self.turn:
+            return 'turn', self.turn
+        return None
+
+    async def supervise(self, coroutine):
+        """Await `coroutine` under the turn and run deadlines.
+
+        Returns its result, or None once a deadline cancelled it. Tool calls still in
+        flight at that point are recorded against the same deadline.
+        """
+        task = asyncio.ensure_future(coroutine)
+        started = self._last_activity = time.monotonic()
+        try:
+            while True:
+                done, _ = await asyncio.wait({task}, timeout=self._wait(started, time.monotonic()))
+                if done:
+                    return task.result()
+                expired = self._expired(started, time.monotonic())
+                if expired is not None:
+                    break
+            kind, seconds = expired
+            self._record(kind, seconds)
+            for name, arguments in list(self._pending.values()):
+                self._record(kind, seconds, name, arguments)
+            return None
+        finally:
+            if not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
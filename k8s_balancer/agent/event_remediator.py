@@ -0,0 +1,152 @@
+"""Event-driven remediation: react to OOMKilled/restart/eviction events per pod.
+
+Rather than waiting for the next full LLM sweep, the remediator polls the server's
+event feed and fixes just the affected pod with the deterministic playbook in
+`core.remediation`. A full triage sweep still runs, at a much lower frequency, as
+a safety net for pods that drift without emitting events.
+
+With `by_workload`, an event on one replica re-evaluates and updates its whole
+Deployment/StatefulSet once, and sweeps triage workloads instead of pods.
+"""
+
+import time
+
+from k8s_balancer.core.decision_engine import METRIC_NAMES, evaluate_pod
+from k8s_balancer.core.remediation import plan_remediation
+from k8s_balancer.core.slack_renderer import chunk_lines, post_messages
+from k8s_balancer.core.workloads import workload_key
+
+
+REMEDIATED_EVENTS = ('OOMKilled', 'Restart', 'Evicted')
+
+
+class EventDrivenRemediator:
+    def __init__(self, runner, namespace, slack_channel, poll_interval=1.0, sweep_interval=900.0, window='24h', by_workload=False, sizer=None):
+        self.runner = runner
+        self.namespace = namespace
+        self.slack_channel = slack_channel
+        self.poll_interval = poll_interval
+        self.sweep_interval = sweep_interval
+        self.window = window
+        self.by_workload = by_workload
+        # Optional `RightSizer`: percentile targets instead of the playbook's fixed steps.
+        self.sizer = sizer
+
+    def run(self, duration=None, max_events=None):
+        """Watch events until `duration` seconds pass or `max_events` were handled; return a report."""
+        import asyncio
+
+        return asyncio.run(self._run(duration, max_events))
+
+    async def _run(self, duration, max_events):
+        import asyncio
+
+        from k8s_balancer.mcp.tool_session import ToolSession
+
+        report = {'namespace': self.namespace, 'events': [], 'remediations': [], 'sweeps': []}
+        started = time.monotonic()
+        with self.runner.server_environment() as (client_config, state_path):
+            async with ToolSession(client_config) as session:
+                cursor = 0
+                next_sweep = started
+                # Targets remediated since the last sweep; repeat events before the next
+                # sweep are recorded but not acted on again, so one burst gets one fix.
+                handled = set()
+                while True:
+                    now = time.monotonic()
+                    if now >= next_sweep:
+                        report['sweeps'].append(await self.sweep(session))
+                        next_sweep = now + self.sweep_interval
+                        handled.clear()
+                    feed = await session.call('k8s_watch_events', namespace=self.namespace, cursor=cursor)
+                    cursor = feed['cursor']
+                    for event in feed['events']:
+                        report['events'].append(event)
+                        if event.get('type') not in REMEDIATED_EVENTS:
+                            continue
+                        target = await self._target(session, event['pod'])
+                        if target in handled:
+                            continue
+                        handled.add(target)
+                        report['remediations'].append(await self.remediate_pod(session, event, target))
+                    if max_events is not None and len(report['events']) >= max_events:
+                        break
+                    if duration is not None and time.monotonic() - started >= duration:
+                        break
+                    await asyncio.sleep(self.poll_interval)
+            report['state'] = self.runner._read_state(state_path)
+        return report
+
+    async def _snapshot(self, session, pod):
+        metrics = {}
+        for metric in METRIC_NAMES:
+            metrics[metric] = await session.call('k8s_query_metrics', pod=pod, metric=metric, window=self.window) or {}
+        description = await session.call('k8s_describe_pod', pod=pod) or {}
+        return {'name': pod, 'metrics': metrics, 'description': description}
+
+    async def _apply(self, session, decision, description, metrics=None):
+        plan = plan_remediation(decision, description, sizer=self.sizer, metrics=metrics)
+        if plan is None:
+            return None, None
+        tool, arguments = plan
+        await session.call(tool, **arguments)
+        return tool, arguments
+
+    async def _target(self, session, pod):
+        if not self.by_workload:
+            return pod
+        return workload_key(pod, await session.call('k8s_describe_pod', pod=pod))
+
+    async def remediate_pod(self, session, event, target=None):
+        """Re-evaluate one pod (or its workload) after an event and apply the playbook action for it."""
+        received = time.monotonic()
+        if target is None:
+            target = await self._target(session, event['pod'])
+        snapshot = await self._snapshot(session, target)
+        decision = evaluate_pod(snapshot)
+        tool, arguments = await self._apply(session, decision, snapshot['description'], snapshot['metrics'])
+        if tool is not None:
+            await session.call('slack_post_message', channel=self.slack_channel, text=self._event_message(event, decision, arguments))
+        return {
+            'pod': event['pod'],
+            'target': target,
+            'event': event.get('type'),
+            'classification': decision['classification'],
+            'recommended_action': decision['recommended_action'],
+            'tool': tool,
+            'arguments': arguments,
+            'latency_seconds': round(time.monotonic() - received, 4),
+        }
+
+    async def sweep(self, session, skip=()):
+        """Full-namespace pass: deterministic triage, then the playbook for every actionable pod.
+
+        Pods in `skip` (e.g. already handled by the agent this run) are left alone.
+        """
+        triage = await session.call(
+            'k8s_triage_namespace', namespace=self.namespace, window=self.window, by_workload=self.by_workload)
+        applied = []
+        for entry in triage['actionable']:
+            if entry['pod'] in skip or any(pod in skip for pod in entry.get('replicas', ())):
+                continue
+            decision = {'name': entry['pod'], 'recommended_action': entry['recommended_action'], 'reason': entry['reason']}
+            tool, arguments = await self._apply(session, decision, entry['resources'], entry.get('metrics'))
+            if tool is not None:
+                applied.append({'pod': entry['pod'], 'tool': tool, 'arguments': arguments})
+        if applied:
+            lines = ['- %s: %s' % (item['pod'], self._describe_action(item['tool'], item['arguments'])) for item in applied]
+            title = '✅ Scheduled sweep of %s: %d of %d pods remediated' % (
+                self.namespace, len(applied), triage['pods_scanned'])
+            await post_messages(session, self.slack_channel, chunk_lines(lines, title))
+        return {'pods_scanned': triage['pods_scanned'], 'healthy_count': triage['healthy_count'], 'applied': applied}
+
+    def _describe_action(self, tool, arguments):
+        if tool == 'jira_create_issue':
+            return 'escalated to %s' % arguments['project']
+        changes = ', '.join('%s=%s' % (key, value) for key, value in arguments.items() if key != 'pod')
+        return 'updated %s' % changes
+
+    def _event_message(self, event, decision, arguments):
+        tool = 'jira_create_issue' if 'project' in arguments else 'k8s_update_resources'
+        return '⚡ %s on %s/%s: %s (%s)' % (
+            event.get('type'), self.namespace, event['pod'], self._describe_action(tool, arguments), decision['reason'])
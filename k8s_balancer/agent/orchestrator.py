@@ -1,7 +1,5 @@
 """High level orchestrator that delegates to an MCP-driven LLM workflow."""
 
-import copy
-
 from k8s_balancer.agent.agent_runner import MCPToolAgentRunner
 
 
@@ -12,12 +10,17 @@ class ResourceRebalanceOrchestrator:
         self.llm = llm
         self.namespace = namespace
         self.slack_channel = slack_channel
-        self.fixtures = copy.deepcopy(fixtures) if fixtures is not None else None
+        # Runners only read fixtures (they are written to a file for the server), so no copy.
+        self.fixtures = fixtures
         self.agent_runner_cls = agent_runner_cls or MCPToolAgentRunner
         self.latest_outcome = None
+        # Pods the previous run could not reach within its budget; scheduled first next time.
+        self.deferred_pods = []
 
     def run(self):
-        runner = self.agent_runner_cls(self.llm, fixtures=copy.deepcopy(self.fixtures))
+        kwargs = {'priority_pods': self.deferred_pods} if self.deferred_pods else {}
+        runner = self.agent_runner_cls(self.llm, fixtures=self.fixtures, **kwargs)
         outcome = runner.execute(self.namespace, self.slack_channel)
         self.latest_outcome = outcome
+        self.deferred_pods = list(getattr(outcome, 'deferred', []) or [])
         return outcome.summary
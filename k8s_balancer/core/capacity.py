@@ -0,0 +1,212 @@
+"""What-if node packing for planned resource changes.
+
+The scheduler places pods by their requests, so the simulator applies the planned
+updates to every pod's cpu/memory requests and packs the namespace onto the node
+inventory with first-fit-decreasing, once as it is and once as planned.
+
+Pods with identical requests are interchangeable, so each distinct request shape
+is placed in one vectorized step: for every node, how many copies still fit; a
+cumulative sum over the nodes then fills them in order, exactly as placing the
+copies one by one would. Cost grows with shapes x nodes, not pods x nodes.
+
+Needs NumPy; import this module lazily from code paths that do not simulate.
+"""
+
+import json
+import time
+
+import numpy as np
+
+from k8s_balancer.core.quantity import format_cpu, format_memory, parse_cpu, parse_memory
+
+
+DEFAULT_NODES = (
+    {'name': 'node-a', 'cpu': '2', 'memory': '4Gi'},
+    {'name': 'node-b', 'cpu': '2', 'memory': '4Gi'},
+)
+
+# Requests are floats (millicores / MiB); absorb rounding left by repeated subtraction.
+_TOLERANCE = 1e-6
+
+
+def load_nodes(path):
+    """Node inventory from JSON: a list of `{'name', 'cpu', 'memory', 'count'?}` or `{'nodes': [...]}`."""
+    with open(path) as handle:
+        data = json.load(handle)
+    return data.get('nodes', []) if isinstance(data, dict) else data
+
+
+def node_arrays(nodes):
+    """`(names, cpu_millicores, memory_mi)` for the inventory; `count` expands a node pool."""
+    names = []
+    cpu = []
+    memory = []
+    for node in nodes:
+        count = int(node.get('count', 1))
+        for index in range(count):
+            names.append(node['name'] if count == 1 else '%s-%d' % (node['name'], index))
+            cpu.append(parse_cpu(node.get('cpu')) or 0)
+            memory.append(parse_memory(node.get('memory')) or 0)
+    return names, np.array(cpu, dtype=np.float64), np.array(memory, dtype=np.float64)
+
+
+def _column(values, parse):
+    parsed = {}
+    column = np.empty(len(values), dtype=np.float64)
+    for index, value in enumerate(values):
+        if value not in parsed:
+            parsed[value] = parse(value) or 0
+        column[index] = parsed[value]
+    return column
+
+
+def pod_resources(fixtures, namespace=None, updates=()):
+    """Per-pod request and memory-limit columns with `updates` applied in order.
+
+    Returns `(names, {'cpu_request', 'mem_request', 'mem_limit'})`. Workload updates
+    (carrying `pods`) apply to every replica.
+    """
+    if namespace is None:
+        pods = [pod for names in fixtures.get('pods', {}).values() for pod in names]
+    else:
+        pods = list(fixtures.get('pods', {}).get(namespace, []) or [])
+    fields = ('cpu_request', 'mem_request', 'mem_limit')
+    planned = {}
+    for update in updates or ():
+        for pod in update.get('pods') or [update.get('pod')]:
+            changes = planned.setdefault(pod, {})
+            changes.update((field, update[field]) for field in fields if update.get(field) is not None)
+    descriptions = fixtures.get('descriptions', {})
+    values = {field: [] for field in fields}
+    for pod in pods:
+        description = descriptions.get(pod) or {}
+        changes = planned.get(pod) or {}
+        for field in fields:
+            values[field].append(changes.get(field, description.get(field)))
+    columns = {
+        'cpu_request': _column(values['cpu_request'], parse_cpu),
+        'mem_request': _column(values['mem_request'], parse_memory),
+        'mem_limit': _column(values['mem_limit'], parse_memory),
+    }
+    return pods, columns
+
+
+def _copies(remaining, request, unlimited):
+    if request <= 0:
+        return np.full(len(remaining), unlimited, dtype=np.int64)
+    return np.maximum(np.floor(remaining / request + _TOLERANCE), 0).astype(np.int64)
+
+
+def first_fit_decreasing(cpu, memory, node_cpu, node_memory):
+    """Node index for every pod (-1 where it fits nowhere), largest pods placed first.
+
+    Size is the pod's dominant share of the largest node, so CPU- and memory-heavy
+    pods are ordered on one scale.
+    """
+    count = len(cpu)
+    assignment = np.full(count, -1, dtype=np.int64)
+    if count == 0 or len(node_cpu) == 0:
+        return assignment
+    remaining_cpu = np.array(node_cpu, dtype=np.float64)
+    remaining_memory = np.array(node_memory, dtype=np.float64)
+    node_indices = np.arange(len(node_cpu))
+    unlimited = count + 1
+
+    shapes, inverse = np.unique(np.column_stack((cpu, memory)), axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    sizes = np.maximum(shapes[:, 0] / max(node_cpu.max(), 1), shapes[:, 1] / max(node_memory.max(), 1))
+    members_by_shape = np.argsort(inverse, kind='stable')
+    counts = np.bincount(inverse, minlength=len(shapes))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    for shape in np.argsort(-sizes, kind='stable'):
+        shape_cpu, shape_memory = shapes[shape]
+        members = members_by_shape[starts[shape]:starts[shape] + counts[shape]]
+        fits = np.minimum(
+            _copies(remaining_cpu, shape_cpu, unlimited), _copies(remaining_memory, shape_memory, unlimited),
+        )
+        placed_before = np.cumsum(fits) - fits
+        take = np.clip(len(members) - placed_before, 0, fits)
+        placed = int(take.sum())
+        if not placed:
+            continue
+        remaining_cpu -= take * shape_cpu
+        remaining_memory -= take * shape_memory
+        assignment[members[:placed]] = np.repeat(node_indices, take)
+    return assignment
+
+
+def _nodes_used(assignment):
+    return int(np.unique(assignment[assignment >= 0]).size)
+
+
+def _extra_nodes(cpu, memory, node_cpu, node_memory):
+    """Extra nodes shaped like the largest one needed for pods that did not fit.
+
+    Also returns a mask of pods too large for even an empty node of any shape.
+    """
+    if not len(cpu) or not len(node_cpu):
+        return 0, np.zeros(len(cpu), dtype=bool)
+    shapes, inverse = np.unique(np.column_stack((cpu, memory)), axis=0, return_inverse=True)
+    fits_empty = (shapes[:, :1] <= node_cpu + _TOLERANCE) & (shapes[:, 1:] <= node_memory + _TOLERANCE)
+    too_large = ~fits_empty.any(axis=1)[inverse.reshape(-1)]
+    template = int(np.argmax(node_cpu / max(node_cpu.max(), 1) + node_memory / max(node_memory.max(), 1)))
+    fitting = ~too_large & (cpu <= node_cpu[template] + _TOLERANCE) & (memory <= node_memory[template] + _TOLERANCE)
+    if not fitting.any():
+        return 0, too_large
+    spare = int(fitting.sum())
+    assignment = first_fit_decreasing(
+        cpu[fitting], memory[fitting], np.full(spare, node_cpu[template]), np.full(spare, node_memory[template]),
+    )
+    return _nodes_used(assignment), too_large
+
+
+def _totals(columns):
+    return {
+        'cpu_request': format_cpu(float(columns['cpu_request'].sum())),
+        'mem_request': format_memory(float(columns['mem_request'].sum())),
+        'mem_limit': format_memory(float(columns['mem_limit'].sum())),
+    }
+
+
+def simulate_capacity(fixtures, updates=None, nodes=None, namespace=None):
+    """Pack the pods before and after `updates` (default: the fixtures' recorded updates).
+
+    Reports requested and limit totals, nodes used in each case, nodes freed, extra
+    template nodes needed, and pods that would become unschedulable.
+    """
+    started = time.perf_counter()
+    if nodes is None:
+        nodes = fixtures.get('nodes') or DEFAULT_NODES
+    if updates is None:
+        updates = fixtures.get('updates') or []
+    node_names, node_cpu, node_memory = node_arrays(nodes)
+    names, before = pod_resources(fixtures, namespace)
+    _, after = pod_resources(fixtures, namespace, updates)
+
+    placed_before = first_fit_decreasing(before['cpu_request'], before['mem_request'], node_cpu, node_memory)
+    placed_after = first_fit_decreasing(after['cpu_request'], after['mem_request'], node_cpu, node_memory)
+    unschedulable = np.flatnonzero(placed_after < 0)
+    needed, too_large = _extra_nodes(
+        after['cpu_request'][unschedulable], after['mem_request'][unschedulable], node_cpu, node_memory,
+    )
+    used_before = _nodes_used(placed_before)
+    used_after = _nodes_used(placed_after)
+    return {
+        'namespace': namespace,
+        'pods': len(names),
+        'updates': len(updates),
+        'nodes': len(node_names),
+        'allocatable': {'cpu': format_cpu(float(node_cpu.sum())), 'memory': format_memory(float(node_memory.sum()))},
+        'before': _totals(before),
+        'after': _totals(after),
+        'nodes_used_before': used_before,
+        'nodes_used_after': used_after,
+        'nodes_freed': max(used_before - used_after, 0),
+        'nodes_needed': needed,
+        'unschedulable_before': [names[index] for index in np.flatnonzero(placed_before < 0)],
+        'unschedulable': [names[index] for index in unschedulable],
+        'newly_unschedulable': [names[index] for index in unschedulable if placed_before[index] >= 0],
+        'larger_than_any_node': [names[index] for index, large in zip(unschedulable, too_large) if large],
+        'seconds': round(time.perf_counter() - started, 4),
+    }
@@ -0,0 +1,183 @@
+"""Per-pod progress checkpoints for long namespace runs, keyed by run ID.
+
+A run over thousands of pods that dies partway (LLM outage, OOM, deploy) would
+otherwise start from zero, repeat every describe/metric read and risk applying
+an update twice. The server marks each pod as it moves through the stages:
+
+- `scanned`: what describe/query_metrics returned (kept, so a resume re-reads nothing);
+- `decided`: triage's action for the pod;
+- `in_flight`: an update or escalation about to be sent, with its payload;
+- `applied`: the action that went through;
+- `notified`: a Slack message went out after the action.
+
+A pod can see more than one action in a run (an update and an escalation, or
+two updates), so `in_flight` and `applied` keep one mark per action, keyed by
+`action_key`; the other stages keep one mark per pod.
+
+Resuming a run reuses its ID. `reconcile` settles actions that were in flight
+when the run died: confirmed when the live description already shows the
+change, otherwise reopened so the action is sent again.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from k8s_balancer.core.quantity import parse_cpu, parse_memory
+
+
+STAGES = ('scanned', 'decided', 'in_flight', 'applied', 'notified')
+ACTION_STAGES = ('in_flight', 'applied')
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS checkpoints (
+    run_id TEXT NOT NULL,
+    pod TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    action TEXT NOT NULL DEFAULT '',
+    timestamp REAL NOT NULL,
+    payload TEXT,
+    PRIMARY KEY (run_id, pod, stage, action)
+);
+'''
+
+
+def action_key(payload):
+    """Identity of an action payload: the tool plus its resource changes or issue title."""
+    payload = payload or {}
+    if payload.get('tool') == 'jira_create_issue':
+        detail = (payload.get('entry') or {}).get('title')
+    else:
+        detail = payload.get('changes')
+    return '%s %s' % (payload.get('tool'), json.dumps(detail, sort_keys=True))
+
+
+class CheckpointStore:
+    """SQLite checkpoint table; safe to share between the event loop and worker threads."""
+
+    def __init__(self, path=':memory:'):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        if path != ':memory:':
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.executescript(_SCHEMA)
+
+    @classmethod
+    def from_env(cls):
+        """Checkpoints at K8S_BALANCER_CHECKPOINT_DB, or None when unset."""
+        path = os.environ.get('K8S_BALANCER_CHECKPOINT_DB')
+        return cls(path) if path else None
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def mark(self, run_id, pod, stage, payload=None, timestamp=None):
+        self.mark_many(run_id, [(pod, payload)], stage, timestamp)
+
+    def mark_many(self, run_id, entries, stage, timestamp=None):
+        """Record `(pod, payload)` pairs at `stage` in one transaction; later marks replace earlier ones.
+
+        In `ACTION_STAGES` a mark only replaces an earlier mark of the same action.
+        """
+        if stage not in STAGES:
+            raise ValueError('Unknown checkpoint stage %r' % stage)
+        timestamp = time.time() if timestamp is None else timestamp
+        rows = [
+            (
+                run_id, pod, stage, action_key(payload) if stage in ACTION_STAGES else '', timestamp,
+                None if payload is None else json.dumps(payload),
+            )
+            for pod, payload in entries
+        ]
+        with self._lock, self._connection:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO checkpoints (run_id, pod, stage, action, timestamp, payload) VALUES (?, ?, ?, ?, ?, ?)',
+                rows,
+            )
+        return len(rows)
+
+    def clear(self, run_id, pod, stage, action=None):
+        """Drop the pod's marks at `stage`, or only the mark of `action` when given."""
+        query = 'DELETE FROM checkpoints WHERE run_id = ? AND pod = ? AND stage = ?'
+        params = (run_id, pod, stage)
+        if action is not None:
+            query += ' AND action = ?'
+            params += (action,)
+        with self._lock, self._connection:
+            self._connection.execute(query, params)
+
+    def load(self, run_id):
+        """`{pod: {stage: payload}}` for every checkpoint of the run.
+
+        `ACTION_STAGES` map to `{action_key: payload}` in the order the actions were marked.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT pod, stage, action, payload FROM checkpoints WHERE run_id = ? ORDER BY timestamp, rowid', (run_id,),
+            ).fetchall()
+        progress = {}
+        for pod, stage, action, payload in rows:
+            payload = json.loads(payload) if payload else None
+            if stage in ACTION_STAGES:
+                progress.setdefault(pod, {}).setdefault(stage, {})[action] = payload
+            else:
+                progress.setdefault(pod, {})[stage] = payload
+        return progress
+
+    def progress(self, run_id):
+        """Pod count per stage for the run."""
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT stage, COUNT(DISTINCT pod) FROM checkpoints WHERE run_id = ? GROUP BY stage', (run_id,),
+            ).fetchall()
+        counts = dict.fromkeys(STAGES, 0)
+        counts.update(rows)
+        return counts
+
+    def in_flight(self, run_id):
+        """`{pod: {action_key: payload}}` for actions sent without a matching `applied` mark."""
+        pending = {}
+        for pod, stages in self.load(run_id).items():
+            applied = stages.get('applied') or {}
+            actions = {action: payload for action, payload in (stages.get('in_flight') or {}).items() if action not in applied}
+            if actions:
+                pending[pod] = actions
+        return pending
+
+
+def _matches(field, wanted, current):
+    parse = parse_cpu if field.startswith('cpu') else parse_memory
+    wanted_value = parse(wanted)
+    return wanted_value is not None and wanted_value == parse(current)
+
+
+def change_landed(changes, description):
+    """True when `description` already carries every resource value in `changes`."""
+    description = description or {}
+    return bool(changes) and all(_matches(field, value, description.get(field)) for field, value in changes.items())
+
+
+def reconcile(store, run_id, describe):
+    """Settle in-flight actions of `run_id` against live descriptions from `describe(pod)`.
+
+    Updates whose changes the pod already shows are marked applied. Everything
+    else (including escalations, which leave no trace on the pod) is reopened,
+    to be sent again by the resumed run.
+    """
+    confirmed = []
+    reopened = []
+    for pod, actions in sorted(store.in_flight(run_id).items()):
+        for action, payload in actions.items():
+            payload = payload or {}
+            if payload.get('tool') == 'k8s_update_resources' and change_landed(payload.get('changes'), describe(pod)):
+                store.mark(run_id, pod, 'applied', payload)
+                confirmed.append(pod)
+            else:
+                store.clear(run_id, pod, 'in_flight', action)
+                reopened.append(pod)
+    return {'confirmed': confirmed, 'reopened': reopened}
@@ -1,8 +1,8 @@
 import json
 
-from langchain.prompts import PromptTemplate
-
-from k8s_balancer.core.prompt_loader import load_prompt_text
+from k8s_balancer.core.prompt_loader import get_prompt
+from k8s_balancer.core.quantity import parse_memory
+from k8s_balancer.core.usage import budget_exhausted, install_usage_callback, usage_scope
 
 
 FALLBACK_DECISIONS = {
@@ -24,51 +24,173 @@ FALLBACK_DECISIONS = {
 }
 
 
-def _parse_memory(value):
-    if not value:
-        return None
-    value = value.strip()
-    if value.endswith('Gi'):
-        return float(value[:-2]) * 1024
-    if value.endswith('Mi'):
-        return float(value[:-2])
-    if value.endswith('Ki'):
-        return float(value[:-2]) / 1024
-    try:
-        return float(value)
-    except ValueError:
-        return None
+OOM_KILL_THRESHOLD = 3
+MEMORY_OVERLOAD_PCT = 90
+IDLE_PCT = 20
+INCONSISTENT_AVG_PCT = 30
+INCONSISTENT_P95_PCT = 80
+
+METRIC_NAMES = ('cpu', 'memory', 'oom_kills')
+
+HEALTHY, OVERLOADED, INCONSISTENT, IDLE = range(4)
+
+# `(classification, recommended_action, reason)` per classification code.
+DECISION_TEMPLATES = (
+    ('healthy', 'skip', 'healthy'),
+    ('overloaded', 'increase_memory_limit', 'Memory usage near limits or frequent OOM events'),
+    ('inconsistent', 'escalate_inconsistent', 'Inconsistent metrics detected with large p95 spikes despite low averages'),
+    ('idle', 'decrease_requests', 'Sustained low CPU and memory consumption'),
+)
+
+
+def pod_snapshots_from_fixtures(fixtures, namespace, window='24h'):
+    """Assemble engine-ready snapshots for every pod in the namespace."""
+    pods = fixtures.get('pods', {}).get(namespace, []) or []
+    descriptions = fixtures.get('descriptions', {})
+    metrics = fixtures.get('metrics', {})
+    snapshots = []
+    for pod in pods:
+        pod_metrics = {}
+        for metric in METRIC_NAMES:
+            values = metrics.get((pod, metric, window))
+            if values is not None:
+                pod_metrics[metric] = values
+        snapshots.append({
+            'name': pod,
+            'metrics': pod_metrics,
+            'description': descriptions.get(pod, {}) or {},
+        })
+    return snapshots
+
+
+def _decision(name, classification, recommended_action, reason):
+    return {
+        'name': name,
+        'classification': classification,
+        'recommended_action': recommended_action,
+        'reason': reason,
+    }
+
+
+def _has_metrics(pod_snapshot):
+    metrics = pod_snapshot.get('metrics', {}) or {}
+    return any(bool(metrics.get(metric)) for metric in METRIC_NAMES)
+
+
+def classify_row(cpu_avg, cpu_p95, mem_avg, mem_p95, oom_avg, mem_limit):
+    """The playbook thresholds for one pod; returns its classification code.
+
+    `evaluate_pod` and the sharded triage both call this; the backtest's
+    vectorized copy is held to it by tests/test_backtest.py.
+    """
+    if mem_limit and mem_avg and mem_avg <= 1:
+        mem_avg = mem_avg / mem_limit * 100
+    if mem_limit and mem_p95 and mem_p95 <= 1:
+        mem_p95 = mem_p95 / mem_limit * 100
+    if oom_avg >= OOM_KILL_THRESHOLD or mem_avg > MEMORY_OVERLOAD_PCT:
+        return OVERLOADED
+    if (
+        (cpu_avg < INCONSISTENT_AVG_PCT and cpu_p95 > INCONSISTENT_P95_PCT)
+        or (mem_avg < INCONSISTENT_AVG_PCT and mem_p95 > INCONSISTENT_P95_PCT)
+    ):
+        return INCONSISTENT
+    if cpu_avg < IDLE_PCT and mem_avg < IDLE_PCT:
+        return IDLE
+    return HEALTHY
+
+
+def evaluate_pod(pod_snapshot):
+    """Apply the deterministic playbook thresholds to a single pod snapshot."""
+    name = pod_snapshot.get('name', 'unknown')
+    metrics = pod_snapshot.get('metrics', {}) or {}
+    description = pod_snapshot.get('description', {}) or {}
+
+    cpu_metrics = metrics.get('cpu', {}) or {}
+    memory_metrics = metrics.get('memory', {}) or {}
+    oom_metrics = metrics.get('oom_kills', {}) or {}
+
+    code = classify_row(
+        cpu_metrics.get('avg') or 0,
+        cpu_metrics.get('p95') or 0,
+        memory_metrics.get('avg') or 0,
+        memory_metrics.get('p95') or 0,
+        oom_metrics.get('avg') or 0,
+        parse_memory(description.get('mem_limit')),
+    )
+    return _decision(name, *DECISION_TEMPLATES[code])
 
 
 class DecisionEngine:
     """Wrapper around LangChain prompt that turns pod metrics into decisions."""
 
-    def __init__(self, llm):
-        template = load_prompt_text('resource_analysis_prompt.txt')
-        self.prompt = PromptTemplate.from_template(template)
-        self.llm = llm
-        self.sequence = self.prompt | self.llm
+    prompt_name = 'resource_analysis_prompt.txt'
+
+    def __init__(self, llm, history=None, policy=None):
+        self.llm = install_usage_callback(llm)
+        # Optional `DecisionHistory`; decisions are then logged and reviewed for flapping.
+        self.history = history
+        if history is not None and policy is None:
+            from k8s_balancer.core.decision_history import HysteresisPolicy
+
+            policy = HysteresisPolicy()
+        self.policy = policy
+        self._sequence = None
+        self.prompt_version = None
+        # Compile now so a missing prompt fails at construction rather than on the first pod.
+        self._compile()
+
+    @property
+    def sequence(self):
+        return self._compile()[0]
+
+    def _compile(self):
+        """`(prompt | LLM chain, prompt version)`, rebuilt only when the registry hands out a new version."""
+        prompt = get_prompt(self.prompt_name)
+        if prompt.version != self.prompt_version:
+            self.prompt = prompt.template
+            self._sequence = self.prompt | self.llm
+            self.prompt_version = prompt.version
+        return self._sequence, prompt.version
 
     def analyze_pod(self, pod_snapshot):
         """Transform metrics into a deterministic action decision."""
+        decision = self._analyze_pod(pod_snapshot)
+        if self.history is not None:
+            decision = self._review([(decision, pod_snapshot)])[0]
+        return decision
+
+    def _review(self, pairs):
+        """Hold back flapping actions and log every `(decision, snapshot)` pair in one batch."""
+        reviewed = []
+        for decision, snapshot in pairs:
+            if self.policy is not None:
+                decision = self.policy.review(decision, snapshot, self.history)
+            reviewed.append(decision)
+        self.history.record_many([(decision['name'], decision) for decision in reviewed])
+        return reviewed
+
+    def _analyze_pod(self, pod_snapshot):
+        name = pod_snapshot.get('name', 'unknown')
         context = json.dumps(pod_snapshot)
         parsed_llm = None
+        version = None
         try:
-            response = self.sequence.invoke({'pod_snapshot': context})
-            if response:
-                if hasattr(response, 'content'):
-                    raw = response.content
-                else:
-                    raw = response
-                if isinstance(raw, str) and raw.strip():
-                    parsed_llm = json.loads(raw)
+            # Past the run's token budget the rules below decide on their own.
+            if not budget_exhausted():
+                # The version that answered, even if the prompt is reloaded before we return.
+                sequence, version = self._compile()
+                with usage_scope('decision_engine', pod=name):
+                    response = sequence.invoke({'pod_snapshot': context})
+                if response:
+                    if hasattr(response, 'content'):
+                        raw = response.content
+                    else:
+                        raw = response
+                    if isinstance(raw, str) and raw.strip():
+                        parsed_llm = json.loads(raw)
         except Exception:
             parsed_llm = None
 
-        name = pod_snapshot.get('name', 'unknown')
-        metrics = pod_snapshot.get('metrics', {}) or {}
-        description = pod_snapshot.get('description', {}) or {}
-
         if 'metrics' not in pod_snapshot:
             fallback = FALLBACK_DECISIONS.get(name)
             if fallback:
@@ -76,83 +198,58 @@ class DecisionEngine:
                 result.update(fallback)
                 return result
             if parsed_llm:
-                return {
-                    'name': name,
-                    'classification': parsed_llm.get('classification', 'healthy'),
-                    'recommended_action': parsed_llm.get('recommended_action', 'skip'),
-                    'reason': parsed_llm.get('reason', 'LLM suggested outcome'),
-                }
-            return {
-                'name': name,
-                'classification': 'healthy',
-                'recommended_action': 'skip',
-                'reason': 'healthy',
-            }
-
-        cpu_metrics = metrics.get('cpu', {}) or {}
-        memory_metrics = metrics.get('memory', {}) or {}
-        oom_metrics = metrics.get('oom_kills', {}) or {}
-
-        cpu_avg = cpu_metrics.get('avg') or 0
-        cpu_p95 = cpu_metrics.get('p95') or 0
-        mem_avg = memory_metrics.get('avg') or 0
-        mem_p95 = memory_metrics.get('p95') or 0
-        oom_avg = oom_metrics.get('avg') or 0
-
-        mem_limit_value = _parse_memory(description.get('mem_limit'))
-        if mem_limit_value and mem_avg and mem_avg <= 1:
-            mem_avg = mem_avg / mem_limit_value * 100
-        if mem_limit_value and mem_p95 and mem_p95 <= 1:
-            mem_p95 = mem_p95 / mem_limit_value * 100
-
-        has_metrics = any([
-            bool(cpu_metrics),
-            bool(memory_metrics),
-            bool(oom_metrics),
-        ])
-
-        if not has_metrics and parsed_llm:
-            return {
-                'name': name,
-                'classification': parsed_llm.get('classification', 'healthy'),
-                'recommended_action': parsed_llm.get('recommended_action', 'skip'),
-                'reason': parsed_llm.get('reason', 'LLM suggested outcome'),
-            }
-
-        overloaded = oom_avg >= 3 or mem_avg > 90
-        inconsistent = (
-            (cpu_avg < 30 and cpu_p95 > 80)
-            or (mem_avg < 30 and mem_p95 > 80)
+                return self._llm_decision(name, parsed_llm, version)
+            return _decision(name, 'healthy', 'skip', 'healthy')
+
+        if not _has_metrics(pod_snapshot) and parsed_llm:
+            return self._llm_decision(name, parsed_llm, version)
+        return evaluate_pod(pod_snapshot)
+
+    def analyze_pods(self, pod_snapshots, workers=None):
+        """Classify a batch of pods, sharding the rule evaluation across processes.
+
+        Pods without metrics still go through `analyze_pod` so the LLM can weigh in.
+        """
+        pod_snapshots = list(pod_snapshots)
+        ruled = [index for index, snapshot in enumerate(pod_snapshots) if _has_metrics(snapshot)]
+        results = [None] * len(pod_snapshots)
+        if ruled:
+            from k8s_balancer.core.sharded_engine import classify_sharded
+
+            decisions = classify_sharded([pod_snapshots[index] for index in ruled], workers=workers)
+            for index, decision in zip(ruled, decisions):
+                results[index] = decision
+        for index, snapshot in enumerate(pod_snapshots):
+            if results[index] is None:
+                results[index] = self._analyze_pod(snapshot)
+        if self.history is not None:
+            results = self._review(list(zip(results, pod_snapshots)))
+        return results
+
+    def analyze_table(self, table, workers=None):
+        """Classify every row of a `PodTable` directly from its metric columns."""
+        from k8s_balancer.core.sharded_engine import classify_columns, decisions_from_codes
+
+        codes = classify_columns(table.engine_columns(), workers=workers)
+        decisions = decisions_from_codes(table.names, codes)
+        for index in range(len(table)):
+            if not table.has_metrics(index):
+                decisions[index] = self._analyze_pod(table[index].to_dict())
+        if self.history is not None:
+            # Only actionable rows need their metrics back as dicts for the policy.
+            pairs = [
+                (decision, table[index].to_dict() if decision['recommended_action'] != 'skip' else {})
+                for index, decision in enumerate(decisions)
+            ]
+            decisions = self._review(pairs)
+        return decisions
+
+    def _llm_decision(self, name, parsed_llm, version):
+        decision = _decision(
+            name,
+            parsed_llm.get('classification', 'healthy'),
+            parsed_llm.get('recommended_action', 'skip'),
+            parsed_llm.get('reason', 'LLM suggested outcome'),
         )
-        idle = cpu_avg < 20 and mem_avg < 20
-
-        if overloaded:
-            return {
-                'name': name,
-                'classification': 'overloaded',
-                'recommended_action': 'increase_memory_limit',
-                'reason': 'Memory usage near limits or frequent OOM events',
-            }
-
-        if inconsistent:
-            return {
-                'name': name,
-                'classification': 'inconsistent',
-                'recommended_action': 'escalate_inconsistent',
-                'reason': 'Inconsistent metrics detected with large p95 spikes despite low averages',
-            }
-
-        if idle:
-            return {
-                'name': name,
-                'classification': 'idle',
-                'recommended_action': 'decrease_requests',
-                'reason': 'Sustained low CPU and memory consumption',
-            }
-
-        return {
-            'name': name,
-            'classification': 'healthy',
-            'recommended_action': 'skip',
-            'reason': 'healthy',
-        }
+        decision['prompt_version'] = version
+        return decision
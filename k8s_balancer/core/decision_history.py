@@ -0,0 +1,253 @@
+"""SQLite history of decisions and applied changes, plus the cooldown/hysteresis policy.
+
+Without memory between runs, a pod hovering around a threshold flips every cycle:
+shrunk as idle, overloaded once the smaller request bites, grown again. Every flip
+is an update and a rollout. `DecisionHistory` records what was decided and what was
+applied, per pod. `HysteresisPolicy` consults it before an action goes out:
+
+- cooldown: no second change to a pod within `cooldown` seconds of the last one;
+- hysteresis: reversing the last change (shrinking after a grow or the reverse)
+  needs the metrics past the threshold by `band` percentage points.
+
+OOM-driven growth is a safety action and bypasses both.
+
+Rows are indexed on `(pod, timestamp)`, so the last N decisions for a pod come from
+an index range scan whatever the table size.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from k8s_balancer.core import decision_engine
+from k8s_balancer.core.metrics_store import parse_window
+from k8s_balancer.core.quantity import parse_cpu, parse_memory
+
+
+DEFAULT_COOLDOWN = 6 * 3600
+DEFAULT_BAND = 5.0
+
+# Direction of each resource-changing action; escalations and skips change nothing.
+ACTION_DIRECTIONS = {
+    'increase_memory_limit': 1,
+    'increase_requests': 1,
+    'adjust_requests': 0,
+    'decrease_requests': -1,
+}
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS decisions (
+    id INTEGER PRIMARY KEY,
+    pod TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    run_id TEXT,
+    classification TEXT,
+    action TEXT,
+    reason TEXT,
+    applied INTEGER NOT NULL DEFAULT 0,
+    changes TEXT
+);
+CREATE INDEX IF NOT EXISTS decisions_pod_time ON decisions (pod, timestamp);
+CREATE INDEX IF NOT EXISTS decisions_pod_applied_time ON decisions (pod, applied, timestamp);
+'''
+
+_COLUMNS = ('pod', 'timestamp', 'run_id', 'classification', 'action', 'reason', 'applied', 'changes')
+
+
+def _row(record):
+    entry = dict(zip(('id',) + _COLUMNS, record))
+    entry['applied'] = bool(entry['applied'])
+    entry['changes'] = json.loads(entry['changes']) if entry['changes'] else None
+    return entry
+
+
+class DecisionHistory:
+    """Append-only decision log; safe to share between the event loop and worker threads."""
+
+    def __init__(self, path=':memory:'):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        if path != ':memory:':
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.executescript(_SCHEMA)
+
+    @classmethod
+    def from_env(cls):
+        """History at K8S_BALANCER_HISTORY_DB, or None when unset."""
+        path = os.environ.get('K8S_BALANCER_HISTORY_DB')
+        return cls(path) if path else None
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def _values(self, pod, decision, applied, changes, run_id, timestamp):
+        return (
+            pod,
+            time.time() if timestamp is None else timestamp,
+            run_id,
+            decision.get('classification'),
+            decision.get('recommended_action'),
+            decision.get('reason'),
+            1 if applied else 0,
+            json.dumps(changes) if changes else None,
+        )
+
+    def record(self, pod, decision, applied=False, changes=None, run_id=None, timestamp=None):
+        with self._lock, self._connection:
+            self._connection.execute(
+                'INSERT INTO decisions (%s) VALUES (?, ?, ?, ?, ?, ?, ?, ?)' % ', '.join(_COLUMNS),
+                self._values(pod, decision, applied, changes, run_id, timestamp),
+            )
+
+    def record_many(self, decisions, run_id=None, timestamp=None):
+        """Record `(pod, decision)` pairs in one transaction."""
+        timestamp = time.time() if timestamp is None else timestamp
+        rows = [self._values(pod, decision, False, None, run_id, timestamp) for pod, decision in decisions]
+        with self._lock, self._connection:
+            self._connection.executemany(
+                'INSERT INTO decisions (%s) VALUES (?, ?, ?, ?, ?, ?, ?, ?)' % ', '.join(_COLUMNS), rows,
+            )
+        return len(rows)
+
+    def record_applied(self, pod, action, changes, run_id=None, timestamp=None):
+        """Log a change that actually went out (the server calls this on `update_resources`)."""
+        decision = {'recommended_action': action, 'reason': 'applied'}
+        self.record(pod, decision, applied=True, changes=changes, run_id=run_id, timestamp=timestamp)
+
+    def last(self, pod, limit=5, applied_only=False):
+        """Most recent rows for `pod`, newest first."""
+        query = 'SELECT id, %s FROM decisions WHERE pod = ?' % ', '.join(_COLUMNS)
+        if applied_only:
+            query += ' AND applied = 1'
+        query += ' ORDER BY timestamp DESC, id DESC LIMIT ?'
+        with self._lock:
+            rows = self._connection.execute(query, (pod, limit)).fetchall()
+        return [_row(row) for row in rows]
+
+    def last_applied(self, pod):
+        rows = self.last(pod, limit=1, applied_only=True)
+        return rows[0] if rows else None
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM decisions').fetchone()[0]
+
+
+def _direction(field, old, new):
+    """-1, 0 or 1 for a change of one resource field; None when either side is unknown."""
+    parse = parse_cpu if field.startswith('cpu_') else parse_memory
+    old, new = parse(old), parse(new)
+    if old is None or new is None:
+        return None
+    return (new > old) - (new < old)
+
+
+def applied_action(changes, current=None):
+    """Map an `update_resources` payload to the playbook action it carries out.
+
+    Each changed field is compared with `current`, the pod's resources before the
+    update. Requests that only went down are `decrease_requests`, only up
+    `increase_requests`; mixed or unknown directions are `adjust_requests`.
+    """
+    changes = changes or {}
+    current = current or {}
+    directions = {field: _direction(field, current.get(field), value) for field, value in changes.items() if value}
+    requests = [directions[field] for field in ('cpu_request', 'mem_request') if field in directions]
+    if requests:
+        if all(direction is not None and direction <= 0 for direction in requests) and min(requests) < 0:
+            return 'decrease_requests'
+        if all(direction is not None and direction >= 0 for direction in requests) and max(requests) > 0:
+            return 'increase_requests'
+        return 'adjust_requests'
+    if directions.get('mem_limit') == 1:
+        return 'increase_memory_limit'
+    return 'update_resources'
+
+
+def _percent_of_limit(value, limit):
+    if limit and value and value <= 1:
+        return value / limit * 100
+    return value or 0
+
+
+class HysteresisPolicy:
+    """Holds back actions that would undo or repeat a recent change too soon."""
+
+    def __init__(self, cooldown=DEFAULT_COOLDOWN, band=DEFAULT_BAND):
+        self.cooldown = _seconds(cooldown)
+        self.band = float(band)
+
+    @classmethod
+    def from_env(cls):
+        """K8S_BALANCER_COOLDOWN ('6h', '30m' or seconds) and K8S_BALANCER_HYSTERESIS_BAND (points)."""
+        return cls(
+            cooldown=os.environ.get('K8S_BALANCER_COOLDOWN') or DEFAULT_COOLDOWN,
+            band=os.environ.get('K8S_BALANCER_HYSTERESIS_BAND') or DEFAULT_BAND,
+        )
+
+    def _oom_driven(self, metrics):
+        oom = (metrics or {}).get('oom_kills') or {}
+        return (oom.get('avg') or 0) >= decision_engine.OOM_KILL_THRESHOLD
+
+    def _clears_band(self, action, metrics, description):
+        metrics = metrics or {}
+        limit = parse_memory((description or {}).get('mem_limit'))
+        cpu_avg = (metrics.get('cpu') or {}).get('avg') or 0
+        mem_avg = _percent_of_limit((metrics.get('memory') or {}).get('avg'), limit)
+        if action == 'decrease_requests':
+            threshold = decision_engine.IDLE_PCT - self.band
+            return cpu_avg < threshold and mem_avg < threshold
+        if action == 'increase_memory_limit':
+            return mem_avg > decision_engine.MEMORY_OVERLOAD_PCT + self.band
+        return True
+
+    def review(self, decision, snapshot, history, now=None):
+        """Return `decision`, or a `skip` decision explaining why it is being held.
+
+        Held decisions keep their classification and carry the blocked action under
+        `held_action`.
+        """
+        action = decision.get('recommended_action')
+        direction = ACTION_DIRECTIONS.get(action)
+        if direction is None or history is None:
+            return decision
+        name = decision.get('name') or snapshot.get('name')
+        metrics = snapshot.get('metrics') or {}
+        if direction > 0 and self._oom_driven(metrics):
+            return decision
+        last = history.last_applied(name)
+        if last is None:
+            return decision
+        now = time.time() if now is None else now
+        age = now - last['timestamp']
+        if age < self.cooldown:
+            return self._held(decision, 'cooldown: %s applied %s ago' % (last['action'], _age(age)))
+        last_direction = ACTION_DIRECTIONS.get(last['action'])
+        if last_direction == -direction and not self._clears_band(action, metrics, snapshot.get('description')):
+            return self._held(decision, 'hysteresis: would reverse %s within the %.0f-point band' % (last['action'], self.band))
+        return decision
+
+    def _held(self, decision, reason):
+        held = dict(decision)
+        held['held_action'] = decision.get('recommended_action')
+        held['recommended_action'] = 'skip'
+        held['reason'] = reason
+        return held
+
+
+def _seconds(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return parse_window(value)
+
+
+def _age(seconds):
+    if seconds >= 3600:
+        return '%.1fh' % (seconds / 3600)
+    return '%dm' % (seconds // 60)
@@ -0,0 +1,202 @@
+"""Columnar binary fixture/state format that the MCP server memory-maps.
+
+Layout (little endian)::
+
+    magic      8 bytes  b'K8SBFIX1'
+    sections   4 x u64  header, descriptions, keys and values section sizes
+    header     JSON     pods, updates, slack_messages, jira_issues, events, stat names
+    descr.     JSON     pod -> description, parsed on first access
+    keys       UTF-8    one 'pod\\tmetric\\twindow' line per metric series
+    values     f64      len(keys) x len(stats) matrix, NaN for a missing stat
+
+Only the small header is decoded on open. The key index is built on the first
+metric lookup and values are read straight from the mapping, so a 100k-pod
+cluster starts serving without parsing hundreds of MB of JSON.
+"""
+
+import json
+import math
+import mmap
+import struct
+from array import array
+from collections.abc import Mapping, MutableMapping
+
+
+MAGIC = b'K8SBFIX1'
+STATS = ('avg', 'p95')
+
+_SECTIONS = struct.Struct('<4Q')
+_ALIGN = 8
+
+
+def is_binary_fixture(path):
+    with open(path, 'rb') as handle:
+        return handle.read(len(MAGIC)) == MAGIC
+
+
+def _stats_for(metrics):
+    names = list(STATS)
+    for payload in metrics.values():
+        for stat in payload or {}:
+            if stat not in names:
+                names.append(stat)
+    return names
+
+
+def _padding(offset):
+    return (-offset) % _ALIGN
+
+
+def write_binary_fixtures(fixtures, path):
+    """Write fixtures (tuple-keyed metrics) in the columnar binary format."""
+    metrics = fixtures.get('metrics', {})
+    stats = _stats_for(metrics)
+    header = json.dumps({
+        'pods': fixtures.get('pods', {}),
+        'updates': fixtures.get('updates', []),
+        'slack_messages': fixtures.get('slack_messages', []),
+        'jira_issues': fixtures.get('jira_issues', []),
+        'events': fixtures.get('events', []),
+        'stats': stats,
+    }).encode('utf-8')
+    descriptions = json.dumps(dict(fixtures.get('descriptions', {}))).encode('utf-8')
+    keys = '\n'.join('%s\t%s\t%s' % key for key in metrics).encode('utf-8')
+    values = array('d')
+    for payload in metrics.values():
+        payload = payload or {}
+        for stat in stats:
+            value = payload.get(stat)
+            values.append(math.nan if value is None else value)
+
+    prefix = len(MAGIC) + _SECTIONS.size + len(header) + len(descriptions) + len(keys)
+    keys += b'\n' * _padding(prefix)
+    with open(path, 'wb') as handle:
+        handle.write(MAGIC)
+        handle.write(_SECTIONS.pack(len(header), len(descriptions), len(keys), len(values) * values.itemsize))
+        handle.write(header)
+        handle.write(descriptions)
+        handle.write(keys)
+        values.tofile(handle)
+
+
+def _number(value):
+    return int(value) if value.is_integer() else value
+
+
+class MappedMetrics(MutableMapping):
+    """`(pod, metric, window) -> {stat: value}` mapping over the values section.
+
+    The mapped file is read-only; writes (e.g. scripted events bumping a pod's OOM
+    count) land in an in-memory overlay that shadows the file.
+    """
+
+    def __init__(self, buffer, keys_slice, values_slice, stats):
+        self._buffer = buffer
+        self._keys_slice = keys_slice
+        self._values = memoryview(buffer)[values_slice].cast('d')
+        self._stats = stats
+        self._index = None
+        self._overrides = {}
+        self._deleted = set()
+
+    def _keys(self):
+        if self._index is None:
+            blob = bytes(self._buffer[self._keys_slice]).decode('utf-8').rstrip('\n')
+            lines = blob.split('\n') if blob else []
+            self._index = {tuple(line.split('\t')): row for row, line in enumerate(lines)}
+        return self._index
+
+    def _row(self, row):
+        width = len(self._stats)
+        payload = {}
+        for offset, stat in enumerate(self._stats):
+            value = self._values[row * width + offset]
+            if not math.isnan(value):
+                payload[stat] = _number(value)
+        return payload
+
+    def __getitem__(self, key):
+        key = tuple(key)
+        if key in self._overrides:
+            return self._overrides[key]
+        if key in self._deleted:
+            raise KeyError(key)
+        return self._row(self._keys()[key])
+
+    def __setitem__(self, key, value):
+        key = tuple(key)
+        self._deleted.discard(key)
+        self._overrides[key] = value
+
+    def __delitem__(self, key):
+        key = tuple(key)
+        if key not in self:
+            raise KeyError(key)
+        self._overrides.pop(key, None)
+        self._deleted.add(key)
+
+    def __iter__(self):
+        for key in self._keys():
+            if key not in self._overrides and key not in self._deleted:
+                yield key
+        yield from self._overrides
+
+    def __len__(self):
+        mapped = sum(1 for key in self._keys() if key not in self._overrides and key not in self._deleted)
+        return mapped + len(self._overrides)
+
+    def __contains__(self, key):
+        key = tuple(key)
+        if key in self._overrides:
+            return True
+        return key not in self._deleted and key in self._keys()
+
+
+class LazyDescriptions(Mapping):
+    """Pod descriptions decoded from the mapped file on first access."""
+
+    def __init__(self, buffer, section):
+        self._buffer = buffer
+        self._section = section
+        self._data = None
+
+    def _load(self):
+        if self._data is None:
+            self._data = json.loads(bytes(self._buffer[self._section]).decode('utf-8'))
+        return self._data
+
+    def __getitem__(self, pod):
+        return self._load()[pod]
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self):
+        return len(self._load())
+
+
+def load_binary_fixtures(path):
+    """Memory-map a binary fixture file; metrics and descriptions load lazily."""
+    with open(path, 'rb') as handle:
+        buffer = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    if buffer[:len(MAGIC)] != MAGIC:
+        raise ValueError('Not a binary fixture file: %s' % path)
+    offset = len(MAGIC)
+    header_size, descriptions_size, keys_size, values_size = _SECTIONS.unpack_from(buffer, offset)
+    offset += _SECTIONS.size
+    header = json.loads(buffer[offset:offset + header_size].decode('utf-8'))
+    offset += header_size
+    descriptions = slice(offset, offset + descriptions_size)
+    offset += descriptions_size
+    keys = slice(offset, offset + keys_size)
+    offset += keys_size
+    values = slice(offset, offset + values_size)
+    return {
+        'pods': header.get('pods', {'default': []}),
+        'descriptions': LazyDescriptions(buffer, descriptions),
+        'metrics': MappedMetrics(buffer, keys, values, header.get('stats', list(STATS))),
+        'updates': header.get('updates', []),
+        'slack_messages': header.get('slack_messages', []),
+        'jira_issues': header.get('jira_issues', []),
+        'events': header.get('events', []),
+    }
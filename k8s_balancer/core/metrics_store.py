@@ -0,0 +1,356 @@
+"""In-process time-series store behind `k8s_query_metrics`.
+
+Each `(pod, metric)` series keeps a ring buffer of raw samples plus rollup rings
+at several resolutions. Every rollup bucket holds a count, a sum and a t-digest,
+so a window query merges a bounded number of buckets (at most the ring size of
+the chosen rollup) no matter how many samples were ingested. Window edges are
+aligned to bucket boundaries of the chosen rollup.
+"""
+
+import json
+import math
+import re
+from array import array
+
+
+# (bucket width in seconds, buckets kept): 1h of 1m, 24h of 5m, 7d of 1h.
+ROLLUPS = ((60, 60), (300, 288), (3600, 168))
+RAW_CAPACITY = 720
+MIN_BUCKETS = 12
+COMPRESSION = 100
+BUCKET_COMPRESSION = 50
+
+# Counters are answered with the number of events in the window, matching the
+# fixtures' `oom_kills` shape, rather than an average of per-sample increments.
+COUNTER_METRICS = ('oom_kills',)
+
+_EMPTY = -2 ** 62
+
+_WINDOW = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([smhdw])\s*$')
+_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+
+def parse_window(window):
+    """Return seconds for '30m', '1h', '24h', '7d'; raise ValueError otherwise."""
+    if isinstance(window, (int, float)):
+        return float(window)
+    match = _WINDOW.match(str(window))
+    if not match:
+        raise ValueError('Unsupported metrics window: %s' % window)
+    return float(match.group(1)) * _UNITS[match.group(2)]
+
+
+class TDigest:
+    """Merging t-digest: mergeable quantile sketch with tight tails."""
+
+    __slots__ = ('compression', 'means', 'weights', 'count', 'min', 'max', '_buffer')
+
+    def __init__(self, compression=COMPRESSION):
+        self.compression = compression
+        self.means = []
+        self.weights = []
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._buffer = []
+
+    def add(self, value, weight=1):
+        self._buffer.append((value, weight))
+        self.count += weight
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if len(self._buffer) >= 4 * self.compression:
+            self._compress()
+
+    def merge(self, other):
+        if not other.count:
+            return self
+        self._buffer.extend(zip(other.means, other.weights))
+        self._buffer.extend(other._buffer)
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        if len(self._buffer) >= 4 * self.compression:
+            self._compress()
+        return self
+
+    def _compress(self):
+        if not self._buffer:
+            return
+        points = sorted(list(zip(self.means, self.weights)) + self._buffer)
+        self._buffer = []
+        means = []
+        weights = []
+        seen = 0
+        mean, weight = points[0]
+        for value, value_weight in points[1:]:
+            proposed = weight + value_weight
+            q = (seen + proposed / 2) / self.count
+            if proposed <= max(1, 4 * self.count * q * (1 - q) / self.compression):
+                mean += (value - mean) * value_weight / proposed
+                weight = proposed
+            else:
+                means.append(mean)
+                weights.append(weight)
+                seen += weight
+                mean, weight = value, value_weight
+        means.append(mean)
+        weights.append(weight)
+        self.means = means
+        self.weights = weights
+
+    def quantile(self, q):
+        self._compress()
+        if not self.count:
+            return None
+        means, weights = self.means, self.weights
+        if len(means) == 1:
+            return means[0]
+        target = q * self.count
+        center = weights[0] / 2
+        if target < center:
+            return self.min + (means[0] - self.min) * target / center
+        for index in range(len(means) - 1):
+            next_center = center + (weights[index] + weights[index + 1]) / 2
+            if target <= next_center:
+                fraction = (target - center) / (next_center - center)
+                return means[index] + fraction * (means[index + 1] - means[index])
+            center = next_center
+        tail = weights[-1] / 2
+        return means[-1] + (self.max - means[-1]) * min(1, (target - center) / tail)
+
+    def to_list(self):
+        self._compress()
+        return [self.means, self.weights, self.min, self.max]
+
+    @classmethod
+    def from_list(cls, payload, compression=COMPRESSION):
+        digest = cls(compression)
+        digest.means, digest.weights, digest.min, digest.max = payload
+        digest.count = sum(digest.weights)
+        return digest
+
+
+class _Rollup:
+    """Ring of fixed-width buckets; a slot is reused once its bucket falls out of range."""
+
+    __slots__ = ('width', 'capacity', 'ids', 'counts', 'totals', 'digests')
+
+    def __init__(self, width, capacity):
+        self.width = width
+        self.capacity = capacity
+        self.ids = array('q', [_EMPTY]) * capacity
+        self.counts = array('d', [0.0]) * capacity
+        self.totals = array('d', [0.0]) * capacity
+        self.digests = [None] * capacity
+
+    @property
+    def span(self):
+        return self.width * self.capacity
+
+    def add(self, timestamp, value):
+        bucket = int(timestamp // self.width)
+        slot = bucket % self.capacity
+        if self.ids[slot] != bucket:
+            if self.ids[slot] > bucket:
+                return
+            self.ids[slot] = bucket
+            self.counts[slot] = 0.0
+            self.totals[slot] = 0.0
+            self.digests[slot] = TDigest(BUCKET_COMPRESSION)
+        self.counts[slot] += 1
+        self.totals[slot] += value
+        self.digests[slot].add(value)
+
+    def slots(self, now, seconds):
+        last = int(now // self.width)
+        buckets = min(self.capacity, max(1, math.ceil(seconds / self.width)))
+        for bucket in range(last - buckets + 1, last + 1):
+            slot = bucket % self.capacity
+            if self.ids[slot] == bucket:
+                yield slot
+
+
+class _Series:
+    __slots__ = ('raw_times', 'raw_values', 'raw_next', 'rollups', 'last_timestamp')
+
+    def __init__(self, rollups, raw_capacity):
+        self.raw_times = array('d')
+        self.raw_values = array('d')
+        self.raw_next = 0
+        self.rollups = [_Rollup(width, capacity) for width, capacity in rollups]
+        self.last_timestamp = -math.inf
+
+    def add(self, timestamp, value, raw_capacity):
+        if len(self.raw_times) < raw_capacity:
+            self.raw_times.append(timestamp)
+            self.raw_values.append(value)
+        else:
+            self.raw_times[self.raw_next] = timestamp
+            self.raw_values[self.raw_next] = value
+            self.raw_next = (self.raw_next + 1) % raw_capacity
+        for rollup in self.rollups:
+            rollup.add(timestamp, value)
+        if timestamp > self.last_timestamp:
+            self.last_timestamp = timestamp
+
+    def choose_rollup(self, seconds):
+        """Coarsest rollup that covers the window with at least MIN_BUCKETS buckets."""
+        covering = [rollup for rollup in self.rollups if rollup.span >= seconds]
+        fine_enough = [rollup for rollup in covering if seconds / rollup.width >= MIN_BUCKETS]
+        if fine_enough:
+            return max(fine_enough, key=lambda rollup: rollup.width)
+        if covering:
+            return min(covering, key=lambda rollup: rollup.width)
+        return max(self.rollups, key=lambda rollup: rollup.span)
+
+
+class MetricsStore:
+    """Ring-buffered samples per `(pod, metric)` answering `{'avg', 'p95'}` for any window."""
+
+    def __init__(self, rollups=ROLLUPS, raw_capacity=RAW_CAPACITY):
+        self.rollups = tuple(tuple(rollup) for rollup in rollups)
+        self.raw_capacity = raw_capacity
+        self._series = {}
+        # `(pod, metric)` -> keys of the part series (a pod's containers) summed at query time.
+        self._parts = {}
+
+    def __len__(self):
+        return len(self.series())
+
+    def __contains__(self, key):
+        key = tuple(key)
+        return key in self._series or key in self._parts
+
+    def series(self):
+        keys = [key for key in self._series if len(key) == 2]
+        return keys + [key for key in self._parts if key not in self._series]
+
+    def add(self, pod, metric, timestamp, value, part=None):
+        key = (pod, metric) if part is None else (pod, metric, part)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = _Series(self.rollups, self.raw_capacity)
+            if part is not None:
+                self._parts.setdefault((pod, metric), []).append(key)
+        series.add(float(timestamp), float(value), self.raw_capacity)
+
+    def extend(self, samples):
+        """Add `(pod, metric, timestamp, value)` tuples; returns the number added."""
+        added = 0
+        for pod, metric, timestamp, value in samples:
+            self.add(pod, metric, timestamp, value)
+            added += 1
+        return added
+
+    def query(self, pod, metric, window, now=None):
+        """Return `{'avg', 'p95'}` over the trailing window, or None when nothing is stored.
+
+        `now` defaults to the series' newest sample so replayed dumps answer
+        relative to their own timeline. A series stored in parts answers with the
+        sum of its parts: exact for the average of aligned samples, and an upper
+        bound for the p95 that is reached when the parts peak together.
+        """
+        key = (pod, metric)
+        entries = [self._series[key]] if key in self._series else []
+        entries.extend(self._series[part] for part in self._parts.get(key, ()))
+        if not entries:
+            return None
+        seconds = parse_window(window)
+        now = max(entry.last_timestamp for entry in entries) if now is None else now
+        answers = [self._query_series(entry, metric, seconds, now) for entry in entries]
+        answers = [answer for answer in answers if answer is not None]
+        if not answers:
+            return None
+        return {'avg': _round(sum(avg for avg, _ in answers)), 'p95': _round(sum(p95 for _, p95 in answers))}
+
+    def _query_series(self, series, metric, seconds, now):
+        if not series.rollups or seconds < min(rollup.width for rollup in series.rollups):
+            return self._query_raw(series, metric, seconds, now)
+        rollup = series.choose_rollup(seconds)
+        digest = TDigest()
+        count = 0.0
+        total = 0.0
+        for slot in rollup.slots(now, seconds):
+            count += rollup.counts[slot]
+            total += rollup.totals[slot]
+            digest.merge(rollup.digests[slot])
+        if not count:
+            return None
+        if metric in COUNTER_METRICS:
+            return total, total
+        return total / count, digest.quantile(0.95)
+
+    def _query_raw(self, series, metric, seconds, now):
+        values = sorted(
+            value for timestamp, value in zip(series.raw_times, series.raw_values)
+            if now - seconds < timestamp <= now
+        )
+        if not values:
+            return None
+        if metric in COUNTER_METRICS:
+            return sum(values), sum(values)
+        rank = max(0, math.ceil(0.95 * len(values)) - 1)
+        return sum(values) / len(values), values[rank]
+
+    def to_dict(self):
+        series = []
+        for key, entry in self._series.items():
+            rollups = []
+            for rollup in entry.rollups:
+                buckets = [
+                    [rollup.ids[slot], rollup.counts[slot], rollup.totals[slot], rollup.digests[slot].to_list()]
+                    for slot in range(rollup.capacity)
+                    if rollup.ids[slot] != _EMPTY
+                ]
+                rollups.append(buckets)
+            order = list(range(entry.raw_next, len(entry.raw_times))) + list(range(entry.raw_next))
+            raw = [[entry.raw_times[index], entry.raw_values[index]] for index in order]
+            item = {
+                'pod': key[0],
+                'metric': key[1],
+                'last_timestamp': entry.last_timestamp,
+                'raw': raw,
+                'rollups': rollups,
+            }
+            if len(key) == 3:
+                item['part'] = key[2]
+            series.append(item)
+        return {'rollups': [list(rollup) for rollup in self.rollups], 'raw_capacity': self.raw_capacity, 'series': series}
+
+    @classmethod
+    def from_dict(cls, payload):
+        store = cls(payload.get('rollups', ROLLUPS), payload.get('raw_capacity', RAW_CAPACITY))
+        for item in payload.get('series', []):
+            key = (item['pod'], item['metric'])
+            if item.get('part') is not None:
+                store._parts.setdefault(key, []).append(key + (item['part'],))
+                key += (item['part'],)
+            entry = store._series[key] = _Series(store.rollups, store.raw_capacity)
+            entry.last_timestamp = item['last_timestamp']
+            for timestamp, value in item.get('raw', [])[-store.raw_capacity:]:
+                entry.raw_times.append(timestamp)
+                entry.raw_values.append(value)
+            for rollup, buckets in zip(entry.rollups, item.get('rollups', [])):
+                for bucket, count, total, digest in buckets:
+                    slot = bucket % rollup.capacity
+                    rollup.ids[slot] = bucket
+                    rollup.counts[slot] = count
+                    rollup.totals[slot] = total
+                    rollup.digests[slot] = TDigest.from_list(digest, BUCKET_COMPRESSION)
+        return store
+
+    def save(self, path):
+        with open(path, 'w') as handle:
+            json.dump(self.to_dict(), handle)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as handle:
+            return cls.from_dict(json.load(handle))
+
+
+def _round(value):
+    return round(value, 2)
@@ -0,0 +1,242 @@
+"""Compact pod records: slotted snapshots and a struct-of-arrays table for bulk data."""
+
+import sys
+from array import array
+
+from k8s_balancer.core.decision_engine import METRIC_NAMES
+from k8s_balancer.core.quantity import parse_memory
+
+
+METRIC_COLUMNS = (
+    ('cpu', 'avg', 'cpu_avg'),
+    ('cpu', 'p95', 'cpu_p95'),
+    ('memory', 'avg', 'mem_avg'),
+    ('memory', 'p95', 'mem_p95'),
+    ('oom_kills', 'avg', 'oom_avg'),
+    ('oom_kills', 'p95', 'oom_p95'),
+)
+
+RESOURCE_FIELDS = ('cpu_request', 'cpu_limit', 'mem_request', 'mem_limit')
+
+# Column name the sharded engine expects for each table column.
+ENGINE_COLUMNS = {
+    'cpu_avg': 'cpu_avg',
+    'cpu_p95': 'cpu_p95',
+    'mem_avg': 'mem_avg',
+    'mem_p95': 'mem_p95',
+    'oom_avg': 'oom_avg',
+    'mem_limit': 'mem_limit_mi',
+}
+
+
+def serialize_metrics(metrics):
+    """Flatten the tuple-keyed metrics mapping into JSON-friendly records."""
+    serialized = []
+    for (pod, metric, window), payload in metrics.items():
+        serialized.append({
+            'pod': pod,
+            'metric': metric,
+            'window': window,
+            'values': payload,
+        })
+    return serialized
+
+
+def deserialize_metrics(items):
+    """Inverse of `serialize_metrics`."""
+    return {(item['pod'], item['metric'], item['window']): item['values'] for item in items}
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class _PodRecord:
+    """Shared accessors for `PodSnapshot` and `PodRow`."""
+
+    __slots__ = ()
+
+    def has_metric(self, metric):
+        for name, stat, column in METRIC_COLUMNS:
+            if name == metric and getattr(self, column) is not None:
+                return True
+        return False
+
+    def to_dict(self):
+        """Render the nested dict shape accepted by `DecisionEngine`."""
+        metrics = {}
+        for metric, stat, column in METRIC_COLUMNS:
+            if not self.has_metric(metric):
+                continue
+            metrics.setdefault(metric, {})[stat] = getattr(self, column)
+        description = {}
+        for field in RESOURCE_FIELDS:
+            value = getattr(self, field)
+            if value is not None:
+                description[field] = value
+        return {'name': self.name, 'metrics': metrics, 'description': description}
+
+
+class PodSnapshot(_PodRecord):
+    """A single pod's metrics and resources without per-instance dicts."""
+
+    __slots__ = ('name',) + tuple(column for _, _, column in METRIC_COLUMNS) + RESOURCE_FIELDS
+
+    def __init__(self, name, **values):
+        self.name = name
+        for field in self.__slots__[1:]:
+            setattr(self, field, _intern(values.get(field)))
+
+    @classmethod
+    def from_dict(cls, snapshot):
+        metrics = snapshot.get('metrics', {}) or {}
+        description = snapshot.get('description', {}) or {}
+        values = {}
+        for metric, stat, column in METRIC_COLUMNS:
+            payload = metrics.get(metric)
+            if payload:
+                values[column] = payload.get(stat) or 0
+        for field in RESOURCE_FIELDS:
+            values[field] = description.get(field)
+        return cls(snapshot.get('name', 'unknown'), **values)
+
+    def __repr__(self):
+        return 'PodSnapshot(%r)' % self.name
+
+
+class PodRow(_PodRecord):
+    """Zero-copy view of one row in a `PodTable`."""
+
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table, index):
+        self._table = table
+        self._index = index
+
+    @property
+    def name(self):
+        return self._table.names[self._index]
+
+    def __getattr__(self, field):
+        table = self._table
+        if field in table.metric_columns:
+            if not table.present[field[:3]][self._index]:
+                return None
+            return table.metric_columns[field][self._index]
+        if field in table.resources:
+            return table.resources[field][self._index]
+        raise AttributeError(field)
+
+    def __repr__(self):
+        return 'PodRow(%r)' % self.name
+
+
+class PodTable:
+    """Struct-of-arrays container holding metrics and resources for many pods.
+
+    Metric values live in float64 `array` columns and resource strings are interned,
+    so 100k pods cost a few MB instead of a nested dict per pod. Missing metrics are
+    stored as 0 with a per-metric presence byte so the engine columns can be shared
+    without copying.
+    """
+
+    def __init__(self, window='24h'):
+        self.window = window
+        self.names = []
+        self.metric_columns = {column: array('d') for _, _, column in METRIC_COLUMNS}
+        self.present = {'cpu': bytearray(), 'mem': bytearray(), 'oom': bytearray()}
+        self.resources = {field: [] for field in RESOURCE_FIELDS}
+        self.mem_limit_mi = array('d')
+        self._index = None
+        self._parsed_limits = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        for index in range(len(self.names)):
+            yield PodRow(self, index)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.names)
+        if not 0 <= index < len(self.names):
+            raise IndexError(index)
+        return PodRow(self, index)
+
+    def row(self, name):
+        """Return the row view for a pod name."""
+        if self._index is None:
+            self._index = {pod: index for index, pod in enumerate(self.names)}
+        return PodRow(self, self._index[name])
+
+    def append(self, name, metrics, description):
+        """Append one pod given its per-metric payloads and description dict."""
+        self.names.append(name)
+        self._index = None
+        metrics = metrics or {}
+        description = description or {}
+        for metric, key in zip(METRIC_NAMES, ('cpu', 'mem', 'oom')):
+            self.present[key].append(1 if metrics.get(metric) else 0)
+        for metric, stat, column in METRIC_COLUMNS:
+            payload = metrics.get(metric) or {}
+            self.metric_columns[column].append(payload.get(stat) or 0)
+        for field in RESOURCE_FIELDS:
+            self.resources[field].append(_intern(description.get(field)))
+        self.mem_limit_mi.append(self._parse_limit(description.get('mem_limit')))
+
+    def _parse_limit(self, value):
+        parsed = self._parsed_limits.get(value)
+        if parsed is None:
+            parsed = parse_memory(value) or 0
+            self._parsed_limits[value] = parsed
+        return parsed
+
+    @classmethod
+    def from_fixtures(cls, fixtures, namespace=None, window='24h'):
+        """Build a table from server fixtures (tuple-keyed metrics plus descriptions)."""
+        table = cls(window=window)
+        if namespace is None:
+            pods = [pod for names in fixtures.get('pods', {}).values() for pod in names]
+        else:
+            pods = fixtures.get('pods', {}).get(namespace, []) or []
+        descriptions = fixtures.get('descriptions', {})
+        metrics = fixtures.get('metrics', {})
+        for pod in pods:
+            pod_metrics = {}
+            for metric in METRIC_NAMES:
+                values = metrics.get((pod, metric, window))
+                if values is not None:
+                    pod_metrics[metric] = values
+            table.append(pod, pod_metrics, descriptions.get(pod))
+        return table
+
+    @classmethod
+    def from_snapshots(cls, snapshots, window='24h'):
+        table = cls(window=window)
+        for snapshot in snapshots:
+            table.append(snapshot.get('name', 'unknown'), snapshot.get('metrics'), snapshot.get('description'))
+        return table
+
+    def has_metrics(self, index):
+        return bool(self.present['cpu'][index] or self.present['mem'][index] or self.present['oom'][index])
+
+    def engine_columns(self):
+        """Column mapping for `sharded_engine.classify_columns`; arrays are shared, not copied."""
+        columns = {}
+        for engine_name, column in ENGINE_COLUMNS.items():
+            columns[engine_name] = self.mem_limit_mi if column == 'mem_limit_mi' else self.metric_columns[column]
+        return columns
+
+    def metrics_mapping(self):
+        """Rebuild the server's tuple-keyed metrics mapping for this table's window."""
+        metrics = {}
+        for index, name in enumerate(self.names):
+            for metric, stat, column in METRIC_COLUMNS:
+                if self.present[column[:3]][index]:
+                    key = (name, metric, self.window)
+                    metrics.setdefault(key, {})[stat] = self.metric_columns[column][index]
+        return metrics
+
+    def serialize_metrics(self):
+        return serialize_metrics(self.metrics_mapping())
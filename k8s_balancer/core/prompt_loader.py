@@ -1,11 +1,91 @@
+import hashlib
 import os
+import re
+import threading
+
+
+PROMPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'prompts')
+
+_TOKEN_PATTERN = re.compile(r'\w+|[^\w\s]')
+_VARIABLE_PATTERN = re.compile(r'(?<!\{)\{(\w+)\}(?!\})')
+
+
+def estimate_tokens(text):
+    """Cheap, dependency-free token estimate (words and punctuation)."""
+    return len(_TOKEN_PATTERN.findall(text))
+
+
+class CompiledPrompt:
+    """A prompt file read once, with its version hash and static token count."""
+
+    def __init__(self, name, path, text, mtime_ns):
+        self.name = name
+        self.path = path
+        self.text = text
+        self.mtime_ns = mtime_ns
+        self.version = hashlib.sha256(text.encode('utf-8')).hexdigest()[:12]
+        self.variables = tuple(sorted(set(_VARIABLE_PATTERN.findall(text))))
+        self.static_tokens = estimate_tokens(_VARIABLE_PATTERN.sub(' ', text))
+        self._template = None
+        self._lock = threading.Lock()
+
+    @property
+    def template(self):
+        """LangChain `PromptTemplate`, compiled on first use and shared afterwards."""
+        if self._template is None:
+            with self._lock:
+                if self._template is None:
+                    from langchain.prompts import PromptTemplate
+
+                    self._template = PromptTemplate.from_template(self.text)
+        return self._template
+
+    def format(self, **values):
+        return self.text.format(**values)
+
+
+class PromptRegistry:
+    """Caches compiled prompts and reloads a file only when its mtime changes."""
+
+    def __init__(self, prompts_dir=None):
+        self.prompts_dir = prompts_dir or PROMPTS_DIR
+        self._prompts = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        path = os.path.join(self.prompts_dir, name)
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            raise RuntimeError('Prompt not found: %s' % name)
+        cached = self._prompts.get(name)
+        if cached is not None and cached.mtime_ns == mtime_ns:
+            return cached
+        with self._lock:
+            cached = self._prompts.get(name)
+            if cached is not None and cached.mtime_ns == mtime_ns:
+                return cached
+            with open(path) as handle:
+                text = handle.read().strip()
+            compiled = CompiledPrompt(name, path, text, mtime_ns)
+            self._prompts[name] = compiled
+            return compiled
+
+    def versions(self):
+        """Map of prompt name to version for every prompt loaded so far."""
+        return {name: prompt.version for name, prompt in self._prompts.items()}
+
+    def clear(self):
+        with self._lock:
+            self._prompts.clear()
+
+
+default_registry = PromptRegistry()
+
+
+def get_prompt(name):
+    return default_registry.get(name)
 
 
 def load_prompt_text(name):
-    repo_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-    prompts_dir = os.path.join(repo_root, 'prompts')
-    path = os.path.join(prompts_dir, name)
-    if not os.path.exists(path):
-        raise RuntimeError('Prompt not found: %s' % name)
-    with open(path) as handle:
-        return handle.read().strip()
+    return default_registry.get(name).text
@@ -0,0 +1,75 @@
+"""Kubernetes resource quantity parsing and formatting (CPU in millicores, memory in Mi)."""
+
+import math
+
+
+_MEMORY_UNITS = {
+    'Ki': 1 / 1024,
+    'Mi': 1,
+    'Gi': 1024,
+    'Ti': 1024 * 1024,
+    'K': 1000 / 1024 / 1024,
+    'M': 1000 * 1000 / 1024 / 1024,
+    'G': 1000 * 1000 * 1000 / 1024 / 1024,
+}
+
+
+def parse_cpu(value):
+    """Return millicores for '500m', '1', '1.5'; None when missing or malformed."""
+    if value is None or value == '':
+        return None
+    value = str(value).strip()
+    try:
+        if value.endswith('m'):
+            return float(value[:-1])
+        return float(value) * 1000
+    except ValueError:
+        return None
+
+
+def parse_memory(value):
+    """Return MiB for '512Mi', '1Gi', '1G'; bare numbers are taken as MiB like the engine does."""
+    if value is None or value == '':
+        return None
+    value = str(value).strip()
+    for suffix in ('Ki', 'Mi', 'Gi', 'Ti', 'K', 'M', 'G'):
+        if value.endswith(suffix):
+            try:
+                return float(value[:-len(suffix)]) * _MEMORY_UNITS[suffix]
+            except ValueError:
+                return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _trim(number, places):
+    text = ('%.' + str(places) + 'f') % number
+    return text.rstrip('0').rstrip('.') if '.' in text else text
+
+
+def format_cpu(millicores):
+    """Format millicores, rounding up to a whole millicore: 625 -> '625m', 2000 -> '2'."""
+    millicores = int(math.ceil(round(millicores, 6)))
+    if millicores % 1000 == 0 and millicores:
+        return str(millicores // 1000)
+    return '%dm' % millicores
+
+
+def format_memory(mebibytes):
+    """Format MiB as Gi when at least 1Gi (two decimals) otherwise whole Mi, rounding up."""
+    if mebibytes >= 1024:
+        gibibytes = math.ceil(round(mebibytes / 1024, 6) * 100) / 100
+        return '%sGi' % _trim(gibibytes, 2)
+    return '%dMi' % int(math.ceil(round(mebibytes, 6)))
+
+
+def scale_cpu(value, factor):
+    parsed = parse_cpu(value)
+    return None if parsed is None else format_cpu(parsed * factor)
+
+
+def scale_memory(value, factor):
+    parsed = parse_memory(value)
+    return None if parsed is None else format_memory(parsed * factor)
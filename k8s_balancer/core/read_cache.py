@@ -0,0 +1,133 @@
+"""Read-through cache for pod descriptions and metric queries.
+
+Multi-namespace sweeps, retries, the summary step and event-driven remediation
+re-read the same pod data within seconds of each other. `ReadCache` keeps each
+answer for a per-kind TTL (descriptions change only when we update them, metric
+windows move continuously), bounds the number of entries with LRU eviction and
+drops everything known about a pod once an update to it succeeds.
+
+Entries are indexed by pod so invalidation does not scan the cache. Loads run
+outside the lock; two threads missing on the same key may both load it, and a
+load that overlapped an invalidation of its pod is returned but not kept.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+DEFAULT_TTLS = {
+    'describe': 300.0,
+    'metrics': 30.0,
+}
+DEFAULT_MAX_ENTRIES = 10000
+
+
+class ReadCache:
+    def __init__(self, ttls=None, max_entries=DEFAULT_MAX_ENTRIES, clock=time.monotonic):
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.max_entries = max_entries
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._by_pod = {}
+        self._generations = {}
+        self._stats = {kind: {'hits': 0, 'misses': 0} for kind in self.ttls}
+        self.evictions = 0
+        self.invalidations = 0
+
+    @classmethod
+    def from_env(cls):
+        """K8S_BALANCER_CACHE_SIZE (0 disables, returning None) and K8S_BALANCER_CACHE_TTL_<KIND> seconds."""
+        size = int(os.environ.get('K8S_BALANCER_CACHE_SIZE') or DEFAULT_MAX_ENTRIES)
+        if size <= 0:
+            return None
+        ttls = {}
+        for kind in DEFAULT_TTLS:
+            value = os.environ.get('K8S_BALANCER_CACHE_TTL_%s' % kind.upper())
+            if value:
+                ttls[kind] = float(value)
+        return cls(ttls=ttls, max_entries=size)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _lookup(self, key, now):
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires, value = entry
+        if expires <= now:
+            self._remove(key)
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def _remove(self, key):
+        self._entries.pop(key, None)
+        pod = key[1]
+        keys = self._by_pod.get(pod)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_pod[pod]
+
+    def get_or_load(self, kind, pod, key, loader):
+        """Return the cached answer for `(kind, pod, key)` or call `loader()` and keep its result.
+
+        Exceptions from `loader` propagate and nothing is cached.
+        """
+        ttl = self.ttls.get(kind) or 0
+        cache_key = (kind, pod, key)
+        with self._lock:
+            found, value = self._lookup(cache_key, self.clock()) if ttl > 0 else (False, None)
+            self._stats.setdefault(kind, {'hits': 0, 'misses': 0})['hits' if found else 'misses'] += 1
+            generation = self._generations.get(pod, 0)
+        if found:
+            return value
+        value = loader()
+        if ttl > 0:
+            with self._lock:
+                if self._generations.get(pod, 0) != generation:
+                    return value
+                self._entries[cache_key] = (self.clock() + ttl, value)
+                self._entries.move_to_end(cache_key)
+                self._by_pod.setdefault(pod, set()).add(cache_key)
+                while len(self._entries) > self.max_entries:
+                    oldest = next(iter(self._entries))
+                    self._remove(oldest)
+                    self.evictions += 1
+        return value
+
+    def invalidate(self, *pods):
+        """Forget every entry for `pods`; returns how many were dropped."""
+        dropped = 0
+        with self._lock:
+            for pod in pods:
+                self._generations[pod] = self._generations.get(pod, 0) + 1
+                for key in list(self._by_pod.get(pod, ())):
+                    self._remove(key)
+                    dropped += 1
+            self.invalidations += dropped
+        return dropped
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_pod.clear()
+
+    def stats(self):
+        """Hits, misses and hit rate per kind, plus size and eviction counts."""
+        with self._lock:
+            kinds = {}
+            for kind, counts in self._stats.items():
+                total = counts['hits'] + counts['misses']
+                kinds[kind] = dict(counts, hit_rate=round(counts['hits'] / total, 4) if total else 0.0)
+            return {
+                'kinds': kinds,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
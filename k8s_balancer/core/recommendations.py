@@ -0,0 +1,181 @@
+"""Percentile-driven right-sizing: target requests and limits from the usage distribution.
+
+The playbook moves resources in fixed steps (+25% memory limit, -20% requests), so
+a pod that needs -70% converges over six updates and six rollouts. `RightSizer`
+computes the target directly instead:
+
+- `cpu_request`: CPU p95 usage plus `cpu_headroom`;
+- `mem_request`: memory p95 usage plus `memory_headroom`;
+- `mem_limit`: memory p99 usage (p95 when no p99 is recorded) plus `limit_headroom`.
+
+Usage is the percent-of-limit metric applied to the current limit. An OOM-killed
+pod's usage was clipped at its limit, so its limit never shrinks and grows at least
+by the playbook step. CPU limits are left alone; requests never exceed limits.
+
+Targets are rounded up to `CPU_STEP` / `MEMORY_STEP` and formatted as quantities.
+Changes under `min_change` are dropped to avoid churn, and `max_change` caps how far
+one cycle may move a field: with 0.5, a pod that needs -70% gets there in two updates.
+"""
+
+import math
+from functools import lru_cache
+
+from k8s_balancer.core import decision_engine
+from k8s_balancer.core.quantity import format_cpu, format_memory, parse_cpu, parse_memory
+from k8s_balancer.core.remediation import MEMORY_LIMIT_FACTOR
+
+
+CPU_HEADROOM = 0.15
+MEMORY_HEADROOM = 0.15
+LIMIT_HEADROOM = 0.25
+MIN_CHANGE = 0.1
+
+CPU_STEP = 10
+MEMORY_STEP = 16
+MIN_CPU = 10
+MIN_MEMORY = 32
+
+SIZED_FIELDS = ('cpu_request', 'mem_request', 'mem_limit')
+
+
+@lru_cache(maxsize=4096)
+def _cpu(value):
+    return parse_cpu(value)
+
+
+@lru_cache(maxsize=4096)
+def _memory(value):
+    return parse_memory(value)
+
+
+def _usage(payload, stat, limit):
+    """Absolute usage for a percent-of-limit statistic, or None when unknown."""
+    if not payload or not limit:
+        return None
+    value = payload.get(stat)
+    if stat == 'p99':
+        known = [sample for sample in (value, payload.get('p95')) if sample is not None]
+        value = max(known) if known else None
+    if value is None:
+        return None
+    return value / 100.0 * limit
+
+
+def _round_up(value, step):
+    return math.ceil(round(value / step, 6)) * step
+
+
+class RightSizer:
+    """Turns pod snapshots into target `cpu_request` / `mem_request` / `mem_limit`."""
+
+    def __init__(
+        self,
+        cpu_headroom=CPU_HEADROOM,
+        memory_headroom=MEMORY_HEADROOM,
+        limit_headroom=LIMIT_HEADROOM,
+        max_change=None,
+        min_change=MIN_CHANGE,
+    ):
+        self.cpu_headroom = float(cpu_headroom)
+        self.memory_headroom = float(memory_headroom)
+        self.limit_headroom = float(limit_headroom)
+        self.max_change = None if max_change is None else float(max_change)
+        self.min_change = float(min_change)
+
+    def _cap(self, target, current):
+        if self.max_change is None or not current:
+            return target, False
+        low = current * max(1 - self.max_change, 0)
+        high = current * (1 + self.max_change)
+        capped = min(max(target, low), high)
+        return capped, capped != target
+
+    def _targets(self, metrics, current):
+        cpu = metrics.get('cpu') or {}
+        memory = metrics.get('memory') or {}
+        targets = {}
+        cpu_p95 = _usage(cpu, 'p95', current['cpu_limit'])
+        if cpu_p95 is not None:
+            targets['cpu_request'] = max(cpu_p95 * (1 + self.cpu_headroom), MIN_CPU)
+        mem_p95 = _usage(memory, 'p95', current['mem_limit'])
+        if mem_p95 is not None:
+            targets['mem_request'] = max(mem_p95 * (1 + self.memory_headroom), MIN_MEMORY)
+        mem_p99 = _usage(memory, 'p99', current['mem_limit'])
+        if mem_p99 is not None:
+            limit = max(mem_p99 * (1 + self.limit_headroom), MIN_MEMORY)
+            oom = (metrics.get('oom_kills') or {}).get('avg') or 0
+            if oom:
+                limit = max(limit, current['mem_limit'] * MEMORY_LIMIT_FACTOR)
+            targets['mem_limit'] = limit
+        return targets
+
+    def recommend(self, snapshot):
+        """Recommendation for one snapshot, or None when every field is close enough.
+
+        Returns `{'pod', 'changes', 'current', 'target', 'capped'}`: `changes` is the
+        `update_resources` payload for this cycle, `target` the uncapped goal.
+        """
+        name = snapshot.get('name', 'unknown')
+        description = snapshot.get('description') or {}
+        current = {
+            'cpu_request': _cpu(description.get('cpu_request')),
+            'cpu_limit': _cpu(description.get('cpu_limit')),
+            'mem_request': _memory(description.get('mem_request')),
+            'mem_limit': _memory(description.get('mem_limit')),
+        }
+        targets = self._targets(snapshot.get('metrics') or {}, current)
+        steps = {'cpu_request': CPU_STEP, 'mem_request': MEMORY_STEP, 'mem_limit': MEMORY_STEP}
+
+        final = {}
+        capped = []
+        for field, target in targets.items():
+            value, was_capped = self._cap(target, current[field])
+            value = _round_up(value, steps[field])
+            existing = current[field]
+            if existing and abs(value - existing) < existing * self.min_change:
+                continue
+            final[field] = value
+            if was_capped:
+                capped.append(field)
+
+        # Keep request <= limit against whatever ends up in force.
+        mem_request = final.get('mem_request', current['mem_request'])
+        mem_limit = final.get('mem_limit', current['mem_limit'])
+        if mem_request and mem_limit and mem_limit < mem_request:
+            final['mem_limit'] = mem_request
+        cpu_request = final.get('cpu_request')
+        if cpu_request and current['cpu_limit'] and cpu_request > current['cpu_limit']:
+            final['cpu_request'] = current['cpu_limit']
+            if current['cpu_request'] == current['cpu_limit']:
+                del final['cpu_request']
+        if not final:
+            return None
+
+        formats = {'cpu_request': format_cpu, 'mem_request': format_memory, 'mem_limit': format_memory}
+        return {
+            'pod': name,
+            'changes': {field: formats[field](final[field]) for field in SIZED_FIELDS if field in final},
+            'current': {field: description.get(field) for field in SIZED_FIELDS},
+            'target': {field: formats[field](_round_up(targets[field], steps[field])) for field in SIZED_FIELDS if field in targets},
+            'capped': capped,
+        }
+
+    def recommend_many(self, snapshots):
+        """Recommendations for every snapshot that needs a change, in input order."""
+        recommendations = []
+        for snapshot in snapshots:
+            recommendation = self.recommend(snapshot)
+            if recommendation is not None:
+                recommendations.append(recommendation)
+        return recommendations
+
+
+def recommend_namespace(fixtures, namespace, window='24h', sizer=None):
+    """Batch right-sizing for every pod in `namespace` of the server fixtures."""
+    sizer = sizer or RightSizer()
+    return sizer.recommend_many(decision_engine.pod_snapshots_from_fixtures(fixtures, namespace, window=window))
+
+
+def as_update(recommendation):
+    """The `k8s_update_resources` arguments for a recommendation."""
+    return dict(recommendation['changes'], pod=recommendation['pod'])
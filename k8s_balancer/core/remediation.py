@@ -0,0 +1,85 @@
+"""Deterministic playbook actions: turn a decision into the MCP tool call that applies it."""
+
+from k8s_balancer.core.quantity import parse_cpu, parse_memory, scale_cpu, scale_memory
+from k8s_balancer.core.triage_queue import triage_namespace
+
+
+MEMORY_LIMIT_FACTOR = 1.25
+REQUEST_FACTOR = 0.8
+JIRA_PROJECT = 'PLAT'
+
+
+def _sized(action, description, recommendation):
+    """The part of a `RightSizer` recommendation that moves in the decision's direction."""
+    changes = (recommendation or {}).get('changes') or {}
+    if action == 'increase_memory_limit':
+        fields, grow = ('mem_limit',), True
+    else:
+        fields, grow = ('cpu_request', 'mem_request'), False
+    sized = {}
+    for field in fields:
+        parse = parse_cpu if field.startswith('cpu') else parse_memory
+        target = parse(changes.get(field))
+        current = parse(description.get(field))
+        if target is None or current is None:
+            continue
+        if (target > current) if grow else (target < current):
+            sized[field] = changes[field]
+    return sized
+
+
+def plan_remediation(decision, description, sizer=None, metrics=None):
+    """Return `(tool_name, arguments)` for the decision, or None when nothing should change.
+
+    With a `RightSizer` and the pod's `metrics`, resized fields take its percentile
+    targets instead of the fixed steps; fields it would move the other way are left alone.
+    """
+    pod = decision['name']
+    description = description or {}
+    action = decision.get('recommended_action')
+    if sizer is not None and action in ('increase_memory_limit', 'decrease_requests'):
+        recommendation = sizer.recommend({'name': pod, 'metrics': metrics, 'description': description})
+        sized = _sized(action, description, recommendation)
+        if not sized:
+            return None
+        return 'k8s_update_resources', dict(sized, pod=pod)
+    if action == 'increase_memory_limit':
+        mem_limit = scale_memory(description.get('mem_limit'), MEMORY_LIMIT_FACTOR)
+        if mem_limit is None:
+            return None
+        return 'k8s_update_resources', {'pod': pod, 'mem_limit': mem_limit}
+    if action == 'decrease_requests':
+        arguments = {
+            'pod': pod,
+            'cpu_request': scale_cpu(description.get('cpu_request'), REQUEST_FACTOR),
+            'mem_request': scale_memory(description.get('mem_request'), REQUEST_FACTOR),
+        }
+        arguments = {key: value for key, value in arguments.items() if value is not None}
+        if len(arguments) == 1:
+            return None
+        return 'k8s_update_resources', arguments
+    if action == 'escalate_inconsistent':
+        return 'jira_create_issue', {
+            'project': JIRA_PROJECT,
+            'title': 'Inconsistent metrics for %s' % pod,
+            'body': '%s. Pod %s shows low averages with high p95 spikes.' % (decision.get('reason', 'inconsistent metrics'), pod),
+        }
+    return None
+
+
+def plan_namespace(fixtures, namespace, window='24h', by_workload=False, sizer=None):
+    """Dry run: the `k8s_update_resources` payloads the playbook would send for `namespace`.
+
+    With a `RightSizer`, updates carry percentile targets instead of the fixed steps.
+    """
+    triage = triage_namespace(fixtures, namespace, window=window, by_workload=by_workload)
+    updates = []
+    for entry in triage['actionable']:
+        decision = {'name': entry['pod'], 'recommended_action': entry['recommended_action'], 'reason': entry['reason']}
+        plan = plan_remediation(decision, entry['resources'], sizer=sizer, metrics=entry['metrics'])
+        if plan is not None and plan[0] == 'k8s_update_resources':
+            update = dict(plan[1])
+            if entry.get('replicas'):
+                update['pods'] = list(entry['replicas'])
+            updates.append(update)
+    return updates
@@ -0,0 +1,101 @@
+"""Run state with the action log loaded eagerly and cluster-sized sections on demand.
+
+The server writes two files: the state file holds what a run did (pods, updates,
+Slack messages, Jira issues) and a `.resources` sidecar holds descriptions and
+serialized metrics. `RunState` reads the first straight away and the sidecar only
+when a heavy key is accessed.
+"""
+
+import json
+import os
+import weakref
+from collections.abc import MutableMapping
+
+
+ACTION_KEYS = ('pods', 'updates', 'slack_messages', 'jira_issues')
+HEAVY_KEYS = ('descriptions', 'metrics')
+
+
+def resources_path(state_file):
+    return '%s.resources' % state_file
+
+
+def _read_json(path):
+    with open(path) as handle:
+        return json.load(handle)
+
+
+class RunState(MutableMapping):
+    """Dict-like run state whose `descriptions`/`metrics` come from a loader on first access."""
+
+    def __init__(self, actions, loader=None):
+        self._data = dict(actions)
+        self._loader = loader
+        self.resources = None
+
+    @classmethod
+    def from_dict(cls, state):
+        return cls(state)
+
+    @classmethod
+    def from_files(cls, state_path, resources=None, owns_resources=False):
+        """Read the state file now; `resources` (the sidecar path) is read on first heavy access.
+
+        With `owns_resources` the sidecar is deleted once the RunState is garbage collected.
+        """
+        state = cls(_read_json(state_path))
+        if resources and os.path.exists(resources):
+            state.resources = resources
+            state._loader = lambda: _read_json(resources)
+            if owns_resources:
+                weakref.finalize(state, _remove_quietly, resources)
+        return state
+
+    @property
+    def loaded(self):
+        return self._loader is None
+
+    def _materialize(self):
+        if self._loader is not None:
+            loader, self._loader = self._loader, None
+            for key, value in loader().items():
+                self._data.setdefault(key, value)
+
+    def __getitem__(self, key):
+        if key in HEAVY_KEYS and key not in self._data:
+            self._materialize()
+        return self._data[key]
+
+    def __setitem__(self, key, value):
+        self._data[key] = value
+
+    def __delitem__(self, key):
+        if key in HEAVY_KEYS:
+            self._materialize()
+        del self._data[key]
+
+    def __contains__(self, key):
+        return key in self._data or (self._loader is not None and key in HEAVY_KEYS)
+
+    def __iter__(self):
+        yield from self._data
+        if self._loader is not None:
+            yield from (key for key in HEAVY_KEYS if key not in self._data)
+
+    def __len__(self):
+        return len(list(iter(self)))
+
+    def actions(self):
+        """Only the eager sections, as a plain dict (cheap to cache or pickle)."""
+        return {key: self._data[key] for key in ACTION_KEYS if key in self._data}
+
+    def to_dict(self):
+        self._materialize()
+        return dict(self._data)
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
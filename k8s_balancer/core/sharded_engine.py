@@ -0,0 +1,138 @@
+"""Process-pool classification over metric columns held in shared memory."""
+
+import functools
+import math
+import os
+from array import array
+
+from k8s_balancer.core.decision_engine import DECISION_TEMPLATES, classify_row
+from k8s_balancer.core.quantity import parse_memory
+
+
+COLUMNS = ('cpu_avg', 'cpu_p95', 'mem_avg', 'mem_p95', 'oom_avg', 'mem_limit')
+
+# Below this many pods the pool start-up costs more than it saves.
+MIN_PODS_PER_WORKER = 5000
+
+_ITEM_SIZE = array('d').itemsize
+
+
+@functools.lru_cache(maxsize=4096)
+def _cached_memory(value):
+    return parse_memory(value)
+
+
+def build_columns(pod_snapshots):
+    """Flatten snapshot dicts into column-major float64 arrays (names kept separately)."""
+    names = []
+    columns = {column: array('d') for column in COLUMNS}
+    for snapshot in pod_snapshots:
+        metrics = snapshot.get('metrics', {}) or {}
+        description = snapshot.get('description', {}) or {}
+        cpu = metrics.get('cpu', {}) or {}
+        memory = metrics.get('memory', {}) or {}
+        oom = metrics.get('oom_kills', {}) or {}
+        names.append(snapshot.get('name', 'unknown'))
+        columns['cpu_avg'].append(cpu.get('avg') or 0)
+        columns['cpu_p95'].append(cpu.get('p95') or 0)
+        columns['mem_avg'].append(memory.get('avg') or 0)
+        columns['mem_p95'].append(memory.get('p95') or 0)
+        columns['oom_avg'].append(oom.get('avg') or 0)
+        columns['mem_limit'].append(_cached_memory(description.get('mem_limit')) or 0)
+    return names, columns
+
+
+def _classify_slice(columns, codes, start, stop, count):
+    offsets = [index * count for index in range(len(COLUMNS))]
+    cpu_avg, cpu_p95, mem_avg, mem_p95, oom_avg, mem_limit = offsets
+    for row in range(start, stop):
+        codes[row] = classify_row(
+            columns[cpu_avg + row],
+            columns[cpu_p95 + row],
+            columns[mem_avg + row],
+            columns[mem_p95 + row],
+            columns[oom_avg + row],
+            columns[mem_limit + row],
+        )
+
+
+def _classify_shard(shm_name, count, start, stop):
+    # Pool workers inherit the parent's resource tracker, so attaching here does not
+    # transfer ownership; the parent unlinks the block once every shard is done.
+    from multiprocessing import shared_memory
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    columns = shm.buf[:count * len(COLUMNS) * _ITEM_SIZE].cast('d')
+    codes = shm.buf[count * len(COLUMNS) * _ITEM_SIZE:count * len(COLUMNS) * _ITEM_SIZE + count]
+    try:
+        _classify_slice(columns, codes, start, stop, count)
+    finally:
+        columns.release()
+        codes.release()
+        shm.close()
+    return stop - start
+
+
+def _shards(count, parts):
+    size = max(1, math.ceil(count / parts))
+    return [(start, min(start + size, count)) for start in range(0, count, size)]
+
+
+def classify_columns(columns, workers=None, min_pods_per_worker=MIN_PODS_PER_WORKER):
+    """Classify column data; returns a bytearray of codes in pod order."""
+    count = len(columns[COLUMNS[0]])
+    codes = bytearray(count)
+    if not count:
+        return codes
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, count // min_pods_per_worker or 1))
+    if workers == 1:
+        flat = array('d')
+        for column in COLUMNS:
+            flat.extend(columns[column])
+        _classify_slice(flat, codes, 0, count, count)
+        return codes
+
+    # The pool is only started for large tables, so its modules are loaded here.
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import shared_memory
+
+    data_size = count * len(COLUMNS) * _ITEM_SIZE
+    shm = shared_memory.SharedMemory(create=True, size=data_size + count)
+    try:
+        for index, column in enumerate(COLUMNS):
+            start = index * count * _ITEM_SIZE
+            shm.buf[start:start + count * _ITEM_SIZE] = columns[column].tobytes()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_classify_shard, shm.name, count, start, stop)
+                for start, stop in _shards(count, workers * 4)
+            ]
+            for future in futures:
+                future.result()
+        codes[:] = shm.buf[data_size:data_size + count]
+    finally:
+        shm.close()
+        shm.unlink()
+    return codes
+
+
+def decisions_from_codes(names, codes):
+    """Expand classification codes into the engine's decision dicts."""
+    results = []
+    for name, code in zip(names, codes):
+        classification, action, reason = DECISION_TEMPLATES[code]
+        results.append({
+            'name': name,
+            'classification': classification,
+            'recommended_action': action,
+            'reason': reason,
+        })
+    return results
+
+
+def classify_sharded(pod_snapshots, workers=None, min_pods_per_worker=MIN_PODS_PER_WORKER):
+    """Classify pod snapshots across a process pool; results come back in input order."""
+    names, columns = build_columns(pod_snapshots)
+    codes = classify_columns(columns, workers=workers, min_pods_per_worker=min_pods_per_worker)
+    return decisions_from_codes(names, codes)
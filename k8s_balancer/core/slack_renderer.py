@@ -0,0 +1,199 @@
+"""Deterministic Slack rendering for run summaries of any namespace size.
+
+The head message keeps the documented shape (header, JSON code block, Jira URLs)
+with one entry per line. Entries are sized one at a time while rendering, so
+nothing is re-serialized to measure. Past `max_chars`, the remaining entries go to
+follow-up messages meant to be posted in the head message's thread. Large skip
+lists collapse to per-reason counts.
+"""
+
+import json
+from collections import Counter
+
+
+HEADER = '✅ Resource Rebalance Completed'
+MAX_MESSAGE_CHARS = 3000
+MAX_INLINE_SKIPPED = 25
+LIST_KEYS = ('pods_rebalanced', 'pods_escalated', 'pods_skipped')
+SUMMARY_KEYS = ('namespace', 'pods_scanned') + LIST_KEYS
+
+_FENCE_OPEN = '```json\n'
+_FENCE_CLOSE = '\n```'
+
+
+def parse_summary(text):
+    """The JSON object in a Slack message's code block, or {} when there is none."""
+    if not text or '```' not in text:
+        return {}
+    payload = text.split('```')[1]
+    if payload.lower().startswith('json'):
+        payload = payload[4:].lstrip()
+    try:
+        summary = json.loads(payload)
+    except ValueError:
+        return {}
+    return summary if isinstance(summary, dict) else {}
+
+
+def is_summary(summary):
+    """True when `summary` has every documented field, with lists where lists belong."""
+    return (
+        bool(summary)
+        and all(key in summary for key in SUMMARY_KEYS)
+        and all(isinstance(summary[key], list) for key in LIST_KEYS)
+    )
+
+
+def collapse_skipped(skipped, limit=MAX_INLINE_SKIPPED):
+    """Keep short skip lists; replace long ones with `{'reason', 'count'}` aggregates."""
+    skipped = list(skipped or [])
+    if len(skipped) <= limit:
+        return skipped
+    counts = Counter(entry.get('reason', 'healthy') for entry in skipped)
+    return [{'reason': reason, 'count': count} for reason, count in counts.most_common()]
+
+
+def summarize_outcome(run_outcome, skipped_limit=MAX_INLINE_SKIPPED):
+    """Slack summary built straight from the run outcome, no LLM involved."""
+    skipped = run_outcome.get('pods_skipped', []) or []
+    summary = {
+        'namespace': run_outcome.get('namespace'),
+        'pods_scanned': run_outcome.get('pods_scanned', 0),
+        'pods_rebalanced': list(run_outcome.get('pods_rebalanced', []) or []),
+        'pods_escalated': list(run_outcome.get('pods_escalated', []) or []),
+        'pods_skipped': collapse_skipped(skipped, skipped_limit),
+    }
+    for key, value in run_outcome.items():
+        if key not in summary:
+            summary[key] = value
+    if len(skipped) > skipped_limit:
+        summary['counts'] = {key: len(run_outcome.get(key, []) or []) for key in LIST_KEYS}
+    return summary
+
+
+def _entry_line(entry):
+    return '    %s' % json.dumps(entry)
+
+
+def _render_json(scalars, lists):
+    """`{...}` with scalar fields first and one compact line per list entry."""
+    lines = ['{']
+    fields = ['  %s: %s' % (json.dumps(key), json.dumps(value)) for key, value in scalars]
+    for key, entries in lists:
+        if entries:
+            body = ',\n'.join(_entry_line(entry) for entry in entries)
+            fields.append('  %s: [\n%s\n  ]' % (json.dumps(key), body))
+        else:
+            fields.append('  %s: []' % json.dumps(key))
+    lines.append(',\n'.join(fields))
+    lines.append('}')
+    return '\n'.join(lines)
+
+
+def render_messages(summary, issues=(), max_chars=MAX_MESSAGE_CHARS, narrative=None):
+    """Return `[head, *follow_ups]`; every message stays within `max_chars` where possible.
+
+    The head always carries every scalar field and as many list entries as fit
+    (rebalanced first, then escalated, then skipped). Follow-ups continue each list
+    in order and hold any Jira URLs that did not fit. When lists are cut, the head
+    gains a `counts` field so readers see the totals up front. A `narrative` line,
+    when given, sits between the header and the JSON block of the head.
+    """
+    messages, truncated = _render(summary, issues, max_chars, narrative)
+    if truncated and 'counts' not in summary:
+        counted = dict(summary, counts={key: len(summary[key]) for key in LIST_KEYS if key in summary})
+        messages, _ = _render(counted, issues, max_chars, narrative)
+    return messages
+
+
+def _render(summary, issues, max_chars, narrative):
+    list_keys = [key for key in LIST_KEYS if key in summary] + [
+        key for key, value in summary.items() if key not in LIST_KEYS and isinstance(value, list)
+    ]
+    scalars = [(key, value) for key, value in summary.items() if key not in list_keys]
+    prefix = HEADER + ('\n' + narrative.strip() if narrative else '') + '\n' + _FENCE_OPEN
+    skeleton = _render_json(scalars, [(key, []) for key in list_keys])
+    budget = max_chars - len(prefix) - len(skeleton) - len(_FENCE_CLOSE)
+
+    head_lists = []
+    overflow = []
+    for key in list_keys:
+        entries = summary[key]
+        kept = []
+        if overflow:
+            # Keep reading order: once a list spills over, later lists follow it.
+            if entries:
+                overflow.append((key, entries, 0, len(entries)))
+            head_lists.append((key, kept))
+            continue
+        for index, entry in enumerate(entries):
+            # One entry line plus ',\n' (or the '[\n' / '\n  ]' wrapper for the first one).
+            cost = len(_entry_line(entry)) + (6 if not kept else 2)
+            if budget - cost < 0:
+                overflow.append((key, entries[index:], index, len(entries)))
+                break
+            kept.append(entry)
+            budget -= cost
+        head_lists.append((key, kept))
+
+    head = prefix + _render_json(scalars, head_lists) + _FENCE_CLOSE
+    urls = [issue.get('url') for issue in issues or [] if issue.get('url')]
+    pending_urls = []
+    for url in urls:
+        if not overflow and not pending_urls and len(head) + 1 + len(url) <= max_chars:
+            head += '\n' + url
+        else:
+            pending_urls.append(url)
+
+    follow_ups = []
+    for key, entries, offset, total in overflow:
+        follow_ups.extend(_chunk_list(key, entries, offset, total, max_chars))
+    follow_ups.extend(chunk_lines(pending_urls, 'Jira issues (continued)', max_chars))
+    return [head] + follow_ups, bool(overflow)
+
+
+def _chunk_list(key, entries, offset, total, max_chars):
+    messages = []
+    start = offset
+    while entries:
+        title = '↳ %s %d-%%d of %d' % (key, start + 1, total)
+        budget = max_chars - len(title % total) - len(_FENCE_OPEN) - len('[\n\n]') - len(_FENCE_CLOSE)
+        lines = []
+        for entry in entries:
+            line = _entry_line(entry)
+            cost = len(line) + (2 if lines else 0)
+            if lines and budget - cost < 0:
+                break
+            lines.append(line)
+            budget -= cost
+        entries = entries[len(lines):]
+        end = start + len(lines)
+        messages.append('%s\n%s[\n%s\n]%s' % (title % end, _FENCE_OPEN, ',\n'.join(lines), _FENCE_CLOSE))
+        start = end
+    return messages
+
+
+def chunk_lines(lines, title, max_chars=MAX_MESSAGE_CHARS):
+    """Pack plain text lines under `title` into as few messages as fit `max_chars`."""
+    messages = []
+    current = title
+    for line in lines:
+        if len(current) + 1 + len(line) > max_chars and current != title:
+            messages.append(current)
+            current = title
+        current += '\n' + line
+    if current != title:
+        messages.append(current)
+    return messages
+
+
+async def post_messages(session, channel, messages):
+    """Post the head message, then each follow-up in its thread; returns the Slack responses."""
+    if not messages:
+        return []
+    head = await session.call('slack_post_message', channel=channel, text=messages[0])
+    responses = [head]
+    thread_ts = (head or {}).get('ts')
+    for text in messages[1:]:
+        responses.append(await session.call('slack_post_message', channel=channel, text=text, thread_ts=thread_ts))
+    return responses
@@ -1,47 +1,96 @@
 import json
 
-from langchain.prompts import PromptTemplate
+from k8s_balancer.core.pod_model import RESOURCE_FIELDS
+from k8s_balancer.core.prompt_loader import get_prompt
+from k8s_balancer.core.remediation import plan_remediation
+from k8s_balancer.core.slack_renderer import LIST_KEYS, render_messages, summarize_outcome
+from k8s_balancer.core.usage import budget_exhausted, install_usage_callback, usage_scope
 
-from k8s_balancer.core.prompt_loader import load_prompt_text
+
+def outcome_from_table(namespace, table, decisions):
+    """Build the run outcome for `build_summary` from a `PodTable` and its decisions.
+
+    Entries have the runner's shape (`pod_name`, and `changed_fields` holding the
+    playbook's planned values for rebalanced pods), so a summary built here matches
+    one built from an agent run. Resource strings are read through row views, so no
+    per-pod dicts are materialized for healthy pods.
+    """
+    rebalanced = []
+    escalated = []
+    skipped = []
+    for index, decision in enumerate(decisions):
+        action = decision.get('recommended_action')
+        name = table.names[index]
+        if action in ('increase_memory_limit', 'decrease_requests'):
+            row = table[index]
+            description = {field: getattr(row, field) for field in RESOURCE_FIELDS}
+            plan = plan_remediation(dict(decision, name=name), description)
+            if plan is not None:
+                _, arguments = plan
+                changed = {key: value for key, value in arguments.items() if key != 'pod'}
+                rebalanced.append({'pod_name': name, 'changed_fields': changed})
+                continue
+        if action == 'escalate_inconsistent':
+            escalated.append({'pod_name': name, 'reason': 'inconsistent metrics'})
+        else:
+            skipped.append({'pod_name': name, 'reason': decision.get('reason', 'healthy')})
+    return {
+        'namespace': namespace,
+        'pods_scanned': len(table),
+        'pods_rebalanced': rebalanced,
+        'pods_escalated': escalated,
+        'pods_skipped': skipped,
+    }
 
 
 class SummaryBuilder:
-    """Responsible for transforming run results into a Slack JSON summary."""
+    """Responsible for transforming run results into a Slack JSON summary.
+
+    The summary itself is built deterministically; the optional `llm` only writes a
+    one-line narrative from the counts, never from the per-pod lists.
+    """
+
+    prompt_name = 'slack_narrative_prompt.txt'
 
-    def __init__(self, llm):
-        template = load_prompt_text('slack_summary_prompt.txt')
-        self.prompt = PromptTemplate.from_template(template)
-        self.llm = llm
-        self.sequence = self.prompt | self.llm
+    def __init__(self, llm=None):
+        self.llm = install_usage_callback(llm)
+        self._sequence = None
+        self.prompt_version = None
+        if self.llm is not None:
+            # Compile now so a missing prompt fails at construction rather than mid-run.
+            self._compile()
+
+    def _compile(self):
+        """`(prompt | LLM chain, prompt version)`, rebuilt only when the registry hands out a new version."""
+        prompt = get_prompt(self.prompt_name)
+        if prompt.version != self.prompt_version:
+            self.prompt = prompt.template
+            self._sequence = self.prompt | self.llm
+            self.prompt_version = prompt.version
+        return self._sequence, prompt.version
 
     def build_summary(self, run_outcome):
         """Return a deterministic JSON summary for Slack notifications."""
-        context = json.dumps(run_outcome)
-        llm_output = None
+        return json.dumps(summarize_outcome(run_outcome))
+
+    def narrative(self, summary):
+        """One short sentence about the run from its counts, or None without a usable LLM."""
+        if self.llm is None or budget_exhausted():
+            return None
+        counts = dict(summary.get('counts') or {key: len(summary.get(key) or []) for key in LIST_KEYS})
+        counts.update(namespace=summary.get('namespace'), pods_scanned=summary.get('pods_scanned', 0))
         try:
-            llm_output = self.sequence.invoke({'run_outcome': context})
+            sequence, _ = self._compile()
+            with usage_scope('summary_builder'):
+                llm_output = sequence.invoke({'summary_counts': json.dumps(counts)})
         except Exception:
-            llm_output = None
-
-        if llm_output:
-            if hasattr(llm_output, 'content'):
-                candidate = llm_output.content
-            else:
-                candidate = llm_output
-            candidate = candidate.strip()
-            try:
-                parsed = json.loads(candidate)
-                required = {'namespace', 'pods_scanned', 'pods_rebalanced', 'pods_escalated', 'pods_skipped'}
-                if isinstance(parsed, dict) and required.issubset(parsed.keys()):
-                    return candidate
-            except Exception:
-                pass
-
-        summary = {
-            'namespace': run_outcome.get('namespace'),
-            'pods_scanned': run_outcome.get('pods_scanned', 0),
-            'pods_rebalanced': run_outcome.get('pods_rebalanced', []),
-            'pods_escalated': run_outcome.get('pods_escalated', []),
-            'pods_skipped': run_outcome.get('pods_skipped', []),
-        }
-        return json.dumps(summary)
+            return None
+        text = getattr(llm_output, 'content', llm_output)
+        if not isinstance(text, str) or not text.strip():
+            return None
+        return text.strip().splitlines()[0][:300]
+
+    def render(self, run_outcome, issues=(), narrative=False):
+        """Slack messages for the run: the head message, then any threaded follow-ups."""
+        summary = summarize_outcome(run_outcome)
+        return render_messages(summary, issues, narrative=self.narrative(summary) if narrative else None)
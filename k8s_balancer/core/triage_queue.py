@@ -0,0 +1,199 @@
+"""Server-side triage and the severity-ordered queue that decides which pods go first."""
+
+from k8s_balancer.core.pod_model import PodTable
+from k8s_balancer.core.quantity import parse_memory
+from k8s_balancer.core.decision_engine import DECISION_TEMPLATES, HEALTHY
+from k8s_balancer.core.sharded_engine import classify_columns
+from k8s_balancer.core.workloads import workload_groups, workload_table
+
+
+OOM_WEIGHT = 10
+SPREAD_WEIGHT = 0.5
+
+ACTION_TOOLS = {
+    'increase_memory_limit': 'k8s_update_resources',
+    'decrease_requests': 'k8s_update_resources',
+    'escalate_inconsistent': 'jira_create_issue',
+}
+
+
+def _memory_pct(value, mem_limit):
+    if mem_limit and value and value <= 1:
+        return value / mem_limit * 100
+    return value
+
+
+def severity_score(metrics, description=None):
+    """Higher is more urgent: OOM kills dominate, then memory % of limit, then p95/avg spread."""
+    metrics = metrics or {}
+    cpu = metrics.get('cpu', {}) or {}
+    memory = metrics.get('memory', {}) or {}
+    oom = metrics.get('oom_kills', {}) or {}
+    mem_limit = parse_memory((description or {}).get('mem_limit'))
+    mem_avg = _memory_pct(memory.get('avg') or 0, mem_limit)
+    mem_p95 = _memory_pct(memory.get('p95') or 0, mem_limit)
+    spread = max((cpu.get('p95') or 0) - (cpu.get('avg') or 0), mem_p95 - mem_avg, 0)
+    return round(OOM_WEIGHT * (oom.get('avg') or 0) + mem_avg + SPREAD_WEIGHT * spread, 2)
+
+
+class TriageQueue:
+    """Orders actionable pods by severity, with pods deferred last cycle at the front."""
+
+    def __init__(self, entries, priority_pods=()):
+        priority = {pod: rank for rank, pod in enumerate(priority_pods or ())}
+        self.entries = sorted(
+            entries,
+            key=lambda entry: (
+                0 if entry['pod'] in priority else 1,
+                priority.get(entry['pod'], 0),
+                -entry['severity'],
+                entry['pod'],
+            ),
+        )
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def split(self, max_pods=None):
+        """Return `(scheduled, deferred)` for a budget of `max_pods` actions."""
+        if max_pods is None:
+            return list(self.entries), []
+        return self.entries[:max_pods], self.entries[max_pods:]
+
+
+def triage_namespace(
+    fixtures, namespace, window='24h', priority_pods=(), max_pods=None, by_workload=False, history=None, policy=None,
+    completed=None,
+):
+    """Apply the DecisionEngine thresholds server-side and return only pods that need action.
+
+    Healthy pods are reduced to a count so the agent's context scales with the number
+    of problems rather than the size of the namespace. Actionable pods come back in
+    severity order; anything past `max_pods` is listed under `deferred`. Pods with no
+    metrics at all are listed separately for the agent to inspect by hand.
+
+    With `by_workload`, replicas sharing an owner are aggregated first and each entry
+    is a workload key (e.g. `Deployment/checkout`) with its replica list.
+
+    With a `history` (a `DecisionHistory`), every actionable decision is recorded and
+    `policy` (a `HysteresisPolicy`) may hold it back; held pods are listed under
+    `held` with the reason instead of being scheduled.
+
+    Pods in `completed` (already acted on by the run being resumed) are listed under
+    `completed` instead of being scheduled again.
+    """
+    table = PodTable.from_fixtures(fixtures, namespace, window=window)
+    pods_scanned = len(table)
+    groups = None
+    if by_workload:
+        groups = workload_groups(fixtures, namespace)
+        table = workload_table(table, groups)
+    codes = classify_columns(table.engine_columns(), workers=1)
+    actionable = []
+    unmetered = []
+    healthy_count = 0
+    for index, code in enumerate(codes):
+        if not table.has_metrics(index):
+            unmetered.append(table.names[index])
+            continue
+        if code == HEALTHY:
+            healthy_count += 1
+            continue
+        row = table[index].to_dict()
+        classification, action, reason = DECISION_TEMPLATES[code]
+        entry = {
+            'pod': row['name'],
+            'classification': classification,
+            'recommended_action': action,
+            'reason': reason,
+            'severity': severity_score(row['metrics'], row['description']),
+            'resources': row['description'],
+            'metrics': row['metrics'],
+        }
+        if groups is not None:
+            entry['replicas'] = groups[row['name']]
+        actionable.append(entry)
+    done = []
+    if completed:
+        completed = set(completed)
+        pending = []
+        for entry in actionable:
+            if entry['pod'] in completed or any(pod in completed for pod in entry.get('replicas', ())):
+                done.append(entry['pod'])
+            else:
+                pending.append(entry)
+        actionable = pending
+    held = []
+    if history is not None:
+        actionable, held = _apply_history(actionable, history, policy)
+    scheduled, deferred = TriageQueue(actionable, priority_pods).split(max_pods)
+    result = {
+        'namespace': namespace,
+        'window': window,
+        'pods_scanned': pods_scanned,
+        'healthy_count': healthy_count,
+        'actionable': scheduled,
+        'deferred': [entry['pod'] for entry in deferred],
+        'pods_without_metrics': unmetered,
+    }
+    if groups is not None:
+        result['workloads_scanned'] = len(table)
+    if history is not None:
+        result['held'] = held
+    if completed:
+        result['completed'] = done
+    return result
+
+
+def _apply_history(actionable, history, policy):
+    """Split entries into `(actionable, held)` under `policy` and log every decision."""
+    kept = []
+    held = []
+    decisions = []
+    for entry in actionable:
+        decision = {
+            'name': entry['pod'],
+            'classification': entry['classification'],
+            'recommended_action': entry['recommended_action'],
+            'reason': entry['reason'],
+        }
+        if policy is not None:
+            snapshot = {'name': entry['pod'], 'metrics': entry['metrics'], 'description': entry['resources']}
+            decision = policy.review(decision, snapshot, history)
+        decisions.append((entry['pod'], decision))
+        if decision.get('held_action'):
+            held.append({'pod': entry['pod'], 'held_action': decision['held_action'], 'reason': decision['reason']})
+        else:
+            kept.append(entry)
+    history.record_many(decisions)
+    return kept, held
+
+
+def acted_on_pods(state, pods):
+    """Pods that received an update or a Jira escalation in this state snapshot.
+
+    A workload-level update counts for every replica it covered.
+    """
+    acted = set()
+    for update in state.get('updates', []) or []:
+        acted.add(update.get('pod'))
+        acted.update(update.get('pods') or ())
+    for issue in state.get('jira_issues', []) or []:
+        blob = ' '.join(str(issue.get(field, '')) for field in ('title', 'body'))
+        acted.update(pod for pod in pods if pod and pod in blob)
+    return acted
+
+
+def deferred_entries(fixtures, state, namespace, window='24h', priority_pods=()):
+    """Actionable pods, in queue order, that the run did not get to."""
+    pods = fixtures.get('pods', {}).get(namespace, []) or []
+    acted = acted_on_pods(state, pods)
+    triage = triage_namespace(fixtures, namespace, window=window, priority_pods=priority_pods)
+    return [
+        {'name': entry['pod'], 'classification': entry['classification'], 'severity': entry['severity']}
+        for entry in triage['actionable']
+        if entry['pod'] not in acted
+    ]
@@ -0,0 +1,238 @@
+"""Token, latency and cost accounting for LLM calls, with optional per-run budgets.
+
+A single LangChain callback handler is attached to each LLM once. It reports to
+whichever `UsageTracker` is active in the current context (a ContextVar, so
+concurrent runs in threads or tasks stay separate) and attributes every call to
+the enclosing `usage_scope(component, pod)`.
+"""
+
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import time
+import uuid
+
+
+# USD per million (prompt, completion) tokens; unknown models are costed at zero.
+MODEL_PRICES = {
+    'gpt-4o': (2.50, 10.00),
+    'gpt-4o-mini': (0.15, 0.60),
+    'gpt-4.1': (2.00, 8.00),
+    'gpt-4.1-mini': (0.40, 1.60),
+    'gpt-4.1-nano': (0.10, 0.40),
+}
+
+RUN_SCOPE = '(run)'
+
+_active_tracker = contextvars.ContextVar('k8s_balancer_usage_tracker', default=None)
+_active_scope = contextvars.ContextVar('k8s_balancer_usage_scope', default=('agent', None))
+
+
+class BudgetExceeded(RuntimeError):
+    """Raised before an LLM call once the active run's budget is spent."""
+
+
+def current_tracker():
+    return _active_tracker.get()
+
+
+def budget_exhausted():
+    tracker = _active_tracker.get()
+    return tracker is not None and tracker.exhausted()
+
+
+@contextlib.contextmanager
+def usage_scope(component, pod=None):
+    """Attribute LLM calls made inside the block to `component` (and `pod`)."""
+    token = _active_scope.set((component, pod))
+    try:
+        yield
+    finally:
+        _active_scope.reset(token)
+
+
+def _model_price(model, prices):
+    if model in prices:
+        return prices[model]
+    # Dated snapshots ('gpt-4o-mini-2024-07-18') share their family's price.
+    for name in sorted(prices, key=len, reverse=True):
+        if model and model.startswith(name):
+            return prices[name]
+    return (0.0, 0.0)
+
+
+class UsageTracker:
+    """Collects one record per LLM call and rolls them up per component and per pod."""
+
+    def __init__(self, max_tokens=None, max_cost=None, run_id=None, prices=None):
+        self.max_tokens = max_tokens
+        self.max_cost = max_cost
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.prices = dict(MODEL_PRICES if prices is None else prices)
+        self.records = []
+
+    @classmethod
+    def from_env(cls):
+        """Budgets from K8S_BALANCER_TOKEN_BUDGET / K8S_BALANCER_COST_BUDGET (USD)."""
+        tokens = os.environ.get('K8S_BALANCER_TOKEN_BUDGET')
+        cost = os.environ.get('K8S_BALANCER_COST_BUDGET')
+        return cls(max_tokens=int(tokens) if tokens else None, max_cost=float(cost) if cost else None)
+
+    @contextlib.contextmanager
+    def activate(self):
+        token = _active_tracker.set(self)
+        try:
+            yield self
+        finally:
+            _active_tracker.reset(token)
+
+    def cost(self, model, prompt_tokens, completion_tokens):
+        prompt_price, completion_price = _model_price(model, self.prices)
+        return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+    def record(self, model, prompt_tokens, completion_tokens, latency, component=None, pod=None):
+        if component is None:
+            component, scoped_pod = _active_scope.get()
+            pod = pod or scoped_pod
+        entry = {
+            'run_id': self.run_id,
+            'timestamp': time.time(),
+            'component': component,
+            'pod': pod,
+            'model': model,
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'latency_seconds': round(latency, 4),
+            'cost_usd': self.cost(model, prompt_tokens, completion_tokens),
+        }
+        self.records.append(entry)
+        return entry
+
+    def _rollup(self, records):
+        return {
+            'calls': len(records),
+            'prompt_tokens': sum(entry['prompt_tokens'] for entry in records),
+            'completion_tokens': sum(entry['completion_tokens'] for entry in records),
+            'total_tokens': sum(entry['prompt_tokens'] + entry['completion_tokens'] for entry in records),
+            'latency_seconds': round(sum(entry['latency_seconds'] for entry in records), 4),
+            'cost_usd': round(sum(entry['cost_usd'] for entry in records), 6),
+        }
+
+    def _grouped(self, field, default=None):
+        groups = {}
+        for entry in self.records:
+            groups.setdefault(entry[field] or default, []).append(entry)
+        return {key: self._rollup(records) for key, records in sorted(groups.items())}
+
+    def totals(self):
+        return self._rollup(self.records)
+
+    def by_component(self):
+        return self._grouped('component')
+
+    def by_pod(self):
+        """Per-pod rollups; calls not tied to a pod (agent turns, summaries) land under '(run)'."""
+        return self._grouped('pod', RUN_SCOPE)
+
+    def exhausted(self):
+        totals = self.totals()
+        if self.max_tokens is not None and totals['total_tokens'] >= self.max_tokens:
+            return True
+        return self.max_cost is not None and totals['cost_usd'] >= self.max_cost
+
+    def check(self):
+        if self.exhausted():
+            raise BudgetExceeded('LLM budget exhausted for run %s' % self.run_id)
+
+    def summary(self):
+        return {
+            'run_id': self.run_id,
+            'models': sorted({entry['model'] for entry in self.records if entry['model']}),
+            'totals': self.totals(),
+            'by_component': self.by_component(),
+            'by_pod': self.by_pod(),
+            'budget': {'max_tokens': self.max_tokens, 'max_cost': self.max_cost, 'exhausted': self.exhausted()},
+        }
+
+    def export(self, path):
+        """Append one JSON line per call, ready for a dashboard to ingest."""
+        with open(path, 'a') as handle:
+            for entry in self.records:
+                handle.write(json.dumps(entry) + '\n')
+
+
+def _token_usage(response):
+    """Return `(model, prompt_tokens, completion_tokens)` from an LLMResult."""
+    output = response.llm_output or {}
+    usage = output.get('token_usage') or {}
+    model = output.get('model_name')
+    prompt_tokens = usage.get('prompt_tokens')
+    completion_tokens = usage.get('completion_tokens')
+    if prompt_tokens is None:
+        prompt_tokens = completion_tokens = 0
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, 'message', None)
+                metadata = getattr(message, 'usage_metadata', None) or {}
+                prompt_tokens += metadata.get('input_tokens', 0)
+                completion_tokens += metadata.get('output_tokens', 0)
+                model = model or (getattr(message, 'response_metadata', None) or {}).get('model_name')
+    return model, prompt_tokens or 0, completion_tokens or 0
+
+
+@functools.lru_cache(maxsize=1)
+def _callback_class():
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class UsageCallback(BaseCallbackHandler):
+        """Reports each LLM call to the active tracker; refuses new calls past the budget."""
+
+        raise_error = True
+
+        def __init__(self):
+            self._started = {}
+
+        def _start(self, run_id, kwargs):
+            tracker = _active_tracker.get()
+            if tracker is None:
+                return
+            tracker.check()
+            params = kwargs.get('invocation_params') or {}
+            self._started[run_id] = (time.perf_counter(), params.get('model_name') or params.get('model'))
+
+        def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+            self._start(run_id, kwargs)
+
+        def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+            self._start(run_id, kwargs)
+
+        def on_llm_end(self, response, *, run_id, **kwargs):
+            started = self._started.pop(run_id, None)
+            tracker = _active_tracker.get()
+            if started is None or tracker is None:
+                return
+            model, prompt_tokens, completion_tokens = _token_usage(response)
+            tracker.record(model or started[1], prompt_tokens, completion_tokens, time.perf_counter() - started[0])
+
+        def on_llm_error(self, error, *, run_id, **kwargs):
+            self._started.pop(run_id, None)
+
+    return UsageCallback
+
+
+def install_usage_callback(llm):
+    """Attach the shared usage handler to a LangChain model once; returns the model."""
+    if llm is None or not hasattr(llm, 'callbacks'):
+        return llm
+    handler_class = _callback_class()
+    callbacks = llm.callbacks
+    if isinstance(callbacks, list):
+        if not any(isinstance(handler, handler_class) for handler in callbacks):
+            callbacks.append(handler_class())
+    elif callbacks is None:
+        llm.callbacks = [handler_class()]
+    elif not any(isinstance(handler, handler_class) for handler in getattr(callbacks, 'handlers', [])):
+        callbacks.add_handler(handler_class())
+    return llm
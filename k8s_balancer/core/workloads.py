@@ -0,0 +1,120 @@
+"""Owner-reference grouping: one decision and one update per workload, not per replica.
+
+Replicas of a Deployment/StatefulSet share a pod template, and a resource change is
+a template change anyway. A pod's owner comes from `owner_references` in its
+description (`[{'kind': 'ReplicaSet', 'name': 'checkout-7d9f8b6c4', 'controller': True}]`);
+ReplicaSets created by a Deployment fold into the Deployment by dropping their
+pod-template hash. Pods without an owner stay workloads of their own, keyed by their
+plain name, so clusters without owner data behave exactly as before.
+
+Workload keys look like `Deployment/checkout`; pod names never contain a '/'.
+"""
+
+from k8s_balancer.core.decision_engine import METRIC_NAMES
+from k8s_balancer.core.pod_model import METRIC_COLUMNS, PodTable
+
+
+# Alphabet Kubernetes uses for pod-template-hash suffixes (no vowels, no 0/1/3).
+_HASH_ALPHABET = frozenset('bcdfghjklmnpqrstvwxz2456789')
+_PRESENCE_KEYS = dict(zip(METRIC_NAMES, ('cpu', 'mem', 'oom')))
+
+
+def owner_of(pod, description):
+    """Return `(kind, name)` of the controller owning `pod`, or `('Pod', pod)`."""
+    references = (description or {}).get('owner_references') or []
+    if not references:
+        return 'Pod', pod
+    owner = next((reference for reference in references if reference.get('controller')), references[0])
+    kind = owner.get('kind') or 'Pod'
+    name = owner.get('name') or pod
+    if kind == 'ReplicaSet':
+        base, _, suffix = name.rpartition('-')
+        if base and 5 <= len(suffix) <= 10 and _HASH_ALPHABET.issuperset(suffix):
+            return 'Deployment', base
+    return kind, name
+
+
+def workload_key(pod, description):
+    kind, name = owner_of(pod, description)
+    if kind == 'Pod':
+        return pod
+    return '%s/%s' % (kind, name)
+
+
+def is_workload_key(name):
+    return isinstance(name, str) and '/' in name
+
+
+def group_workloads(pods, descriptions):
+    """`{workload_key: [pod, ...]}` in first-seen order."""
+    groups = {}
+    for pod in pods:
+        groups.setdefault(workload_key(pod, descriptions.get(pod)), []).append(pod)
+    return groups
+
+
+def workload_groups(fixtures, namespace=None):
+    """Group the pods of one namespace (or of every namespace) in server fixtures."""
+    if namespace is None:
+        pods = [pod for names in fixtures.get('pods', {}).values() for pod in names]
+    else:
+        pods = fixtures.get('pods', {}).get(namespace, []) or []
+    return group_workloads(pods, fixtures.get('descriptions', {}))
+
+
+def combine(metric, stat, values):
+    """Fold one statistic across replicas.
+
+    Every replica gets the same limit, so the hottest replica decides memory and OOM
+    risk; CPU averages pool across replicas while CPU p95 keeps the worst spike.
+    """
+    values = list(values)
+    if not values:
+        return None
+    if metric == 'cpu' and stat == 'avg':
+        return sum(values) / len(values)
+    return max(values)
+
+
+def aggregate_metric(metric, payloads):
+    """Combine per-replica `{'avg', 'p95'}` payloads for one metric; None if none had data."""
+    payloads = [payload for payload in payloads if payload]
+    if not payloads:
+        return None
+    stats = {}
+    for payload in payloads:
+        for stat, value in payload.items():
+            stats.setdefault(stat, []).append(value or 0)
+    return {stat: combine(metric, stat, values) for stat, values in stats.items()}
+
+
+def workload_table(table, groups):
+    """Collapse a pod-level `PodTable` into one row per workload.
+
+    Works column by column over the table's arrays; resources come from the first
+    replica, since replicas share the template.
+    """
+    positions = {name: index for index, name in enumerate(table.names)}
+    members = []
+    for key, pods in groups.items():
+        rows = [positions[pod] for pod in pods if pod in positions]
+        if rows:
+            members.append((key, rows))
+
+    combined = {}
+    for metric, stat, column in METRIC_COLUMNS:
+        values = table.metric_columns[column]
+        present = table.present[_PRESENCE_KEYS[metric]]
+        combined[column] = [
+            combine(metric, stat, [values[row] for row in rows if present[row]]) for _, rows in members
+        ]
+
+    result = PodTable(window=table.window)
+    for position, (key, rows) in enumerate(members):
+        metrics = {}
+        for metric, stat, column in METRIC_COLUMNS:
+            value = combined[column][position]
+            if value is not None:
+                metrics.setdefault(metric, {})[stat] = value
+        result.append(key, metrics, table[rows[0]].to_dict()['description'])
+    return result
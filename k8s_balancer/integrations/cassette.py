@@ -0,0 +1,188 @@
+"""Record/replay cassettes for LLM requests and MCP tool traffic.
+
+A cassette is a directory with one JSON file per recorded interaction, named by
+the hash of its normalized request. Separate files keep parallel test workers
+(`pytest -n`) from clobbering each other.
+
+A replayed run still goes through the agent turn by turn: each LLM request is
+served by `llm_cache()` and each MCP tool call by `guard()`, so a change to the
+prompts or the agent shows up as a miss instead of a stale result.
+
+Modes:
+    record  always talk to the live services and overwrite recordings
+    replay  serve recordings, fall back to live calls (and record them) on a miss
+    strict  serve recordings only; a miss raises `CassetteMissError`
+"""
+
+import functools
+import hashlib
+import json
+import os
+import re
+import tempfile
+
+
+MODES = ('off', 'record', 'replay', 'strict')
+
+_VOLATILE_PATTERNS = (
+    (re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}'), '<uuid>'),
+    (re.compile(r'\bcall_[A-Za-z0-9]+'), '<call-id>'),
+    (re.compile(r'\brun-<uuid>(-\d+)?'), '<run-id>'),
+    (re.compile(r'k8s_balancer_(state|fixtures|tools)_[A-Za-z0-9_]+\.(json|jsonl|k8sfix)'), '<tmpfile>'),
+    (re.compile(r'\s+'), ' '),
+)
+
+
+class CassetteMissError(RuntimeError):
+    """Raised in strict mode when a request has no recording."""
+
+
+def normalize_prompt(text):
+    """Strip per-run noise (ids, temp paths, whitespace) so equivalent requests hash alike."""
+    for pattern, replacement in _VOLATILE_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text.strip()
+
+
+def request_hash(*parts):
+    blob = '\n'.join(normalize_prompt(part if isinstance(part, str) else json.dumps(part, sort_keys=True, default=str)) for part in parts)
+    return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+
+class Cassette:
+    """Directory-backed store of recorded LLM generations and agent runs."""
+
+    def __init__(self, path, mode='replay'):
+        if mode not in MODES:
+            raise ValueError('Unknown cassette mode: %s' % mode)
+        self.path = path
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls):
+        """Build from K8S_BALANCER_CASSETTE / K8S_BALANCER_CASSETTE_MODE, or None when unset."""
+        path = os.environ.get('K8S_BALANCER_CASSETTE')
+        mode = os.environ.get('K8S_BALANCER_CASSETTE_MODE', 'replay')
+        if not path or mode == 'off':
+            return None
+        return cls(path, mode=mode)
+
+    @property
+    def replaying(self):
+        return self.mode in ('replay', 'strict')
+
+    def _entry_path(self, kind, key):
+        return os.path.join(self.path, '%s-%s.json' % (kind, key[:32]))
+
+    def lookup(self, kind, key):
+        """Return the recorded payload, None on a replay miss; strict misses raise."""
+        if not self.replaying:
+            return None
+        path = self._entry_path(kind, key)
+        if os.path.exists(path):
+            with open(path) as handle:
+                entry = json.load(handle)
+            if entry.get('key') == key:
+                self.hits += 1
+                return entry['payload']
+        self.misses += 1
+        if self.mode == 'strict':
+            raise CassetteMissError('No %s recording for %s in %s' % (kind, key[:12], self.path))
+        return None
+
+    def record(self, kind, key, payload):
+        os.makedirs(self.path, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, prefix='.%s-' % kind, suffix='.tmp')
+        with os.fdopen(fd, 'w') as handle:
+            json.dump({'key': key, 'payload': payload}, handle, indent=2, sort_keys=True, default=str)
+        os.replace(tmp_path, self._entry_path(kind, key))
+
+    def guard(self, connector):
+        """Route `connector.call_tool` through this cassette; returns the connector.
+
+        Calls are keyed by tool, arguments and how often that same call was made
+        before. A recorded call is still sent, so the server's action log is rebuilt,
+        but the agent gets the recorded result back.
+        """
+        if getattr(connector, '_cassette', None) is self:
+            return connector
+        call_tool = connector.call_tool
+        seen = {}
+
+        async def replayed(name, arguments, *args, **kwargs):
+            request = request_hash(name, arguments)
+            seen[request] = seen.get(request, 0) + 1
+            key = request_hash(name, arguments, seen[request])
+            recorded = self.lookup('tool', key)
+            result = await call_tool(name, arguments, *args, **kwargs)
+            if recorded is not None:
+                return _load_tool_result(recorded['result'])
+            if self.mode != 'strict':
+                self.record('tool', key, {'tool': name, 'arguments': arguments, 'result': _dump_tool_result(result)})
+            return result
+
+        connector.call_tool = replayed
+        connector._cassette = self
+        return connector
+
+    def llm_cache(self):
+        """LangChain cache that serves chat generations from this cassette."""
+        return _llm_cache_class()(self)
+
+
+def llm_identity(llm):
+    """Model identity that belongs in a cache key; never includes credentials."""
+    if llm is None:
+        return 'none'
+    model = getattr(llm, 'model_name', None) or getattr(llm, 'model', None) or type(llm).__name__
+    temperature = getattr(llm, 'temperature', None)
+    if isinstance(temperature, (int, float)):
+        # 0 and 0.0 are the same model settings; pydantic models coerce one into the other.
+        temperature = float(temperature)
+    return '%s:%s' % (model, temperature)
+
+
+def _dump_tool_result(result):
+    dump = getattr(result, 'model_dump', None)
+    return dump(mode='json') if dump is not None else result
+
+
+def _load_tool_result(payload):
+    if isinstance(payload, dict) and 'content' in payload:
+        from mcp.types import CallToolResult
+
+        return CallToolResult.model_validate(payload)
+    return payload
+
+
+@functools.lru_cache(maxsize=1)
+def _llm_cache_class():
+    from langchain_core.caches import BaseCache
+    from langchain_core.load import dumps, loads
+
+    class CassetteLLMCache(BaseCache):
+        """`BaseCache` adapter: LangChain passes the serialized prompt and model params."""
+
+        def __init__(self, cassette):
+            self.cassette = cassette
+
+        def lookup(self, prompt, llm_string):
+            payload = self.cassette.lookup('llm', request_hash(prompt, llm_string))
+            if payload is None:
+                return None
+            return [loads(generation) for generation in payload['generations']]
+
+        def update(self, prompt, llm_string, return_val):
+            if self.cassette.mode == 'strict':
+                return
+            self.cassette.record('llm', request_hash(prompt, llm_string), {
+                'prompt_hash': request_hash(prompt),
+                'generations': [dumps(generation) for generation in return_val],
+            })
+
+        def clear(self, **kwargs):
+            return None
+
+    return CassetteLLMCache
@@ -1,12 +1,24 @@
-from mcp_use import MCPClient
+from k8s_balancer.core.read_cache import ReadCache
 
 
 class KubernetesMCPClient:
-    """Thin wrapper over MCP tools exposed by the FastMCP server."""
+    """Thin wrapper over MCP tools exposed by the FastMCP server.
 
-    def __init__(self, endpoint=None):
+    `describe_pod` and `query_metrics` read through a `ReadCache` (configured from
+    the environment unless one is passed; `cache=False` disables it). A successful
+    `update_resources` drops the cached reads of the pod, along with its workload or
+    replicas when `list_workloads` has shown them.
+    """
+
+    def __init__(self, endpoint=None, cache=None):
         # Endpoint can be a unix socket or http url depending on FastMCP setup
+        from mcp_use import MCPClient
+
         self.client = MCPClient(endpoint)
+        self.cache = ReadCache.from_env() if cache is None else (cache or None)
+        # Workload membership from `list_workloads`, for invalidating in both directions.
+        self._workload_pods = {}
+        self._pod_workload = {}
 
     def list_pods(self, namespace):
         """Return pod names for the namespace. Provide mock data during tests."""
@@ -16,23 +28,70 @@ class KubernetesMCPClient:
             return []
         return items
 
+    def list_workloads(self, namespace):
+        """Return `{'workload', 'kind', 'name', 'replicas', 'pods'}` per owning controller.
+
+        The `workload` key can be passed anywhere a pod name is accepted below: reads
+        aggregate over the replicas and one update covers all of them.
+        """
+        response = self.client.call('mcp:k8s.list_workloads', {'namespace': namespace})
+        items = response.get('items') if isinstance(response, dict) else response
+        for item in items or []:
+            self._workload_pods[item['workload']] = list(item.get('pods') or [])
+            for pod in item.get('pods') or []:
+                self._pod_workload[pod] = item['workload']
+        return items or []
+
+    def triage_namespace(self, namespace, window='24h', by_workload=False):
+        """Return only overloaded, idle and inconsistent pods (or workloads) plus a healthy count."""
+        body = {'namespace': namespace, 'window': window}
+        if by_workload:
+            body['by_workload'] = True
+        return self.client.call('mcp:k8s.triage_namespace', body)
+
+    def watch_events(self, namespace, cursor=0):
+        """Return `{'events': [...], 'cursor': n}` for events delivered after `cursor`."""
+        return self.client.call('mcp:k8s.watch_events', {'namespace': namespace, 'cursor': cursor})
+
     def describe_pod(self, pod_name):
         """Fetch resource configuration for the given pod."""
-        return self.client.call('mcp:k8s.describe', {'pod': pod_name})
+        def load():
+            return self.client.call('mcp:k8s.describe', {'pod': pod_name})
+
+        if self.cache is None:
+            return load()
+        return self.cache.get_or_load('describe', pod_name, None, load)
 
     def query_metrics(self, pod_name, metric, window):
         """Fetch aggregated metrics for the pod."""
-        return self.client.call('mcp:k8s.metrics.query', {
-            'pod': pod_name,
-            'metric': metric,
-            'window': window,
-        })
+        def load():
+            return self.client.call('mcp:k8s.metrics.query', {
+                'pod': pod_name,
+                'metric': metric,
+                'window': window,
+            })
+
+        if self.cache is None:
+            return load()
+        return self.cache.get_or_load('metrics', pod_name, (metric, window), load)
 
     def update_resources(self, pod_name, payload):
         """Apply resource updates to the pod."""
         request_body = {'pod': pod_name}
         request_body.update(payload)
-        return self.client.call('mcp:k8s.update_resources', request_body)
+        response = self.client.call('mcp:k8s.update_resources', request_body)
+        # Held, failed or already-applied updates leave the pod as it was.
+        if self.cache is not None and (response or {}).get('status') == 'updated':
+            # A workload update changes every replica; a replica update changes the aggregate.
+            stale = [pod_name, *self._workload_pods.get(pod_name, ())]
+            if pod_name in self._pod_workload:
+                stale.append(self._pod_workload[pod_name])
+            self.cache.invalidate(*stale)
+        return response
+
+    def cache_stats(self):
+        """Hit rates of the read cache, or None when caching is off."""
+        return None if self.cache is None else self.cache.stats()
 
     def create_escalation(self, title, body):
         """Raise a Jira ticket for inconsistent pods."""
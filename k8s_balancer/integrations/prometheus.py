@@ -0,0 +1,214 @@
+"""Stream Prometheus/OpenMetrics text dumps into a `MetricsStore`.
+
+Files are read line by line (optionally gzip-compressed), so memory is bounded by
+the number of series, not the size of the dump. cAdvisor/kube-state-metrics series
+are mapped onto the balancer's metrics as percent-of-limit samples:
+
+    container_memory_working_set_bytes  -> memory     (bytes / memory limit)
+    container_cpu_usage_seconds_total   -> cpu        (counter rate / cpu limit)
+    container_oom_events_total          -> oom_kills  (counter increase)
+
+Limits come from the pod descriptions when given, otherwise from the dump's own
+`kube_pod_container_resource_limits` / `container_spec_memory_limit_bytes`. Those
+can appear anywhere in the file, so `ingest_file` reads it twice: a limits pass
+that only parses limit lines, then the usage pass. Limits are per pod, so each
+container's memory and CPU usage is stored as its share of the pod limit, one
+store part per container, and the store sums the parts when queried; nothing is
+held back between lines except one counter cursor per series.
+Only the text formats are understood; convert remote-read (protobuf) dumps with
+`promtool tsdb dump` first.
+"""
+
+import gzip
+import math
+import os
+import re
+import time
+
+from k8s_balancer.core.quantity import parse_cpu, parse_memory
+
+
+MEMORY_SERIES = 'container_memory_working_set_bytes'
+CPU_SERIES = 'container_cpu_usage_seconds_total'
+OOM_SERIES = 'container_oom_events_total'
+LIMIT_SERIES = ('kube_pod_container_resource_limits', 'container_spec_memory_limit_bytes')
+USAGE_SERIES = (MEMORY_SERIES, CPU_SERIES, OOM_SERIES)
+
+MIB = 1024 * 1024
+# Prometheus text uses millisecond timestamps, OpenMetrics uses seconds.
+MILLISECOND_THRESHOLD = 1e11
+
+_LINE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})?\s+(\S+)(?:\s+(\S+))?\s*$')
+_LABEL = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*=\s*"((?:[^"\\]|\\.)*)"')
+_SKIPPED_CONTAINERS = ('', 'POD')
+
+
+def _unescape(value):
+    if '\\' not in value:
+        return value
+    return value.replace('\\"', '"').replace('\\n', '\n').replace('\\\\', '\\')
+
+
+def parse_sample(line):
+    """Return `(name, labels, value, timestamp_seconds or None)` or None for comments/blank lines."""
+    if not line or line[0] == '#':
+        return None
+    match = _LINE.match(line)
+    if not match:
+        return None
+    name, labels, value, timestamp = match.groups()
+    labels = {key: _unescape(raw) for key, raw in _LABEL.findall(labels)} if labels else {}
+    if timestamp is not None:
+        timestamp = float(timestamp)
+        if timestamp > MILLISECOND_THRESHOLD:
+            timestamp /= 1000.0
+    return name, labels, float(value), timestamp
+
+
+def _metric_name(line):
+    return line.partition('{')[0].partition(' ')[0]
+
+
+def iter_lines(path):
+    """Yield decoded lines from a text or .gz dump without loading it into memory."""
+    opener = gzip.open if str(path).endswith('.gz') else open
+    with opener(path, 'rb') as handle:
+        for number, raw in enumerate(handle, 1):
+            try:
+                yield raw.decode('utf-8').rstrip('\r\n')
+            except UnicodeDecodeError:
+                raise ValueError(
+                    '%s:%d is not Prometheus text; remote-read (protobuf) dumps are not supported, '
+                    'convert them with `promtool tsdb dump` first' % (path, number)
+                )
+
+
+def limits_from_descriptions(descriptions):
+    """`{pod: {'cpu': millicores, 'memory': MiB}}` from fixture-style pod descriptions."""
+    limits = {}
+    for pod, description in dict(descriptions or {}).items():
+        description = description or {}
+        limits[pod] = {
+            'cpu': parse_cpu(description.get('cpu_limit')),
+            'memory': parse_memory(description.get('mem_limit')),
+        }
+    return limits
+
+
+def scan_limits(path, namespace=None):
+    """First pass: per-pod limits declared in the dump itself (summed over containers)."""
+    per_container = {}
+    for line in iter_lines(path):
+        if _metric_name(line) not in LIMIT_SERIES:
+            continue
+        sample = parse_sample(line)
+        if sample is None:
+            continue
+        name, labels, value, _ = sample
+        if namespace and labels.get('namespace') != namespace:
+            continue
+        if labels.get('container', '') in _SKIPPED_CONTAINERS or not labels.get('pod') or value <= 0:
+            continue
+        if name == 'container_spec_memory_limit_bytes':
+            resource = 'memory'
+        else:
+            resource = labels.get('resource')
+        if resource == 'memory':
+            per_container[(labels['pod'], labels['container'], 'memory')] = value / MIB
+        elif resource == 'cpu':
+            per_container[(labels['pod'], labels['container'], 'cpu')] = value * 1000
+    limits = {}
+    for (pod, _, resource), value in per_container.items():
+        pod_limits = limits.setdefault(pod, {'cpu': None, 'memory': None})
+        pod_limits[resource] = (pod_limits[resource] or 0) + value
+    return limits
+
+
+class PrometheusIngestor:
+    """Feeds mapped samples into a store; keeps one counter cursor per series."""
+
+    def __init__(self, store, limits, namespace=None, default_timestamp=None):
+        self.store = store
+        self.limits = limits
+        self.namespace = namespace
+        self.default_timestamp = time.time() if default_timestamp is None else default_timestamp
+        self._counters = {}
+        self.pods = {}
+        self.stats = {'lines': 0, 'samples': 0, 'stored': 0, 'skipped_no_limit': 0, 'skipped_other': 0}
+
+    def feed(self, line):
+        self.stats['lines'] += 1
+        if _metric_name(line) not in USAGE_SERIES:
+            return
+        sample = parse_sample(line)
+        if sample is None:
+            return
+        self.stats['samples'] += 1
+        name, labels, value, timestamp = sample
+        pod = labels.get('pod')
+        namespace = labels.get('namespace', 'default')
+        if (
+            not pod
+            or math.isnan(value)
+            or labels.get('container', '') in _SKIPPED_CONTAINERS
+            or (self.namespace and namespace != self.namespace)
+        ):
+            self.stats['skipped_other'] += 1
+            return
+        timestamp = self.default_timestamp if timestamp is None else timestamp
+        container = labels['container']
+        self.pods.setdefault(namespace, set()).add(pod)
+        if name == MEMORY_SERIES:
+            self._store_percent(pod, 'memory', container, timestamp, value / MIB)
+        elif name == CPU_SERIES:
+            rate = self._counter_delta((name, pod, container), timestamp, value, per_second=True)
+            if rate is not None:
+                self._store_percent(pod, 'cpu', container, timestamp, rate * 1000)
+        else:
+            increase = self._counter_delta((name, pod, container), timestamp, value)
+            if increase is not None:
+                self.store.add(pod, 'oom_kills', timestamp, increase)
+                self.stats['stored'] += 1
+
+    def _store_percent(self, pod, metric, container, timestamp, used):
+        limit = (self.limits.get(pod) or {}).get(metric)
+        if not limit:
+            self.stats['skipped_no_limit'] += 1
+            return
+        self.store.add(pod, metric, timestamp, used / limit * 100, part=container)
+        self.stats['stored'] += 1
+
+    def _counter_delta(self, key, timestamp, value, per_second=False):
+        previous = self._counters.get(key)
+        self._counters[key] = (timestamp, value)
+        if previous is None or timestamp <= previous[0]:
+            return None
+        delta = value - previous[1]
+        if delta < 0:
+            delta = value  # counter reset
+        return delta / (timestamp - previous[0]) if per_second else delta
+
+
+def ingest_file(path, store, descriptions=None, namespace=None, default_timestamp=None):
+    """Stream a dump into `store` and return an ingest report with throughput figures.
+
+    The file is read twice, limits first (see `scan_limits`), so the figures cover both passes.
+    """
+    started = time.perf_counter()
+    limits = scan_limits(path, namespace=namespace)
+    limits.update({pod: value for pod, value in limits_from_descriptions(descriptions).items() if any(value.values())})
+    ingestor = PrometheusIngestor(store, limits, namespace=namespace, default_timestamp=default_timestamp)
+    for line in iter_lines(path):
+        ingestor.feed(line)
+    seconds = time.perf_counter() - started
+    size = os.path.getsize(path)
+    return dict(
+        ingestor.stats,
+        path=str(path),
+        bytes=size,
+        seconds=round(seconds, 3),
+        samples_per_second=round(ingestor.stats['samples'] / seconds) if seconds else None,
+        megabytes_per_second=round(size / MIB / seconds, 2) if seconds else None,
+        series=len(store),
+        pods={namespace: sorted(pods) for namespace, pods in ingestor.pods.items()},
+    )
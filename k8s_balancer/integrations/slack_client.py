@@ -1,10 +1,9 @@
-from mcp_use import MCPClient
-
-
 class SlackMCPClient:
     """Handles Slack notifications through the MCP bridge."""
 
     def __init__(self, channel, endpoint=None):
+        from mcp_use import MCPClient
+
         self.channel = channel
         self.client = MCPClient(endpoint)
 
@@ -1,12 +1,35 @@
 """FastMCP server exposing mocked K8s, Slack, and Jira tools for the challenge."""
 
+import asyncio
 import copy
+import functools
+import itertools
 import json
 import os
+import sys
+import time
 
-from fastmcp import FastMCP
+from k8s_balancer.core.checkpoints import ACTION_STAGES, CheckpointStore, action_key, reconcile
+from k8s_balancer.core.decision_engine import METRIC_NAMES
+from k8s_balancer.core.decision_history import DecisionHistory, HysteresisPolicy, applied_action
+from k8s_balancer.core.fixture_format import is_binary_fixture, load_binary_fixtures
+from k8s_balancer.core.metrics_store import MetricsStore
+from k8s_balancer.core.pod_model import RESOURCE_FIELDS, deserialize_metrics, serialize_metrics
+from k8s_balancer.core.run_state import resources_path
+from k8s_balancer.core.slack_renderer import MAX_MESSAGE_CHARS, chunk_lines, parse_summary, render_messages
+from k8s_balancer.core.triage_queue import triage_namespace
+from k8s_balancer.core.workloads import aggregate_metric, is_workload_key, owner_of, workload_groups
 
 
+# Tools that only read; safe to cancel mid-call.
+READ_ONLY_TOOLS = (
+    'k8s_list_pods',
+    'k8s_list_workloads',
+    'k8s_triage_namespace',
+    'k8s_query_metrics',
+    'k8s_describe_pod',
+)
+
 DEFAULT_FIXTURES = {
     'pods': {
         'default': [
@@ -64,106 +87,529 @@ def default_fixtures():
     fixtures['updates'] = []
     fixtures['slack_messages'] = []
     fixtures['jira_issues'] = []
+    fixtures['events'] = []
     return fixtures
 
 
 def _load_fixtures_from_file(path):
+    if is_binary_fixture(path):
+        return load_binary_fixtures(path)
     with open(path) as handle:
         data = json.load(handle)
     fixtures = {
         'pods': data.get('pods', {'default': []}),
         'descriptions': data.get('descriptions', {}),
-        'metrics': {},
+        'metrics': deserialize_metrics(data.get('metrics', [])),
         'updates': data.get('updates', []),
         'slack_messages': data.get('slack_messages', []),
         'jira_issues': data.get('jira_issues', []),
+        'events': data.get('events', []),
     }
+    return fixtures
 
-    for item in data.get('metrics', []):
-        fixtures['metrics'][(item['pod'], item['metric'], item['window'])] = item['values']
 
-    return fixtures
+def due_events(fixtures, namespace, cursor, elapsed, window='24h'):
+    """Deliver scripted events after `cursor` whose `at` offset (seconds) has elapsed.
 
+    Events are `{'at', 'type', 'pod', 'namespace'?, 'metrics'?}`; `metrics` overrides
+    are written into the fixtures when the event fires so later queries see them.
+    The cursor is the sequence number of the last delivered event.
+    """
+    events = fixtures.get('events', []) or []
+    delivered = []
+    while cursor < len(events) and (events[cursor].get('at') or 0) <= elapsed:
+        event = events[cursor]
+        cursor += 1
+        if event.get('namespace', 'default') != namespace:
+            continue
+        for metric, values in (event.get('metrics') or {}).items():
+            fixtures['metrics'][(event['pod'], metric, window)] = values
+        delivered.append(dict(event, seq=cursor))
+    return {'events': delivered, 'cursor': cursor}
 
-def _serialize_metrics(metrics):
-    serialized = []
-    for (pod, metric, window), payload in metrics.items():
-        serialized.append({
-            'pod': pod,
-            'metric': metric,
-            'window': window,
-            'values': payload,
-        })
-    return serialized
+
+def _state_snapshot(fixtures):
+    # The action logs are appended to in place; copy them so the snapshot can be
+    # written outside the write lock.
+    return {
+        'pods': fixtures.get('pods', {}),
+        'updates': list(fixtures.get('updates', [])),
+        'slack_messages': list(fixtures.get('slack_messages', [])),
+        'jira_issues': list(fixtures.get('jira_issues', [])),
+    }
+
+
+def _resources_snapshot(fixtures, metrics=None):
+    return {
+        'descriptions': dict(fixtures.get('descriptions', {})),
+        'metrics': serialize_metrics(fixtures.get('metrics', {})) if metrics is None else metrics,
+    }
 
 
-def _persist_state(fixtures, state_file):
+def _persist_state(fixtures, state_file, metrics=None):
+    """Write the action log to `state_file` and descriptions/metrics to its `.resources` sidecar."""
     if not state_file:
         return
-    state = {
-        'pods': fixtures.get('pods', {}),
-        'descriptions': fixtures.get('descriptions', {}),
-        'metrics': _serialize_metrics(fixtures.get('metrics', {})),
-        'updates': fixtures.get('updates', []),
-        'slack_messages': fixtures.get('slack_messages', []),
-        'jira_issues': fixtures.get('jira_issues', []),
-    }
-    with open(state_file, 'w') as handle:
-        json.dump(state, handle, indent=2)
+    _write_snapshot(_state_snapshot(fixtures), _resources_snapshot(fixtures, metrics), state_file)
 
 
-def create_server(fixtures=None):
-    fixture_file = os.environ.get('K8S_BALANCER_FIXTURE_FILE')
-    if fixtures is None and fixture_file:
-        fixtures = _load_fixtures_from_file(fixture_file)
-    fixtures = fixtures or default_fixtures()
-    state_file = os.environ.get('K8S_BALANCER_STATE_FILE')
-    _persist_state(fixtures, state_file)
+def _write_snapshot(state, resources, state_file):
+    if resources is not None:
+        _write_json(resources, resources_path(state_file))
+    _write_json(state, state_file)
 
-    server = FastMCP('k8s-balancer')
 
-    @server.tool('k8s_list_pods')
-    def list_pods(namespace):
-        pods = fixtures['pods'].get(namespace)
+def _write_json(payload, path):
+    # Write then rename so a reader never sees a half-written file.
+    partial = '%s.%d.tmp' % (path, os.getpid())
+    with open(partial, 'w') as handle:
+        json.dump(payload, handle, indent=2)
+    os.replace(partial, path)
+
+
+def _log_tool_call(log_file, tool, arguments, result):
+    if not log_file:
+        return
+    with open(log_file, 'a') as handle:
+        handle.write(json.dumps({'tool': tool, 'arguments': arguments, 'result': result}, default=str) + '\n')
+
+
+def query_metrics(fixtures, metrics_store, pod, metric, window):
+    """Exact fixture entries win (scripted overrides); otherwise ask the store for any window."""
+    result = fixtures['metrics'].get((pod, metric, window))
+    if result is None and metrics_store is not None:
+        result = metrics_store.query(pod, metric, window)
+    return result
+
+
+def workload_metrics(fixtures, metrics_store, pods, metric, window):
+    """One payload for a workload: per-replica results combined by `workloads.aggregate_metric`."""
+    return aggregate_metric(metric, [query_metrics(fixtures, metrics_store, pod, metric, window) for pod in pods])
+
+
+def load_prometheus_dump(fixtures, metrics_store, path):
+    """Stream a Prometheus text dump into the store and list its pods in the fixtures."""
+    from k8s_balancer.integrations.prometheus import ingest_file
+
+    report = ingest_file(path, metrics_store, descriptions=fixtures.get('descriptions'))
+    pods = fixtures.setdefault('pods', {})
+    for namespace, names in report['pods'].items():
+        known = pods.setdefault(namespace, [])
+        seen = set(known)
+        known.extend(name for name in names if name not in seen)
+    return report
+
+
+class BalancerTools:
+    """Async tool implementations over one shared fixtures dict.
+
+    Mutations serialize on a single asyncio.Lock, so concurrent clients cannot
+    interleave writes. The action logs are appended to in place under that lock;
+    a flush copies them while holding it and writes the copy outside it, so the
+    state file always holds a consistent prefix of every log. The state file is
+    group-committed: a write returns once a flush that includes it has landed, and
+    one flush covers every write queued behind the previous one. CPU-heavy reads
+    (triage) and file writes run in worker threads to keep the event loop
+    responsive. Slack `ts` values come from a counter, not log positions, so a
+    thread reply keeps pointing at its parent whatever happens to the log.
+
+    Anywhere a pod name is accepted, a workload key from `list_workloads`
+    (`Deployment/checkout`) works too: reads aggregate over the replicas and an
+    update is recorded once for the whole workload.
+
+    With a decision `history`, triage records its decisions and lets `policy` hold
+    back flapping changes, and every applied update is logged for the next run.
+
+    With `checkpoints` (a `CheckpointStore`), each pod's progress through run `run_id`
+    is checkpointed; `resume` picks a dead run up without repeating reads or actions.
+    """
+
+    def __init__(
+        self, fixtures, state_file=None, metrics_store=None, priority_pods=(), history=None, policy=None,
+        checkpoints=None, run_id=None,
+    ):
+        self.fixtures = fixtures
+        self.state_file = state_file
+        self.metrics_store = metrics_store
+        self.priority_pods = list(priority_pods or ())
+        self.history = history
+        self.policy = policy if policy is not None or history is None else HysteresisPolicy()
+        self.started = time.monotonic()
+        self._write_lock = asyncio.Lock()
+        self._flush_lock = asyncio.Lock()
+        self._version = 0
+        self._flushed = 0
+        self._slack_ts = itertools.count(len(fixtures.get('slack_messages') or []))
+        # Descriptions and metrics only change when an event writes overrides, so the
+        # sidecar is rewritten only then instead of on every action.
+        self._resources_dirty = True
+        self._replicas = None
+        self.checkpoints = checkpoints
+        self.run_id = run_id
+        # `{pod: {stage: payload}}` mirror of this run's checkpoints.
+        self._progress = {}
+
+    def replicas(self, workload):
+        """Pods behind a workload key, or None when `workload` is not one."""
+        if not is_workload_key(workload):
+            return None
+        if self._replicas is None:
+            self._replicas = workload_groups(self.fixtures)
+        return self._replicas.get(workload)
+
+    def resume(self):
+        """Continue run `run_id`: settle in-flight actions and reload its progress.
+
+        Actions that already went through are put back in the action log, so the
+        summary covers the whole run and nothing is applied twice.
+        """
+        report = reconcile(self.checkpoints, self.run_id, self._description)
+        self._progress = self.checkpoints.load(self.run_id)
+        completed = []
+        for pod, stages in self._progress.items():
+            applied = stages.get('applied')
+            if not applied:
+                continue
+            for payload in applied.values():
+                key = 'updates' if payload['tool'] == 'k8s_update_resources' else 'jira_issues'
+                self.fixtures[key] = self.fixtures.get(key) or []
+                self.fixtures[key].append(payload['entry'])
+            completed.append(pod)
+        report['completed'] = completed
+        report['scanned'] = sum(1 for stages in self._progress.values() if 'scanned' in stages)
+        return report
+
+    def _stage(self, pod, stage):
+        return self._progress.get(pod, {}).get(stage)
+
+    def _applied(self, pod, payload):
+        """The checkpointed `applied` payload of this same action, or None."""
+        return (self._stage(pod, 'applied') or {}).get(action_key(payload))
+
+    async def _checkpoint(self, pod, stage, payload=None):
+        if self.checkpoints is None:
+            return
+        if stage in ACTION_STAGES:
+            self._progress.setdefault(pod, {}).setdefault(stage, {})[action_key(payload)] = payload
+        else:
+            self._progress.setdefault(pod, {})[stage] = payload
+        await asyncio.to_thread(self.checkpoints.mark, self.run_id, pod, stage, payload)
+
+    async def _scanned(self, pod, key, value):
+        scanned = dict(self._stage(pod, 'scanned') or {})
+        if key == 'description':
+            scanned['description'] = value
+        else:
+            scanned['metrics'] = dict(scanned.get('metrics') or {}, **{key: value})
+        await self._checkpoint(pod, 'scanned', scanned)
+
+    def _snapshot(self):
+        resources = None
+        if self._resources_dirty:
+            resources = _resources_snapshot(self.fixtures)
+            self._resources_dirty = False
+        return _state_snapshot(self.fixtures), resources
+
+    def persist(self):
+        if self.state_file:
+            _write_snapshot(*self._snapshot(), self.state_file)
+
+    async def _append(self, key, entry):
+        async with self._write_lock:
+            entries = self.fixtures[key] = self.fixtures.get(key) or []
+            entries.append(entry)
+            self._version += 1
+            version = self._version
+        await self._flush(version)
+
+    async def _flush(self, version):
+        if not self.state_file:
+            return
+        async with self._flush_lock:
+            if self._flushed >= version:
+                return
+            async with self._write_lock:
+                target = self._version
+                state, resources = self._snapshot()
+            await asyncio.to_thread(_write_snapshot, state, resources, self.state_file)
+            self._flushed = target
+
+    async def list_pods(self, namespace):
+        pods = self.fixtures['pods'].get(namespace)
         if pods is None:
             return {'items': []}
         return {'items': pods}
 
-    @server.tool('k8s_query_metrics')
-    def metrics_query(pod, metric, window):
-        return fixtures['metrics'].get((pod, metric, window))
+    async def list_workloads(self, namespace):
+        items = []
+        for key, pods in workload_groups(self.fixtures, namespace).items():
+            kind, name = owner_of(pods[0], self.fixtures['descriptions'].get(pods[0]))
+            items.append({'workload': key, 'kind': kind, 'name': name, 'replicas': len(pods), 'pods': pods})
+        return {'items': items}
+
+    async def triage(self, namespace, window='24h', max_pods=None, by_workload=False):
+        completed = [pod for pod, stages in self._progress.items() if 'applied' in stages]
+        result = await asyncio.to_thread(
+            triage_namespace, self.fixtures, namespace, window,
+            priority_pods=self.priority_pods, max_pods=max_pods, by_workload=by_workload,
+            history=self.history, policy=self.policy, completed=completed,
+        )
+        if self.checkpoints is not None:
+            decided = [(entry['pod'], {'action': entry['recommended_action']}) for entry in result['actionable']]
+            for pod, payload in decided:
+                self._progress.setdefault(pod, {})['decided'] = payload
+            await asyncio.to_thread(self.checkpoints.mark_many, self.run_id, decided, 'decided')
+        return result
+
+    async def watch_events(self, namespace, cursor=0):
+        # Delivering an event may write metric overrides, so it counts as a mutation.
+        async with self._write_lock:
+            feed = due_events(self.fixtures, namespace, cursor, time.monotonic() - self.started)
+            changed = any(event.get('metrics') for event in feed['events'])
+            if changed:
+                self._resources_dirty = True
+                self._version += 1
+                version = self._version
+        if changed:
+            await self._flush(version)
+        return feed
+
+    def _metrics(self, pod, metric, window):
+        replicas = self.replicas(pod)
+        if replicas:
+            return workload_metrics(self.fixtures, self.metrics_store, replicas, metric, window)
+        return query_metrics(self.fixtures, self.metrics_store, pod, metric, window)
 
-    @server.tool('k8s_describe_pod')
-    def describe(pod):
-        return fixtures['descriptions'].get(pod)
+    def _description(self, pod):
+        replicas = self.replicas(pod)
+        if replicas:
+            return dict(self.fixtures['descriptions'].get(replicas[0]) or {}, replicas=len(replicas))
+        return self.fixtures['descriptions'].get(pod)
 
-    @server.tool('k8s_update_resources')
-    def update_resources(pod, cpu_request=None, cpu_limit=None, mem_request=None, mem_limit=None):
-        updates = fixtures.setdefault('updates', [])
-        updates.append({
+    async def query_metrics(self, pod, metric, window):
+        if self.checkpoints is None:
+            return self._metrics(pod, metric, window)
+        key = '%s|%s' % (metric, window)
+        scanned = (self._stage(pod, 'scanned') or {}).get('metrics') or {}
+        if key in scanned:
+            return scanned[key]
+        result = self._metrics(pod, metric, window)
+        await self._scanned(pod, key, result)
+        return result
+
+    async def describe(self, pod):
+        if self.checkpoints is None:
+            return self._description(pod)
+        scanned = self._stage(pod, 'scanned') or {}
+        if 'description' in scanned:
+            return scanned['description']
+        description = self._description(pod)
+        await self._scanned(pod, 'description', description)
+        return description
+
+    def _current_resources(self, pod):
+        """The pod's description with this run's applied updates laid over it."""
+        current = dict(self._description(pod) or {})
+        for entry in self.fixtures.get('updates') or []:
+            if entry.get('pod') == pod:
+                current.update((key, entry[key]) for key in RESOURCE_FIELDS if entry.get(key) is not None)
+        return current
+
+    def _review_update(self, pod, changes, action):
+        """The held decision when `policy` blocks this update against the pod's last applied change, else None.
+
+        Direct calls get the same cooldown/hysteresis check triage applies, so an
+        agent that skips triage still cannot flap a pod.
+        """
+        decision = {'name': pod, 'recommended_action': action, 'reason': 'requested update'}
+        snapshot = {
+            'name': pod,
+            'metrics': {metric: self._metrics(pod, metric, '24h') for metric in METRIC_NAMES},
+            'description': self._description(pod),
+        }
+        decision = self.policy.review(decision, snapshot, self.history)
+        if not decision.get('held_action'):
+            return None
+        self.history.record(pod, decision)
+        return decision
+
+    async def update_resources(self, pod, cpu_request=None, cpu_limit=None, mem_request=None, mem_limit=None):
+        entry = {
             'pod': pod,
             'cpu_request': cpu_request,
             'cpu_limit': cpu_limit,
             'mem_request': mem_request,
             'mem_limit': mem_limit,
-        })
-        _persist_state(fixtures, state_file)
+        }
+        replicas = self.replicas(pod)
+        if replicas:
+            entry['pods'] = list(replicas)
+        changes = {key: value for key, value in entry.items() if key in RESOURCE_FIELDS and value is not None}
+        checkpoint = {'tool': 'k8s_update_resources', 'changes': changes, 'entry': entry}
+        if self.checkpoints is not None and self._applied(pod, checkpoint):
+            # Already went through before the run was resumed.
+            return {'status': 'already_applied'}
+        action = applied_action(changes, self._current_resources(pod)) if self.history is not None else None
+        if self.history is not None and self.policy is not None:
+            held = await asyncio.to_thread(self._review_update, pod, changes, action)
+            if held is not None:
+                return {'status': 'held', 'held_action': held['held_action'], 'reason': held['reason']}
+        if self.checkpoints is not None:
+            await self._checkpoint(pod, 'in_flight', checkpoint)
+        await self._append('updates', entry)
+        if self.history is not None:
+            await asyncio.to_thread(self.history.record_applied, pod, action, changes)
+        await self._checkpoint(pod, 'applied', checkpoint)
         return {'status': 'updated'}
 
-    @server.tool('slack_post_message')
-    def post_message(channel, text, blocks=None):
-        messages = fixtures.setdefault('slack_messages', [])
-        messages.append({'channel': channel, 'text': text, 'blocks': blocks})
-        _persist_state(fixtures, state_file)
-        return {'ts': '0', 'url': 'https://slack.test/message/0'}
-
-    @server.tool('jira_create_issue')
-    def create_issue(project, title, body):
-        issues = fixtures.setdefault('jira_issues', [])
-        issues.append({'project': project, 'title': title, 'body': body, 'url': 'https://jira.test/browse/TEST-1', 'issue_id': 'TEST-1'})
-        _persist_state(fixtures, state_file)
+    async def post_message(self, channel, text, blocks=None, thread_ts=None):
+        """Post a message; an over-size top-level message goes out as a head plus threaded follow-ups."""
+        if thread_ts is None and len(text or '') + len(blocks or '') > MAX_MESSAGE_CHARS:
+            summary = parse_summary(blocks) or parse_summary(text)
+            if summary:
+                messages = render_messages(summary, self.fixtures.get('jira_issues') or [])
+            else:
+                lines = (text or '').splitlines() or ['']
+                messages = chunk_lines(lines[1:], lines[0])
+            if len(messages) > 1:
+                head = await self._post(channel, messages[0])
+                for follow_up in messages[1:]:
+                    await self._post(channel, follow_up, thread_ts=head['ts'])
+                return dict(head, follow_ups=len(messages) - 1)
+        return await self._post(channel, text, blocks, thread_ts)
+
+    async def _post(self, channel, text, blocks=None, thread_ts=None):
+        ts = str(next(self._slack_ts))
+        await self._append('slack_messages', {'channel': channel, 'text': text, 'blocks': blocks, 'thread_ts': thread_ts, 'ts': ts})
+        if self.checkpoints is not None:
+            notified = [
+                (pod, {'ts': ts}) for pod, stages in self._progress.items()
+                if 'applied' in stages and 'notified' not in stages
+            ]
+            for pod, payload in notified:
+                self._progress[pod]['notified'] = payload
+            await asyncio.to_thread(self.checkpoints.mark_many, self.run_id, notified, 'notified')
+        return {'ts': ts, 'url': 'https://slack.test/message/%s' % ts}
+
+    def _issue_pod(self, title, body):
+        """The pod an escalation is about: the longest known pod name in its title or body."""
+        blob = '%s %s' % (title, body)
+        named = [pod for pods in self.fixtures['pods'].values() for pod in pods if pod and pod in blob]
+        return max(named, key=len) if named else None
+
+    async def create_issue(self, project, title, body):
+        entry = {
+            'project': project,
+            'title': title,
+            'body': body,
+            'url': 'https://jira.test/browse/TEST-1',
+            'issue_id': 'TEST-1',
+        }
+        pod = self._issue_pod(title, body) if self.checkpoints is not None else None
+        checkpoint = {'tool': 'jira_create_issue', 'entry': entry}
+        if pod is not None:
+            applied = self._applied(pod, checkpoint)
+            if applied:
+                return {'issue_id': applied['entry']['issue_id'], 'url': applied['entry']['url']}
+            await self._checkpoint(pod, 'in_flight', checkpoint)
+        await self._append('jira_issues', entry)
+        if pod is not None:
+            await self._checkpoint(pod, 'applied', checkpoint)
         return {'issue_id': 'TEST-1', 'url': 'https://jira.test/browse/TEST-1'}
 
+
+def tools_from_env(fixtures=None, metrics_store=None):
+    """Build `BalancerTools` the way the server process does, from K8S_BALANCER_* variables."""
+    fixture_file = os.environ.get('K8S_BALANCER_FIXTURE_FILE')
+    if fixtures is None and fixture_file:
+        fixtures = _load_fixtures_from_file(fixture_file)
+    fixtures = fixtures or default_fixtures()
+    metrics_file = os.environ.get('K8S_BALANCER_METRICS_STORE')
+    if metrics_store is None and metrics_file:
+        metrics_store = MetricsStore.load(metrics_file)
+    prometheus_dump = os.environ.get('K8S_BALANCER_PROMETHEUS_DUMP')
+    if prometheus_dump:
+        metrics_store = metrics_store or MetricsStore()
+        report = load_prometheus_dump(fixtures, metrics_store, prometheus_dump)
+        # stdout carries the MCP stdio transport; the ingest report goes to stderr.
+        print(json.dumps({'prometheus_ingest': {key: value for key, value in report.items() if key != 'pods'}}), file=sys.stderr)
+    priority_pods = [pod for pod in os.environ.get('K8S_BALANCER_PRIORITY_PODS', '').split(',') if pod]
+    history = DecisionHistory.from_env()
+    policy = HysteresisPolicy.from_env() if history is not None else None
+    checkpoints = CheckpointStore.from_env()
+    tools = BalancerTools(
+        fixtures, os.environ.get('K8S_BALANCER_STATE_FILE'), metrics_store, priority_pods, history=history, policy=policy,
+        checkpoints=checkpoints, run_id=os.environ.get('K8S_BALANCER_RUN_ID') if checkpoints is not None else None,
+    )
+    if checkpoints is not None and os.environ.get('K8S_BALANCER_RESUME'):
+        report = tools.resume()
+        print(json.dumps({'resume': dict(report, run_id=tools.run_id)}), file=sys.stderr)
+    tools.persist()
+    return tools
+
+
+def create_server(fixtures=None, metrics_store=None):
+    from fastmcp import FastMCP
+
+    tools = tools_from_env(fixtures, metrics_store)
+    tool_log = os.environ.get('K8S_BALANCER_TOOL_LOG')
+    tool_timeout = float(os.environ['K8S_BALANCER_TOOL_TIMEOUT']) if os.environ.get('K8S_BALANCER_TOOL_TIMEOUT') else None
+    server = FastMCP('k8s-balancer')
+
+    def tool(name):
+        """Register a tool and append every call to the tool log when one is configured.
+
+        Reads are cancelled past K8S_BALANCER_TOOL_TIMEOUT, the deadline the client
+        gives up at; writes always run to completion so the state file stays whole.
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            async def logged(**arguments):
+                if tool_timeout is not None and name in READ_ONLY_TOOLS:
+                    result = await asyncio.wait_for(func(**arguments), tool_timeout)
+                else:
+                    result = await func(**arguments)
+                _log_tool_call(tool_log, name, arguments, result)
+                return result
+            return server.tool(name)(logged)
+        return decorator
+
+    @tool('k8s_list_pods')
+    async def list_pods(namespace):
+        return await tools.list_pods(namespace)
+
+    @tool('k8s_list_workloads')
+    async def list_workloads(namespace):
+        return await tools.list_workloads(namespace)
+
+    @tool('k8s_triage_namespace')
+    async def triage(namespace, window='24h', max_pods=None, by_workload=False):
+        return await tools.triage(namespace, window, max_pods, by_workload)
+
+    @tool('k8s_watch_events')
+    async def watch_events(namespace, cursor=0):
+        return await tools.watch_events(namespace, cursor)
+
+    @tool('k8s_query_metrics')
+    async def metrics_query(pod, metric, window):
+        return await tools.query_metrics(pod, metric, window)
+
+    @tool('k8s_describe_pod')
+    async def describe(pod):
+        return await tools.describe(pod)
+
+    @tool('k8s_update_resources')
+    async def update_resources(pod, cpu_request=None, cpu_limit=None, mem_request=None, mem_limit=None):
+        return await tools.update_resources(pod, cpu_request, cpu_limit, mem_request, mem_limit)
+
+    @tool('slack_post_message')
+    async def post_message(channel, text, blocks=None, thread_ts=None):
+        return await tools.post_message(channel, text, blocks, thread_ts)
+
+    @tool('jira_create_issue')
+    async def create_issue(project, title, body):
+        return await tools.create_issue(project, title, body)
+
     return server
 
 
@@ -0,0 +1,51 @@
+"""Direct MCP tool calls over an mcp-use session, for code paths that do not need the LLM."""
+
+import json
+
+
+def _decode(result):
+    content = getattr(result, 'content', None) or []
+    if getattr(result, 'isError', False):
+        text = ' '.join(getattr(item, 'text', '') for item in content)
+        raise RuntimeError('MCP tool failed: %s' % text)
+    if not content:
+        return None
+    text = getattr(content[0], 'text', None)
+    if text is None:
+        return None
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return text
+
+
+class ToolSession:
+    """Async context manager owning one MCP client session to the balancer server."""
+
+    def __init__(self, client_config, server_name=None):
+        self.client_config = client_config
+        self.server_name = server_name or next(iter(client_config['mcpServers']))
+        self.client = None
+        self.session = None
+
+    @classmethod
+    def attach(cls, session):
+        """Wrap a session some other component (e.g. an MCPAgent's client) already owns."""
+        tool_session = cls({'mcpServers': {'attached': {}}})
+        tool_session.session = session
+        return tool_session
+
+    async def __aenter__(self):
+        from mcp_use import MCPClient
+
+        self.client = MCPClient.from_dict(self.client_config)
+        self.session = await self.client.create_session(self.server_name)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.client.close_all_sessions()
+
+    async def call(self, tool, **arguments):
+        """Call a tool and return its decoded JSON payload."""
+        result = await self.session.connector.call_tool(tool, arguments)
+        return _decode(result)
@@ -10,3 +10,31 @@ def create_agent(llm, namespace, slack_channel, fixtures=None, agent_runner_cls=
 def run_once(llm, namespace, slack_channel, fixtures=None, agent_runner_cls=None):
     agent = create_agent(llm, namespace, slack_channel, fixtures=fixtures, agent_runner_cls=agent_runner_cls)
     return agent.run()
+
+
+def run_event_driven(llm, namespace, slack_channel, fixtures=None, duration=None, max_events=None, poll_interval=1.0, sweep_interval=900.0, by_workload=False, sizer=None):
+    """Remediate pods as OOMKilled/restart/eviction events arrive instead of on a fixed LLM cycle."""
+    from k8s_balancer.agent.agent_runner import MCPToolAgentRunner
+    from k8s_balancer.agent.event_remediator import EventDrivenRemediator
+
+    runner = MCPToolAgentRunner(llm, fixtures=fixtures)
+    remediator = EventDrivenRemediator(
+        runner, namespace, slack_channel, poll_interval=poll_interval, sweep_interval=sweep_interval, by_workload=by_workload,
+        sizer=sizer,
+    )
+    return remediator.run(duration=duration, max_events=max_events)
+
+
+def simulate_rebalance(fixtures, namespace, nodes=None, updates=None, by_workload=False, sizer=None):
+    """Dry run: how the playbook's planned updates (or `updates`) would repack the nodes.
+
+    A `RightSizer` plans percentile-driven targets instead of the fixed steps.
+    """
+    from k8s_balancer.core.capacity import simulate_capacity
+    from k8s_balancer.core.remediation import plan_namespace
+
+    if updates is None:
+        updates = plan_namespace(fixtures, namespace, by_workload=by_workload, sizer=sizer)
+    report = simulate_capacity(fixtures, updates=updates, nodes=nodes, namespace=namespace)
+    report['planned_updates'] = updates
+    return report
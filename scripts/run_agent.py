@@ -2,19 +2,24 @@
 
 """Command line launcher for the Kubernetes Resource Rebalancer Agent."""
 
+import argparse
+import json
 import os
 import sys
 from pathlib import Path
 
-from dotenv import load_dotenv
-
 REPO_ROOT = Path(__file__).resolve().parents[1]
 if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
+from k8s_balancer.integrations.cassette import Cassette
 from k8s_balancer.mcp.server import default_fixtures
 from k8s_balancer.runner import create_agent
-from langchain_openai import ChatOpenAI
+
+REPLAY_API_KEY = 'cassette-replay'
+# Part of every cassette key (see `cassette.llm_identity`); changing them invalidates recordings.
+LLM_MODEL = 'gpt-4o-mini'
+LLM_TEMPERATURE = 0
 
 
 def install_demo_mcp_fixtures():
@@ -23,29 +28,56 @@ def install_demo_mcp_fixtures():
 
 def build_llm():
     """Create and return the LangChain LLM instance used by the agent."""
+    from dotenv import load_dotenv
+    from langchain_openai import ChatOpenAI
+
     load_dotenv()
     api_key = os.getenv('OPENAI_API_KEY')
     base_url = os.getenv('OPENAI_API_BASE')
+    cassette = Cassette.from_env()
 
+    if not api_key and cassette is not None and cassette.mode == 'strict':
+        # Strict replay never reaches the API, so a placeholder key is enough.
+        api_key = REPLAY_API_KEY
     if not api_key:
         raise ValueError('OPENAI_API_KEY environment variable is not set')
 
     kwargs = {
         'api_key': api_key,
-        'model': 'gpt-4o-mini',
-        'temperature': 0,
+        'model': LLM_MODEL,
+        'temperature': LLM_TEMPERATURE,
     }
     if base_url:
         kwargs['base_url'] = base_url
+    if cassette is not None:
+        kwargs['cache'] = cassette.llm_cache()
 
     return ChatOpenAI(**kwargs)
 
 
-def main():
+def dry_run(namespace, fixtures):
+    """Classify every pod with the deterministic playbook without calling the LLM."""
+    from k8s_balancer.core.decision_engine import evaluate_pod, pod_snapshots_from_fixtures
+
+    decisions = [evaluate_pod(snapshot) for snapshot in pod_snapshots_from_fixtures(fixtures, namespace)]
+    return {'namespace': namespace, 'pods_scanned': len(decisions), 'decisions': decisions}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--dry-run', action='store_true', help='print the planned decisions without contacting the LLM or MCP server')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
     namespace = os.environ.get('TARGET_NAMESPACE', 'default')
     slack_channel = os.environ.get('SLACK_CHANNEL', '#platform-notifications')
-    llm = build_llm()
     fixtures = install_demo_mcp_fixtures()
+    if args.dry_run:
+        print(json.dumps(dry_run(namespace, fixtures), indent=2))
+        return
+    llm = build_llm()
     agent = create_agent(llm, namespace, slack_channel, fixtures=fixtures)
     summary = agent.run()
     print('Run complete. Slack summary message:')
@@ -1,31 +1,27 @@
 """Streamlit UI for running targeted scenario checks."""
 
+import hashlib
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 from scripts.run_agent import build_llm
+from k8s_balancer.core.pod_model import serialize_metrics
+from k8s_balancer.core.prompt_loader import get_prompt
+from k8s_balancer.core.quantity import parse_cpu, parse_memory
+from k8s_balancer.core.usage import install_usage_callback
 from k8s_balancer.mcp.server import default_fixtures
-from k8s_balancer.runner import create_agent
+from k8s_balancer.runner import create_agent, simulate_rebalance
 
 
 PROJECT_ROOT = Path(__file__).resolve().parent
 
-
-def parse_quantity(value):
-    if value is None:
-        return None
-    value = value.strip()
-    if value.endswith('Gi'):
-        return float(value[:-2]) * 1024
-    if value.endswith('Mi'):
-        return float(value[:-2])
-    if value.endswith('Ki'):
-        return float(value[:-2]) / 1024
-    if value.endswith('m'):
-        return float(value[:-1])
-    return float(value)
+CACHE_PROMPTS = ('orchestrator_system_prompt.txt', 'orchestrator_user_prompt.txt')
 
 
 def build_fixture_for_scenario(name):
@@ -67,16 +63,78 @@ def build_fixture_for_scenario(name):
     return fixtures
 
 
+@st.cache_resource(show_spinner=False)
+def shared_llm():
+    """One LLM client for every scenario run in this Streamlit process.
+
+    The usage callback is attached here, once, so scenario threads only ever find
+    it installed instead of racing to add it.
+    """
+    return install_usage_callback(build_llm())
+
+
+def fixture_digest(fixtures):
+    payload = dict(fixtures)
+    payload['metrics'] = serialize_metrics(fixtures.get('metrics', {}))
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def prompt_cache_key():
+    return ','.join(f"{name}:{get_prompt(name).version}" for name in CACHE_PROMPTS)
+
+
 def run_agent_once(scenario_name):
     fixtures = build_fixture_for_scenario(scenario_name)
-    llm = build_llm()
-    agent = create_agent(llm, 'default', '#platform-notifications', fixtures=fixtures)
+    agent = create_agent(shared_llm(), 'default', '#platform-notifications', fixtures=fixtures)
     summary = agent.run()
-    state = agent.latest_outcome.state if agent.latest_outcome else {}
+    # Only the action log is cached; descriptions and metrics are never loaded.
+    state = agent.latest_outcome.state.actions() if agent.latest_outcome else {}
     slack_text = agent.latest_outcome.slack_message if agent.latest_outcome else ''
     return summary, state, slack_text, fixtures
 
 
+@st.cache_data(show_spinner=False, max_entries=64)
+def _run_scenario_cached(scenario_name, digest, prompt_key):
+    # The fixture digest and prompt versions are part of the cache key so an edited
+    # scenario or prompt triggers a fresh run; re-renders reuse the stored result.
+    start = time.perf_counter()
+    summary, state, slack_text, fixtures = run_agent_once(scenario_name)
+    return {
+        'summary': summary,
+        'state': state,
+        'slack_text': slack_text,
+        'baseline': fixtures,
+        'elapsed': time.perf_counter() - start,
+    }
+
+
+def run_scenario(scenario_name, force=False):
+    digest = fixture_digest(build_fixture_for_scenario(scenario_name))
+    prompt_key = prompt_cache_key()
+    if force:
+        # Drop only this scenario's entry so the run below goes to the agent again.
+        _run_scenario_cached.clear(scenario_name, digest, prompt_key)
+    return _run_scenario_cached(scenario_name, digest, prompt_key)
+
+
+def run_all_scenarios(scenario_names, max_workers=None, force=False):
+    """Run scenarios concurrently; yields `(name, result, error)` as each one finishes."""
+    ctx = get_script_run_ctx()
+
+    def attach_context():
+        add_script_run_ctx(threading.current_thread(), ctx)
+
+    shared_llm()
+    with ThreadPoolExecutor(max_workers=max_workers or len(scenario_names), initializer=attach_context) as pool:
+        futures = {pool.submit(run_scenario, name, force): name for name in scenario_names}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                yield name, future.result(), None
+            except Exception as exc:
+                yield name, None, exc
+
+
 def _extract_entry(summary, key, pod_name):
     for item in summary.get(key, []):
         name = item.get('name') or item.get('pod_name') or item.get('pod')
@@ -95,8 +153,8 @@ def scenario_oom(summary, state, baseline):
     entry = _extract_entry(summary, 'pods_rebalanced', 'checkout-service')
     if not entry:
         return _missing_summary('No checkout-service rebalance found in summary.')
-    original = parse_quantity(baseline['descriptions']['checkout-service']['mem_limit'])
-    new = parse_quantity(entry['mem_limit'])
+    original = parse_memory(baseline['descriptions']['checkout-service']['mem_limit'])
+    new = parse_memory(entry['mem_limit'])
     passed = abs(new - original * 1.25) <= original * 0.05
     detail = f"Mem limit scaled from {baseline['descriptions']['checkout-service']['mem_limit']} to {entry['mem_limit']}"
     return passed, detail
@@ -108,10 +166,10 @@ def scenario_idle(summary, state, baseline):
     entry = _extract_entry(summary, 'pods_rebalanced', 'idle-service')
     if not entry:
         return _missing_summary('No idle-service rebalance found in summary.')
-    original_cpu = parse_quantity(baseline['descriptions']['idle-service']['cpu_request'])
-    original_mem = parse_quantity(baseline['descriptions']['idle-service']['mem_request'])
-    new_cpu = parse_quantity(entry['cpu_request'])
-    new_mem = parse_quantity(entry['mem_request'])
+    original_cpu = parse_cpu(baseline['descriptions']['idle-service']['cpu_request'])
+    original_mem = parse_memory(baseline['descriptions']['idle-service']['mem_request'])
+    new_cpu = parse_cpu(entry['cpu_request'])
+    new_mem = parse_memory(entry['mem_request'])
     passed = (
         abs(new_cpu - original_cpu * 0.8) <= max(original_cpu * 0.05, 1)
         and abs(new_mem - original_mem * 0.8) <= original_mem * 0.05
@@ -273,18 +331,82 @@ def main():
     scenario_names = list(SCENARIOS.keys())
     selected = st.selectbox("Scenario", scenario_names, index=0)
 
-    if st.button("Run Test", type="primary"):
+    force = st.checkbox("Force re-run", help="Ignore cached results and run the agent again.")
+    run_one, run_all = st.columns(2)
+
+    if run_one.button("Run Test", type="primary"):
         with st.spinner(f"Running `{selected}` scenario..."):
-            summary, state, slack_text, baseline = run_agent_once(selected)
+            result = run_scenario(selected, force=force)
             checker = SCENARIOS[selected]
-            passed, detail = checker(summary, state, baseline)
+            passed, detail = checker(result['summary'], result['state'], result['baseline'])
 
         if passed:
             st.success(detail)
         else:
             st.error(detail)
 
-        render_slack_message(slack_text)
+        render_slack_message(result['slack_text'])
+
+    if run_all.button("Run All Scenarios"):
+        render_all_scenarios(scenario_names, force=force)
+
+    render_capacity_simulation()
+
+
+def render_capacity_simulation():
+    with st.expander("Capacity what-if"):
+        st.markdown("Dry-run the playbook's planned updates against a node pool before applying them.")
+        count_column, cpu_column, memory_column = st.columns(3)
+        count = count_column.number_input("Nodes", min_value=1, value=2, step=1)
+        cpu = cpu_column.text_input("CPU per node", value="2")
+        memory = memory_column.text_input("Memory per node", value="4Gi")
+        if not st.button("Simulate"):
+            return
+        nodes = [{'name': 'node', 'cpu': cpu, 'memory': memory, 'count': int(count)}]
+        report = simulate_rebalance(default_fixtures(), 'default', nodes=nodes)
+
+        used, freed, needed = st.columns(3)
+        used.metric("Nodes used", report['nodes_used_after'], report['nodes_used_after'] - report['nodes_used_before'], delta_color="inverse")
+        freed.metric("Nodes freed", report['nodes_freed'])
+        needed.metric("Nodes needed", report['nodes_needed'])
+        st.table({
+            'before': report['before'],
+            'after': report['after'],
+        })
+        if report['newly_unschedulable']:
+            st.error("Would become unschedulable: " + ", ".join(report['newly_unschedulable']))
+        elif report['unschedulable']:
+            st.warning("Unschedulable before and after: " + ", ".join(report['unschedulable']))
+        else:
+            st.success(f"All {report['pods']} pods schedulable after {report['updates']} planned updates ({report['seconds'] * 1000:.1f} ms).")
+
+
+def render_all_scenarios(scenario_names, force=False):
+    progress = st.progress(0.0, text="Starting scenarios...")
+    rows = {name: st.empty() for name in scenario_names}
+    for name in scenario_names:
+        rows[name].info(f"⏳ {name}: running")
+
+    results = {}
+    started = time.perf_counter()
+    for done, (name, result, error) in enumerate(run_all_scenarios(scenario_names, force=force), start=1):
+        if error is not None:
+            rows[name].error(f"{name}: failed ({error})")
+        else:
+            passed, detail = SCENARIOS[name](result['summary'], result['state'], result['baseline'])
+            label = f"{name}: {detail} ({result['elapsed']:.1f}s)"
+            if passed:
+                rows[name].success(label)
+            else:
+                rows[name].error(label)
+            results[name] = result
+        progress.progress(done / len(scenario_names), text=f"{done}/{len(scenario_names)} scenarios finished")
+    progress.progress(1.0, text=f"All scenarios finished in {time.perf_counter() - started:.1f}s")
+
+    for name in scenario_names:
+        if name in results:
+            with st.expander(f"Slack summary – {name}"):
+                render_slack_message(results[name]['slack_text'])
 
 
 if __name__ == "__main__":
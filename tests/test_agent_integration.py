@@ -10,6 +10,7 @@ if str(ROOT) not in sys.path:
 
 from scripts.run_agent import build_llm
 from k8s_balancer.agent.orchestrator import ResourceRebalanceOrchestrator
+from k8s_balancer.integrations.cassette import CassetteMissError
 from k8s_balancer.mcp.server import default_fixtures
 
 
@@ -18,6 +19,8 @@ def run_agent_with(fixtures):
     agent = ResourceRebalanceOrchestrator(llm, 'default', '#platform-notifications', fixtures=fixtures)
     try:
         summary = agent.run()
+    except CassetteMissError:
+        raise
     except Exception as exc:
         pytest.skip(f'Agent execution failed: {exc}')
     outcome = agent.latest_outcome
@@ -43,6 +46,36 @@ def fixture_base(target_pod, target_description, target_metrics):
     }
 
 
+# Single-pod namespaces, one per playbook branch.
+SCENARIOS = {
+    'oomkilled': (
+        'checkout-service',
+        {'cpu_request': '500m', 'cpu_limit': '750m', 'mem_request': '512Mi', 'mem_limit': '1Gi'},
+        {'cpu': {'avg': 60, 'p95': 80}, 'memory': {'avg': 95, 'p95': 99}, 'oom_kills': {'avg': 4, 'p95': 4}},
+    ),
+    'idle': (
+        'idle-service',
+        {'cpu_request': '500m', 'cpu_limit': '750m', 'mem_request': '512Mi', 'mem_limit': '1Gi'},
+        {'cpu': {'avg': 10, 'p95': 15}, 'memory': {'avg': 12, 'p95': 18}, 'oom_kills': {'avg': 0, 'p95': 0}},
+    ),
+    'inconsistent': (
+        'recommendation-service',
+        {'cpu_request': '600m', 'cpu_limit': '900m', 'mem_request': '1Gi', 'mem_limit': '2Gi'},
+        {'cpu': {'avg': 12, 'p95': 95}, 'memory': {'avg': 10, 'p95': 97}, 'oom_kills': {'avg': 0, 'p95': 0}},
+    ),
+    'healthy': (
+        'auth-service',
+        {'cpu_request': '300m', 'cpu_limit': '600m', 'mem_request': '512Mi', 'mem_limit': '1Gi'},
+        {'cpu': {'avg': 55, 'p95': 70}, 'memory': {'avg': 65, 'p95': 78}, 'oom_kills': {'avg': 0, 'p95': 0}},
+    ),
+}
+
+
+def scenario_fixtures(name):
+    pod, description, metrics = SCENARIOS[name]
+    return fixture_base(pod, dict(description), {metric: dict(values) for metric, values in metrics.items()})
+
+
 def parse_slack_json(slack_text):
     if not slack_text:
         pytest.skip('Slack message missing')
@@ -64,20 +97,7 @@ def extract_entry(entries, pod_name):
 
 
 def test_oomkilled_pod_updates_memory():
-    fixtures = fixture_base(
-        'checkout-service',
-        {
-            'cpu_request': '500m',
-            'cpu_limit': '750m',
-            'mem_request': '512Mi',
-            'mem_limit': '1Gi',
-        },
-        {
-            'cpu': {'avg': 60, 'p95': 80},
-            'memory': {'avg': 95, 'p95': 99},
-            'oom_kills': {'avg': 4, 'p95': 4},
-        },
-    )
+    fixtures = scenario_fixtures('oomkilled')
 
     summary, state, slack_text = run_agent_with(fixtures)
 
@@ -93,20 +113,7 @@ def test_oomkilled_pod_updates_memory():
 
 
 def test_idle_pod_downscales_requests():
-    fixtures = fixture_base(
-        'idle-service',
-        {
-            'cpu_request': '500m',
-            'cpu_limit': '750m',
-            'mem_request': '512Mi',
-            'mem_limit': '1Gi',
-        },
-        {
-            'cpu': {'avg': 10, 'p95': 15},
-            'memory': {'avg': 12, 'p95': 18},
-            'oom_kills': {'avg': 0, 'p95': 0},
-        },
-    )
+    fixtures = scenario_fixtures('idle')
 
     summary, state, slack_text = run_agent_with(fixtures)
 
@@ -122,20 +129,7 @@ def test_idle_pod_downscales_requests():
 
 
 def test_inconsistent_metrics_escalates():
-    fixtures = fixture_base(
-        'recommendation-service',
-        {
-            'cpu_request': '600m',
-            'cpu_limit': '900m',
-            'mem_request': '1Gi',
-            'mem_limit': '2Gi',
-        },
-        {
-            'cpu': {'avg': 12, 'p95': 95},
-            'memory': {'avg': 10, 'p95': 97},
-            'oom_kills': {'avg': 0, 'p95': 0},
-        },
-    )
+    fixtures = scenario_fixtures('inconsistent')
 
     summary, state, slack_text = run_agent_with(fixtures)
 
@@ -151,20 +145,7 @@ def test_inconsistent_metrics_escalates():
 
 
 def test_healthy_pod_skipped():
-    fixtures = fixture_base(
-        'auth-service',
-        {
-            'cpu_request': '300m',
-            'cpu_limit': '600m',
-            'mem_request': '512Mi',
-            'mem_limit': '1Gi',
-        },
-        {
-            'cpu': {'avg': 55, 'p95': 70},
-            'memory': {'avg': 65, 'p95': 78},
-            'oom_kills': {'avg': 0, 'p95': 0},
-        },
-    )
+    fixtures = scenario_fixtures('healthy')
 
     summary, state, slack_text = run_agent_with(fixtures)
 
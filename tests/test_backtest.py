@@ -0,0 +1,114 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+np = pytest.importorskip('numpy')
+
+from k8s_balancer.core.backtest import DEFAULT_THRESHOLDS, _classify, _p95, backtest, load_history, save_history
+from k8s_balancer.core.decision_engine import DECISION_TEMPLATES, evaluate_pod
+from k8s_balancer.core.sharded_engine import build_columns, classify_columns
+
+
+def _history(samples=24 * 12 * 4):
+    """Four days at 5 minutes: a leaking pod, an idle pod, a spiky pod and a steady one."""
+    hours = np.arange(samples) / 12.0
+    leak = 400 + 700 * hours / hours.max()
+    idle = np.full(samples, 50.0)
+    spiky = np.where(np.arange(samples) % 10 == 0, 950.0, 100.0)
+    steady = np.full(samples, 500.0)
+    return {
+        'names': ['leaky', 'idle', 'spiky', 'steady'],
+        'step': 300.0,
+        'cpu': np.vstack([steady, idle, spiky, steady]).astype(np.float32),
+        'memory': np.vstack([leak, idle, spiky / 2, steady]).astype(np.float32),
+        'cpu_request': np.array([500.0, 500.0, 500.0, 500.0]),
+        'cpu_limit': np.array([1000.0, 1000.0, 1000.0, 1000.0]),
+        'mem_request': np.array([512.0, 512.0, 512.0, 512.0]),
+        'mem_limit': np.array([1024.0, 1024.0, 1024.0, 1024.0]),
+    }
+
+
+# `(cpu avg, cpu p95, memory avg, memory p95, oom kills)` in percent of the limits:
+# the default fixture pods, then each rule on its own and either side of the idle line.
+FIXTURE_ROWS = [
+    (65, 80, 95, 98, 4), (10, 18, 12, 19, 0), (18, 92, 15, 93, 0), (42, 55, 47, 58, 0),
+    (50, 60, 91, 95, 0), (50, 60, 50, 60, 3), (25, 85, 40, 50, 0), (40, 50, 25, 85, 0),
+    (19, 25, 19, 25, 0), (21, 25, 19, 25, 0),
+]
+
+
+def _window(avg, p95, samples=48):
+    """Samples whose mean is `avg` and whose `_p95` is `p95`."""
+    top = samples - max(int(np.ceil(samples * 0.95)) - 1, 0)
+    rest = (avg * samples - p95 * top) / (samples - top)
+    return np.array([rest] * (samples - top) + [p95] * top)
+
+
+def test_engine_sharded_and_vectorized_rules_agree():
+    rng = np.random.default_rng(11)
+    rows = np.array(FIXTURE_ROWS, dtype=np.float64)
+    cpu = np.vstack([
+        rng.uniform(20, 1000, size=(300, 48)),
+        [_window(avg * 10, p95 * 10) for avg, p95 in rows[:, :2]],
+    ])
+    memory = np.vstack([
+        rng.uniform(20, 1024, size=(300, 48)) * rng.uniform(0.1, 1.0, size=(300, 1)),
+        [_window(avg * 10.24, p95 * 10.24) for avg, p95 in rows[:, 2:4]],
+    ])
+    oom = np.concatenate([rng.choice([0, 0, 1, 3, 5], size=300), rows[:, 4]])
+    pods = len(oom)
+    cpu_limit = np.full(pods, 1000.0)
+    mem_limit = np.full(pods, 1024.0)
+    overloaded, inconsistent, idle = _classify(cpu, memory, oom, cpu_limit, mem_limit, DEFAULT_THRESHOLDS)
+    cpu_p95 = _p95(cpu)
+    memory_p95 = _p95(memory)
+    snapshots = [
+        {
+            'name': 'pod-%d' % pod,
+            'metrics': {
+                'cpu': {'avg': cpu[pod].mean() / 10, 'p95': cpu_p95[pod] / 10},
+                'memory': {'avg': memory[pod].mean() / 10.24, 'p95': memory_p95[pod] / 10.24},
+                'oom_kills': {'avg': oom[pod], 'p95': oom[pod]},
+            },
+            'description': {'mem_limit': '1Gi'},
+        }
+        for pod in range(pods)
+    ]
+    _, columns = build_columns(snapshots)
+    codes = classify_columns(columns, workers=1)
+    for pod, snapshot in enumerate(snapshots):
+        expected = evaluate_pod(snapshot)['classification']
+        assert DECISION_TEMPLATES[codes[pod]][0] == expected, pod
+        got = 'overloaded' if overloaded[pod] else 'inconsistent' if inconsistent[pod] else 'idle' if idle[pod] else 'healthy'
+        assert got == expected, pod
+    assert {DECISION_TEMPLATES[code][0] for code in codes} == {'overloaded', 'inconsistent', 'idle', 'healthy'}
+
+
+def test_backtest_reports_avoided_ooms_reclaimed_requests_and_updates(tmp_path):
+    history = _history()
+    report = backtest(history, evaluate_every='6h')
+
+    assert report['pods'] == 4 and report['days'] == 4.0
+    assert report['oom_events_baseline'] > 0
+    assert report['oom_events_avoided'] == report['oom_events_baseline'] - report['oom_events'] > 0
+    assert report['updates_by_action']['increase_memory_limit'] >= 1
+    assert report['updates_by_action']['decrease_requests'] == 12
+    assert report['escalated_pods'] == 1
+    assert report['reclaimed']['cpu_request'] != '0m'
+
+    # A cooldown trades reclaimed resources for fewer rollouts.
+    cooled = backtest(history, evaluate_every='6h', cooldown='1d')
+    assert cooled['updates'] < report['updates']
+
+    # Stricter idle threshold: the idle pod (5% usage) still shrinks, nothing else changes.
+    assert backtest(history, thresholds={'idle_pct': 6}, evaluate_every='6h')['updates_by_action'] == report['updates_by_action']
+
+    path = tmp_path / 'history.npz'
+    save_history(history, path)
+    chunked = backtest(load_history(path), evaluate_every='6h', chunk_pods=1)
+    assert dict(chunked, seconds=None) == dict(report, seconds=None)
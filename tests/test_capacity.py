@@ -0,0 +1,72 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+np = pytest.importorskip('numpy')
+
+from k8s_balancer.core.capacity import first_fit_decreasing, simulate_capacity
+from k8s_balancer.mcp.server import default_fixtures
+from k8s_balancer.runner import simulate_rebalance
+
+
+def _one_by_one(cpu, memory, node_cpu, node_memory, order):
+    remaining = [[c, m] for c, m in zip(node_cpu, node_memory)]
+    assignment = [-1] * len(cpu)
+    for pod in order:
+        for node, (free_cpu, free_memory) in enumerate(remaining):
+            if cpu[pod] <= free_cpu and memory[pod] <= free_memory:
+                remaining[node] = [free_cpu - cpu[pod], free_memory - memory[pod]]
+                assignment[pod] = node
+                break
+    return assignment
+
+
+def test_grouped_packing_matches_placing_pods_one_at_a_time():
+    rng = np.random.default_rng(3)
+    cpu = rng.choice([100.0, 250.0, 500.0, 1500.0], size=400)
+    memory = rng.choice([256.0, 512.0, 1024.0, 3072.0], size=400)
+    node_cpu = np.array([4000.0, 2000.0, 4000.0] * 20)
+    node_memory = np.array([8192.0, 4096.0, 16384.0] * 20)
+
+    size = np.maximum(cpu / node_cpu.max(), memory / node_memory.max())
+    order = sorted(range(len(cpu)), key=lambda pod: (-size[pod], cpu[pod], memory[pod], pod))
+    expected = _one_by_one(cpu, memory, node_cpu, node_memory, order)
+    assert first_fit_decreasing(cpu, memory, node_cpu, node_memory).tolist() == expected
+
+
+def test_planned_updates_free_nodes_or_leave_pods_pending():
+    fixtures = default_fixtures()
+    nodes = [{'name': 'small', 'cpu': '1', 'memory': '1Gi', 'count': 3}]
+    shrink = [{'pod': 'recommendation-service', 'cpu_request': '300m', 'mem_request': '512Mi'}]
+    report = simulate_capacity(fixtures, updates=shrink, nodes=nodes, namespace='default')
+    assert report['unschedulable_before'] == []
+    assert report['nodes_used_before'] == 3
+    assert report['nodes_used_after'] == 2
+    assert report['nodes_freed'] == 1
+
+    grow = [
+        {'pod': 'idle-service', 'mem_request': '900Mi'},
+        {'pod': 'checkout-service', 'mem_request': '900Mi'},
+        {'pod': 'auth-service', 'cpu_request': '800m'},
+    ]
+    report = simulate_capacity(fixtures, updates=grow, nodes=nodes, namespace='default')
+    assert report['newly_unschedulable'] == ['auth-service']
+    assert report['larger_than_any_node'] == []
+    assert report['nodes_needed'] == 1
+
+    report = simulate_capacity(fixtures, updates=[{'pod': 'auth-service', 'cpu_request': '1200m'}], nodes=nodes)
+    assert report['larger_than_any_node'] == ['auth-service']
+    assert report['nodes_needed'] == 0
+
+
+def test_pipeline_dry_run_uses_the_playbook_plan():
+    report = simulate_rebalance(default_fixtures(), 'default')
+    assert [update['pod'] for update in report['planned_updates']] == ['checkout-service', 'idle-service']
+    assert report['before']['mem_limit'] == '5Gi'
+    assert report['after']['mem_limit'] == '5.25Gi'
+    assert report['after']['cpu_request'] == '1720m'
@@ -0,0 +1,83 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from k8s_balancer.integrations.cassette import Cassette, CassetteMissError, normalize_prompt, request_hash
+
+
+def test_normalization_ignores_per_run_ids():
+    first = 'tool call_abc123 id 0b6e1d7a-1c2f-4d1e-9a55-5c3f1b2a9e10 wrote /tmp/k8s_balancer_state_x1.json'
+    second = 'tool  call_zz9   id 6a1f0e55-2b3c-4d4e-8f90-123456789abc wrote /tmp/k8s_balancer_state_q7.json'
+    assert normalize_prompt(first) == normalize_prompt(second)
+    assert request_hash(first) == request_hash(second)
+
+
+class Connector:
+    """Stands in for an mcp-use connector; answers from a live counter so replays can be told apart."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def call_tool(self, name, arguments):
+        self.calls.append((name, arguments))
+        return {'live': len(self.calls)}
+
+
+def _replay(cassette, calls):
+    connector = cassette.guard(Connector())
+
+    async def run():
+        return [await connector.call_tool(name, arguments) for name, arguments in calls]
+
+    return asyncio.run(run()), connector.calls
+
+
+def test_tool_calls_replay_turn_by_turn(tmp_path):
+    calls = [
+        ('k8s_describe_pod', {'pod': 'checkout-service'}),
+        ('k8s_update_resources', {'pod': 'checkout-service', 'mem_limit': '1.25Gi'}),
+        ('k8s_describe_pod', {'pod': 'checkout-service'}),
+    ]
+    recorded, _ = _replay(Cassette(str(tmp_path), mode='record'), calls)
+    assert recorded == [{'live': 1}, {'live': 2}, {'live': 3}]
+
+    # Repeats of one call replay in order; the server still receives every call.
+    replayer = Cassette(str(tmp_path), mode='strict')
+    results, sent = _replay(replayer, calls)
+    assert results == recorded
+    assert sent == calls
+    assert replayer.hits == 3
+
+
+def test_strict_mode_fails_on_an_unrecorded_tool_call(tmp_path):
+    _replay(Cassette(str(tmp_path), mode='record'), [('k8s_describe_pod', {'pod': 'checkout-service'})])
+    with pytest.raises(CassetteMissError):
+        _replay(Cassette(str(tmp_path), mode='strict'), [('k8s_describe_pod', {'pod': 'idle-service'})])
+
+    # Plain replay falls back to the live server and records the new call.
+    replayer = Cassette(str(tmp_path), mode='replay')
+    _replay(replayer, [('k8s_describe_pod', {'pod': 'idle-service'})])
+    assert replayer.misses == 1
+    assert _replay(Cassette(str(tmp_path), mode='strict'), [('k8s_describe_pod', {'pod': 'idle-service'})])[0] == [{'live': 1}]
+
+
+def test_llm_cache_round_trips_generations(tmp_path):
+    pytest.importorskip('langchain_core')
+    from langchain_core.messages import AIMessage
+    from langchain_core.outputs import ChatGeneration
+
+    generations = [ChatGeneration(message=AIMessage(content='{"ok": true}'))]
+    recorder = Cassette(str(tmp_path), mode='record').llm_cache()
+    recorder.update('prompt', 'gpt-4o-mini', generations)
+    assert recorder.lookup('prompt', 'gpt-4o-mini') is None
+
+    replayer = Cassette(str(tmp_path), mode='strict').llm_cache()
+    assert [generation.message.content for generation in replayer.lookup('prompt', 'gpt-4o-mini')] == ['{"ok": true}']
+    with pytest.raises(CassetteMissError):
+        replayer.lookup('other prompt', 'gpt-4o-mini')
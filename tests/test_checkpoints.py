@@ -0,0 +1,132 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from k8s_balancer.agent.agent_runner import MCPToolAgentRunner
+from k8s_balancer.core.checkpoints import CheckpointStore, reconcile
+from k8s_balancer.mcp.server import BalancerTools, default_fixtures
+
+
+def test_store_tracks_stages_and_reconciles_in_flight_actions(tmp_path):
+    store = CheckpointStore(str(tmp_path / 'checkpoints.db'))
+    store.mark_many('run-1', [('pod-%d' % index, None) for index in range(100)], 'scanned')
+    store.mark('run-1', 'pod-1', 'in_flight', {'tool': 'k8s_update_resources', 'changes': {'mem_limit': '1.25Gi'}})
+    store.mark('run-1', 'pod-2', 'in_flight', {'tool': 'k8s_update_resources', 'changes': {'cpu_request': '200m'}})
+    store.mark('run-1', 'pod-3', 'in_flight', {'tool': 'jira_create_issue', 'entry': {'title': 'x'}})
+    store.mark('run-2', 'pod-1', 'applied', {'tool': 'k8s_update_resources'})
+
+    assert store.progress('run-1') == {'scanned': 100, 'decided': 0, 'in_flight': 3, 'applied': 0, 'notified': 0}
+    assert sorted(store.in_flight('run-1')) == ['pod-1', 'pod-2', 'pod-3']
+
+    # pod-1's limit already shows the change; pod-2's request does not; escalations leave no trace.
+    live = {'pod-1': {'mem_limit': '1280Mi'}, 'pod-2': {'cpu_request': '250m'}}
+    assert reconcile(store, 'run-1', live.get) == {'confirmed': ['pod-1'], 'reopened': ['pod-2', 'pod-3']}
+    assert store.in_flight('run-1') == {}
+    applied = store.load('run-1')['pod-1']['applied']
+    assert [payload['changes'] for payload in applied.values()] == [{'mem_limit': '1.25Gi'}]
+    with pytest.raises(ValueError):
+        store.mark('run-1', 'pod-1', 'bogus')
+
+
+def test_resumed_server_skips_completed_work():
+    store = CheckpointStore()
+    first = BalancerTools(default_fixtures(), checkpoints=store, run_id='run-1')
+
+    async def interrupted():
+        await first.describe('checkout-service')
+        await first.query_metrics('checkout-service', 'memory', '24h')
+        await first.update_resources('checkout-service', mem_limit='1.25Gi')
+        await first.create_issue('PLAT', 'Inconsistent metrics for recommendation-service', 'spikes')
+        await first.describe('idle-service')
+        await first.triage('default')
+
+    asyncio.run(interrupted())
+    progress = store.load('run-1')
+    # Triage skips pods already acted on in this run, so only idle-service is decided.
+    assert progress['checkout-service'].keys() == {'scanned', 'in_flight', 'applied'}
+    assert progress['idle-service']['decided'] == {'action': 'decrease_requests'}
+
+    fixtures = default_fixtures()
+    fixtures['descriptions']['checkout-service'] = {'mem_limit': 'changed'}
+    resumed = BalancerTools(fixtures, checkpoints=store, run_id='run-1')
+    report = resumed.resume()
+    assert sorted(report['completed']) == ['checkout-service', 'recommendation-service']
+    assert report['scanned'] == 2
+
+    async def resumed_run():
+        return (
+            await resumed.describe('checkout-service'),
+            await resumed.query_metrics('checkout-service', 'memory', '24h'),
+            await resumed.triage('default'),
+            await resumed.update_resources('checkout-service', mem_limit='1.25Gi'),
+            await resumed.create_issue('PLAT', 'Inconsistent metrics for recommendation-service', 'spikes'),
+            await resumed.update_resources('idle-service', cpu_request='320m', mem_request='410Mi'),
+            await resumed.post_message('#ops', 'done'),
+        )
+
+    description, memory, triage, repeat, issue, update, _ = asyncio.run(resumed_run())
+    # Reads come from the checkpoint rather than the (changed) source.
+    assert description['mem_limit'] == '1Gi'
+    assert memory == {'avg': 95, 'p95': 98}
+    assert [entry['pod'] for entry in triage['actionable']] == ['idle-service']
+    assert sorted(triage['completed']) == ['checkout-service', 'recommendation-service']
+    assert repeat == {'status': 'already_applied'}
+    assert issue['issue_id'] == 'TEST-1'
+    assert update == {'status': 'updated'}
+    # The action log covers the whole run once each.
+    assert [entry['pod'] for entry in fixtures['updates']] == ['checkout-service', 'idle-service']
+    assert len(fixtures['jira_issues']) == 1
+    assert store.progress('run-1')['notified'] == 3
+
+
+def test_every_action_on_a_pod_survives_a_resume():
+    store = CheckpointStore()
+    first = BalancerTools(default_fixtures(), checkpoints=store, run_id='run-1')
+
+    async def interrupted():
+        await first.update_resources('checkout-service', mem_request='900Mi')
+        await first.update_resources('checkout-service', mem_limit='1.25Gi')
+        await first.create_issue('PLAT', 'Repeated OOM kills on checkout-service', 'still restarting')
+
+    asyncio.run(interrupted())
+    assert len(store.load('run-1')['checkout-service']['applied']) == 3
+    assert store.progress('run-1')['applied'] == 1
+
+    fixtures = default_fixtures()
+    resumed = BalancerTools(fixtures, checkpoints=store, run_id='run-1')
+    assert resumed.resume()['completed'] == ['checkout-service']
+    assert [entry['mem_request'] or entry['mem_limit'] for entry in fixtures['updates']] == ['900Mi', '1.25Gi']
+    assert len(fixtures['jira_issues']) == 1
+
+    async def resumed_run():
+        return (
+            await resumed.update_resources('checkout-service', mem_request='900Mi'),
+            await resumed.update_resources('checkout-service', mem_limit='1.25Gi'),
+            await resumed.create_issue('PLAT', 'Repeated OOM kills on checkout-service', 'still restarting'),
+        )
+
+    first_update, second_update, issue = asyncio.run(resumed_run())
+    assert first_update == second_update == {'status': 'already_applied'}
+    assert issue['issue_id'] == 'TEST-1'
+    assert len(fixtures['updates']) == 2 and len(fixtures['jira_issues']) == 1
+
+
+def test_runner_resume_wiring(tmp_path):
+    with pytest.raises(ValueError):
+        MCPToolAgentRunner(None, client_config={'mcpServers': {'test': {}}}, cassette=None, resume=True)
+
+    db = str(tmp_path / 'checkpoints.db')
+    runner = MCPToolAgentRunner(
+        None, client_config={'mcpServers': {'test': {}}}, cassette=None, run_id='run-7', checkpoint_db=db, resume=True,
+    )
+    with runner.server_environment() as (client_config, _):
+        env = client_config['mcpServers']['test']['env']
+    assert env['K8S_BALANCER_CHECKPOINT_DB'] == db
+    assert env['K8S_BALANCER_RUN_ID'] == 'run-7'
+    assert env['K8S_BALANCER_RESUME'] == '1'
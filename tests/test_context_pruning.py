@@ -0,0 +1,134 @@
+import asyncio
+import sys
+from types import SimpleNamespace
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from k8s_balancer.agent.agent_runner import MCPToolAgentRunner
+from k8s_balancer.agent.context_pruning import ContextPruner
+
+
+class Action:
+    """Stands in for LangChain's ToolAgentAction: steps of one turn share `message_log`."""
+
+    def __init__(self, tool, tool_input, message_log):
+        self.tool = tool
+        self.tool_input = tool_input
+        self.message_log = message_log
+
+
+def _scan(pods):
+    """Steps for a triage turn, then per pod one turn of reads and, for every other pod, an update."""
+    steps = [(Action('k8s_triage_namespace', {'namespace': 'default'}, [object()]), 'queue ' * 50)]
+    for index in range(pods):
+        pod = 'pod-%d' % index
+        turn = [object()]
+        steps.append((Action('k8s_describe_pod', {'pod': pod}, turn), 'description of %s ' % pod * 40))
+        steps.append((Action('k8s_query_metrics', {'pod': pod, 'metric': 'memory', 'window': '24h'}, turn), 'x' * 400))
+        if index % 2 == 0:
+            changes = {'pod': pod, 'mem_limit': '1.25Gi', 'cpu_limit': None}
+            steps.append((Action('k8s_update_resources', changes, [object()]), '{"status": "updated"}'))
+    return steps
+
+
+def test_decided_reads_are_compacted_and_old_turns_dropped():
+    pruner = ContextPruner(keep_turns=3)
+    sent, note = pruner.prune(_scan(6))
+
+    # Triage is pinned; the last three turns are pod-4's reads and update and pod-5's reads.
+    assert [(action.tool, action.tool_input.get('pod')) for action, _ in sent] == [
+        ('k8s_triage_namespace', None),
+        ('k8s_describe_pod', 'pod-4'),
+        ('k8s_query_metrics', 'pod-4'),
+        ('k8s_update_resources', 'pod-4'),
+        ('k8s_describe_pod', 'pod-5'),
+        ('k8s_query_metrics', 'pod-5'),
+    ]
+    assert sent[1][1] == '[compacted k8s_describe_pod output] pod-4: updated mem_limit=1.25Gi -> {"status": "updated"}'
+    assert sent[4][1].startswith('description of pod-5')
+    assert note.splitlines()[1:] == [
+        '- decided pod-0: updated mem_limit=1.25Gi -> {"status": "updated"}',
+        '- decided pod-2: updated mem_limit=1.25Gi -> {"status": "updated"}',
+        '- decided pod-4: updated mem_limit=1.25Gi -> {"status": "updated"}',
+        '- skipped, no action needed (report under pods_skipped unless acted on later): pod-1; pod-3',
+    ]
+
+    # Short runs keep every step and need no note; decided reads are still compacted.
+    sent, note = pruner.prune(_scan(1))
+    assert note is None and len(sent) == 4
+    assert sent[1][1].startswith('[compacted k8s_describe_pod output] pod-0')
+
+
+def test_escalations_are_matched_to_the_longest_pod_name():
+    turn = [object()]
+    steps = [
+        (Action('k8s_describe_pod', {'pod': 'web'}, turn), 'web ' * 100),
+        (Action('k8s_describe_pod', {'pod': 'web-canary'}, turn), 'canary ' * 100),
+        (Action('jira_create_issue', {'project': 'PLAT', 'title': 'Spiky web-canary', 'body': ''}, [object()]), 'TEST-1'),
+    ]
+    sent, _ = ContextPruner(keep_turns=5).prune(steps)
+    assert sent[0][1] == 'web ' * 100
+    assert sent[1][1] == "[compacted k8s_describe_pod output] web-canary: escalated 'Spiky web-canary' -> TEST-1"
+
+
+def test_healthy_pods_are_reported_as_skipped_once_their_turns_age_out():
+    steps = []
+    for index in range(10):
+        pod = 'ok-%d' % index
+        turn = [object()]
+        steps.append((Action('k8s_describe_pod', {'pod': pod}, turn), '{"mem_limit": "1Gi"}'))
+        steps.append((Action('k8s_query_metrics', {'pod': pod, 'metric': 'memory', 'window': '24h'}, turn), '{"avg": 40, "p95": 55}'))
+    sent, note = ContextPruner(keep_turns=2).prune(steps)
+
+    assert [action.tool_input['pod'] for action, _ in sent] == ['ok-8', 'ok-8', 'ok-9', 'ok-9']
+    skipped = note.splitlines()[-1]
+    assert 'read without a decision' not in note and 'pods_skipped' in skipped
+    assert skipped.endswith(': ' + '; '.join('ok-%d (memory p95=55)' % index for index in range(8)))
+
+
+def test_prompt_size_stays_flat_as_the_namespace_grows():
+    sizes = {}
+    for pods in (20, 200, 2000):
+        pruner = ContextPruner(keep_turns=4)
+        pruner.prune(_scan(pods))
+        sizes[pods] = pruner.turns[-1]
+    # Unpruned, the prompt grows with every pod; pruned, only the pod-name ledger does.
+    assert sizes[2000]['chars_before'] > 90 * sizes[20]['chars_before']
+    assert sizes[2000]['sent'] == sizes[20]['sent']
+    assert sizes[2000]['chars_after'] < sizes[2000]['chars_before'] / 20
+
+
+def test_runner_attaches_the_pruner_to_the_executor(monkeypatch):
+    seen = []
+
+    class Executor:
+        async def _atake_next_step(self, name_to_tool_map, color_mapping, inputs, intermediate_steps, run_manager=None):
+            seen.append((inputs['input'], len(intermediate_steps)))
+            return []
+
+    class Agent:
+        _agent_executor = Executor()
+
+    agent = Agent()
+    assert ContextPruner(keep_turns=2).attach(agent)
+    asyncio.run(agent._agent_executor._atake_next_step(
+        name_to_tool_map={}, color_mapping={}, inputs={'input': 'rebalance'}, intermediate_steps=_scan(4),
+    ))
+    assert seen[0][1] == 4 and seen[0][0].startswith('rebalance\n\nProgress so far')
+
+    # An executor without the expected private hook is left alone.
+    class OtherExecutor:
+        async def _atake_next_step(self, inputs, steps):
+            return []
+
+    other = SimpleNamespace(_agent_executor=OtherExecutor())
+    assert not ContextPruner().attach(other)
+    assert not ContextPruner().attach(SimpleNamespace(_agent_executor=None))
+    assert '_atake_next_step' not in vars(other._agent_executor)
+
+    monkeypatch.setenv('K8S_BALANCER_CONTEXT_TURNS', '0')
+    runner = MCPToolAgentRunner(None, client_config={'mcpServers': {'test': {}}}, cassette=None)
+    assert runner.context_turns == 0
@@ -0,0 +1,107 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from k8s_balancer.agent.agent_runner import MCPToolAgentRunner
+from k8s_balancer.agent.deadlines import RunDeadlines, ToolTimeout
+from k8s_balancer.core.run_state import RunState
+from k8s_balancer.mcp.server import BalancerTools, default_fixtures
+
+
+class SlowConnector:
+    """Answers instantly except for pods listed in `hung`, which never return."""
+
+    def __init__(self, hung=()):
+        self.hung = set(hung)
+        self.cancelled = []
+
+    async def call_tool(self, name, arguments):
+        if arguments.get('pod') in self.hung:
+            try:
+                await asyncio.sleep(3600)
+            except asyncio.CancelledError:
+                self.cancelled.append(arguments['pod'])
+                raise
+        return {'tool': name}
+
+
+def test_hung_tool_call_is_cancelled_and_the_run_goes_on():
+    deadlines = RunDeadlines(tool=0.05)
+    connector = deadlines.guard(SlowConnector(hung=['stuck']))
+
+    async def agent():
+        results = []
+        for pod in ('a', 'stuck', 'b'):
+            try:
+                results.append(await connector.call_tool('k8s_describe_pod', {'pod': pod}))
+            except ToolTimeout:
+                results.append('timeout')
+        return results
+
+    assert asyncio.run(deadlines.supervise(agent())) == [{'tool': 'k8s_describe_pod'}, 'timeout', {'tool': 'k8s_describe_pod'}]
+    assert connector.cancelled == ['stuck']
+    assert deadlines.timeouts == [{'kind': 'tool', 'seconds': 0.05, 'tool': 'k8s_describe_pod', 'pod': 'stuck'}]
+
+
+def test_slow_turn_and_run_deadlines_cancel_the_agent():
+    turn = RunDeadlines(turn=0.05)
+    connector = turn.guard(SlowConnector())
+    cancelled = []
+
+    async def thinking_agent():
+        await connector.call_tool('k8s_list_pods', {'namespace': 'default'})
+        try:
+            await asyncio.sleep(3600)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    assert asyncio.run(turn.supervise(thinking_agent())) is None
+    assert cancelled == [True]
+    assert [entry['kind'] for entry in turn.timeouts] == ['turn']
+
+    # A tool call in flight is not an LLM turn; the run deadline still cuts it off.
+    run = RunDeadlines(turn=0.05, run=0.2)
+    connector = run.guard(SlowConnector(hung=['stuck']))
+    assert asyncio.run(run.supervise(connector.call_tool('k8s_query_metrics', {'pod': 'stuck'}))) is None
+    assert [(entry['kind'], entry['pod']) for entry in run.timeouts] == [('run', None), ('run', 'stuck')]
+
+
+def test_partial_result_lists_timed_out_pods_as_deferred(tmp_path):
+    state_file = tmp_path / 'state.json'
+    tools = BalancerTools(default_fixtures(), state_file=str(state_file))
+    asyncio.run(tools.update_resources('checkout-service', mem_limit='1.25Gi'))
+    runner = MCPToolAgentRunner(None, client_config={'mcpServers': {'test': {}}}, fixtures=default_fixtures(), cassette=None)
+    state = RunState.from_files(str(state_file))
+    state['timeouts'] = [
+        {'kind': 'tool', 'seconds': 5.0, 'tool': 'k8s_query_metrics', 'pod': 'idle-service'},
+        {'kind': 'run', 'seconds': 60.0, 'tool': 'k8s_describe_pod', 'pod': 'auth-service'},
+    ]
+
+    result = runner._result_from_state('default', state)
+
+    assert result.deferred == ['recommendation-service', 'idle-service', 'auth-service']
+    deferred = {entry['name']: entry for entry in result.summary['pods_deferred']}
+    assert deferred['idle-service']['timed_out'] and deferred['auth-service']['timed_out']
+    assert 'timed_out' not in deferred['recommendation-service']
+    assert [entry['pod'] for entry in result.timeouts] == ['idle-service', 'auth-service']
+    assert [entry['pod_name'] for entry in result.summary['pods_rebalanced']] == ['checkout-service']
+
+
+@pytest.mark.parametrize('value', [None, '2.5'])
+def test_runner_reads_deadlines_from_env(monkeypatch, value):
+    if value is None:
+        monkeypatch.delenv('K8S_BALANCER_TOOL_TIMEOUT', raising=False)
+    else:
+        monkeypatch.setenv('K8S_BALANCER_TOOL_TIMEOUT', value)
+    runner = MCPToolAgentRunner(None, client_config={'mcpServers': {'test': {}}}, cassette=None)
+    with runner.server_environment() as (client_config, _):
+        env = client_config['mcpServers']['test']['env']
+    assert runner.tool_timeout == (None if value is None else 2.5)
+    assert env.get('K8S_BALANCER_TOOL_TIMEOUT') == (None if value is None else '2.5')
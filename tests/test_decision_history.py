@@ -0,0 +1,144 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from k8s_balancer.core.decision_engine import DecisionEngine
+from k8s_balancer.core.decision_history import DecisionHistory, HysteresisPolicy, applied_action
+from k8s_balancer.mcp.server import BalancerTools, default_fixtures
+
+
+def _snapshot(name, cpu_avg, mem_avg, oom=0):
+    return {
+        'name': name,
+        'metrics': {
+            'cpu': {'avg': cpu_avg, 'p95': cpu_avg + 5},
+            'memory': {'avg': mem_avg, 'p95': mem_avg + 3},
+            'oom_kills': {'avg': oom, 'p95': oom},
+        },
+        'description': {'mem_limit': '1Gi'},
+    }
+
+
+def _decision(name, action):
+    return {'name': name, 'classification': 'x', 'recommended_action': action, 'reason': 'rule'}
+
+
+def test_last_decisions_come_newest_first_from_the_index(tmp_path):
+    history = DecisionHistory(str(tmp_path / 'history.db'))
+    history.record_many([('pod-%d' % (index % 50), _decision('p', 'skip')) for index in range(5000)], timestamp=100)
+    history.record('pod-7', _decision('pod-7', 'decrease_requests'), timestamp=200)
+    history.record_applied('pod-7', 'decrease_requests', {'cpu_request': '200m'}, timestamp=300)
+
+    assert len(history) == 5002
+    latest = history.last('pod-7', limit=3)
+    assert [row['timestamp'] for row in latest] == [300, 200, 100]
+    assert history.last_applied('pod-7')['changes'] == {'cpu_request': '200m'}
+    assert history.last_applied('pod-8') is None
+
+    plan = history._connection.execute(
+        'EXPLAIN QUERY PLAN SELECT * FROM decisions WHERE pod = ? ORDER BY timestamp DESC LIMIT 5', ('pod-7',),
+    ).fetchall()
+    assert any('USING INDEX' in str(row) for row in plan)
+
+
+def test_cooldown_and_hysteresis_hold_back_flapping():
+    history = DecisionHistory()
+    policy = HysteresisPolicy(cooldown='6h', band=5)
+    now = time.time()
+    history.record_applied('web', 'decrease_requests', {'cpu_request': '320m'}, timestamp=now - 3600)
+
+    held = policy.review(_decision('web', 'increase_memory_limit'), _snapshot('web', 50, 93), history, now=now)
+    assert held['recommended_action'] == 'skip'
+    assert held['held_action'] == 'increase_memory_limit'
+    assert held['reason'].startswith('cooldown')
+
+    # OOM kills are a safety signal and always go through.
+    urgent = _decision('web', 'increase_memory_limit')
+    assert policy.review(urgent, _snapshot('web', 50, 93, oom=4), history, now=now) is urgent
+
+    # Past the cooldown, reversing the last change needs the metrics past the band.
+    later = now + 7 * 3600
+    assert policy.review(_decision('web', 'increase_memory_limit'), _snapshot('web', 50, 93), history, now=later)['reason'].startswith('hysteresis')
+    assert policy.review(_decision('web', 'increase_memory_limit'), _snapshot('web', 50, 97), history, now=later)['recommended_action'] == 'increase_memory_limit'
+    # Repeating the same direction is not a reversal.
+    assert policy.review(_decision('web', 'decrease_requests'), _snapshot('web', 18, 17), history, now=later)['recommended_action'] == 'decrease_requests'
+
+
+def test_server_logs_updates_and_triage_holds_recent_changes():
+    history = DecisionHistory()
+    tools = BalancerTools(default_fixtures(), history=history)
+
+    async def scenario():
+        await tools.update_resources('idle-service', cpu_request='320m', mem_request='410Mi')
+        return await tools.triage('default')
+
+    triage = asyncio.run(scenario())
+    assert history.last_applied('idle-service')['action'] == 'decrease_requests'
+    assert [entry['pod'] for entry in triage['held']] == ['idle-service']
+    assert 'idle-service' not in [entry['pod'] for entry in triage['actionable']]
+    # checkout-service is OOM-driven; recommendation-service is an escalation.
+    assert {entry['pod'] for entry in triage['actionable']} == {'checkout-service', 'recommendation-service'}
+
+
+def test_direct_updates_are_held_by_cooldown():
+    history = DecisionHistory()
+    fixtures = default_fixtures()
+    tools = BalancerTools(fixtures, history=history)
+
+    async def scenario():
+        return (
+            await tools.update_resources('idle-service', cpu_request='320m', mem_request='410Mi'),
+            await tools.update_resources('idle-service', cpu_request='250m', mem_request='320Mi'),
+            # OOM-driven increases go through the cooldown.
+            await tools.update_resources('checkout-service', mem_limit='1.25Gi'),
+            await tools.update_resources('checkout-service', mem_limit='1.5Gi'),
+        )
+
+    first, repeat, oom_first, oom_repeat = asyncio.run(scenario())
+    assert first == {'status': 'updated'}
+    assert repeat['status'] == 'held' and repeat['held_action'] == 'decrease_requests'
+    assert repeat['reason'].startswith('cooldown')
+    assert oom_first == oom_repeat == {'status': 'updated'}
+    assert [entry['pod'] for entry in fixtures['updates']] == ['idle-service', 'checkout-service', 'checkout-service']
+    assert history.last('idle-service', limit=1)[0]['action'] == 'skip'
+
+
+def test_applied_action_follows_the_direction_of_the_change():
+    current = {'cpu_request': '400m', 'mem_request': '512Mi', 'mem_limit': '1Gi'}
+    assert applied_action({'cpu_request': '320m', 'mem_request': '410Mi'}, current) == 'decrease_requests'
+    assert applied_action({'cpu_request': '500m'}, current) == 'increase_requests'
+    assert applied_action({'cpu_request': '320m', 'mem_request': '1Gi'}, current) == 'adjust_requests'
+    assert applied_action({'cpu_request': '320m'}) == 'adjust_requests'
+    assert applied_action({'mem_limit': '1.25Gi'}, current) == 'increase_memory_limit'
+    assert applied_action({'mem_limit': '768Mi'}, current) == 'update_resources'
+
+
+def test_server_records_a_request_raise_as_an_increase():
+    history = DecisionHistory()
+    fixtures = default_fixtures()
+    tools = BalancerTools(fixtures, history=history, policy=HysteresisPolicy(cooldown=0))
+
+    async def scenario():
+        await tools.update_resources('idle-service', cpu_request='320m', mem_request='410Mi')
+        return await tools.update_resources('idle-service', cpu_request='400m', mem_request='512Mi')
+
+    assert asyncio.run(scenario()) == {'status': 'updated'}
+    assert history.last_applied('idle-service')['action'] == 'increase_requests'
+
+
+def test_engine_reviews_batches_against_history():
+    history = DecisionHistory()
+    history.record_applied('idle', 'decrease_requests', {'cpu_request': '80m'})
+    engine = DecisionEngine.__new__(DecisionEngine)
+    engine.history = history
+    engine.policy = HysteresisPolicy()
+
+    decisions = engine.analyze_pods([_snapshot('idle', 10, 12), _snapshot('fresh', 10, 12)], workers=1)
+    assert [decision['recommended_action'] for decision in decisions] == ['skip', 'decrease_requests']
+    assert decisions[0]['held_action'] == 'decrease_requests'
+    assert len(history) == 3
@@ -0,0 +1,39 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from k8s_balancer.agent.agent_runner import MCPToolAgentRunner
+from k8s_balancer.core.fixture_format import is_binary_fixture
+from k8s_balancer.core.pod_model import serialize_metrics
+from k8s_balancer.mcp.server import _load_fixtures_from_file, default_fixtures
+
+
+def _write(tmp_path, fixtures, fixture_format):
+    runner = MCPToolAgentRunner(None, client_config={'mcpServers': {'test': {}}}, fixture_format=fixture_format)
+    path = tmp_path / ('fixtures.' + fixture_format)
+    runner._write_fixture_file(fixtures, str(path))
+    return str(path)
+
+
+def test_binary_and_json_fixtures_load_identically(tmp_path):
+    fixtures = default_fixtures()
+    fixtures['metrics'][('auth-service', 'memory', '7d')] = {'avg': 41.5}
+    fixtures['updates'].append({'pod': 'idle-service', 'cpu_request': '320m'})
+
+    binary_path = _write(tmp_path, fixtures, 'binary')
+    json_path = _write(tmp_path, fixtures, 'json')
+    assert is_binary_fixture(binary_path)
+    assert not is_binary_fixture(json_path)
+
+    binary = _load_fixtures_from_file(binary_path)
+    parsed = _load_fixtures_from_file(json_path)
+
+    assert dict(binary['metrics']) == parsed['metrics'] == fixtures['metrics']
+    assert binary['metrics'].get(('auth-service', 'memory', '7d')) == {'avg': 41.5}
+    assert binary['metrics'].get(('auth-service', 'memory', '1h')) is None
+    assert dict(binary['descriptions']) == fixtures['descriptions']
+    assert binary['updates'] == fixtures['updates']
+    assert serialize_metrics(binary['metrics']) == serialize_metrics(fixtures['metrics'])
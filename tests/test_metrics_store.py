@@ -0,0 +1,77 @@
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from k8s_balancer.core.metrics_store import MetricsStore, TDigest, parse_window
+from k8s_balancer.mcp.server import default_fixtures, query_metrics
+
+
+def test_parse_window():
+    assert parse_window('1h') == 3600
+    assert parse_window('7d') == 7 * 86400
+    with pytest.raises(ValueError):
+        parse_window('yesterday')
+
+
+def test_tdigest_quantiles_and_merge():
+    rng = random.Random(7)
+    values = [rng.uniform(0, 1000) for _ in range(20000)]
+    left, right = TDigest(), TDigest()
+    for index, value in enumerate(values):
+        (left if index % 2 else right).add(value)
+    merged = TDigest().merge(left).merge(right)
+    values.sort()
+    assert merged.count == len(values)
+    assert merged.quantile(0.95) == pytest.approx(values[int(0.95 * len(values))], rel=0.01)
+    assert merged.quantile(0.5) == pytest.approx(values[len(values) // 2], rel=0.03)
+
+
+def test_store_answers_any_window_from_rollups():
+    store = MetricsStore()
+    day = 86400
+    # Six quiet days at 20%, then a busy last day at 80%, one sample every minute.
+    for minute in range(7 * day // 60):
+        timestamp = minute * 60
+        store.add('api', 'cpu', timestamp, 80 if timestamp >= 6 * day else 20)
+    assert store.query('api', 'cpu', '24h') == {'avg': 80, 'p95': 80}
+    assert store.query('api', 'cpu', '1h')['avg'] == 80
+    week = store.query('api', 'cpu', '7d')
+    assert week['avg'] == pytest.approx(20 + 60 / 7, abs=0.5)
+    assert week['p95'] == pytest.approx(80, abs=1)
+    assert store.query('api', 'memory', '24h') is None
+
+
+def test_counter_metrics_report_window_totals_and_round_trip():
+    store = MetricsStore()
+    for hour in range(48):
+        store.add('api', 'oom_kills', hour * 3600, 1 if hour % 12 == 0 else 0)
+    assert store.query('api', 'oom_kills', '24h') == {'avg': 2, 'p95': 2}
+    restored = MetricsStore.from_dict(store.to_dict())
+    assert restored.query('api', 'oom_kills', '24h') == {'avg': 2, 'p95': 2}
+
+
+def test_server_query_falls_back_to_store():
+    fixtures = default_fixtures()
+    store = MetricsStore()
+    store.add('checkout-service', 'cpu', 0, 33)
+    assert query_metrics(fixtures, store, 'checkout-service', 'cpu', '24h') == {'avg': 65, 'p95': 80}
+    assert query_metrics(fixtures, store, 'checkout-service', 'cpu', '7d') == {'avg': 33, 'p95': 33}
+    assert query_metrics(fixtures, None, 'checkout-service', 'cpu', '7d') is None
+
+
+def test_parts_are_summed_at_query_time_and_round_trip():
+    store = MetricsStore()
+    for minute in range(10):
+        store.add('web', 'memory', minute * 60, 20, part='app')
+        store.add('web', 'memory', minute * 60, 30 if minute < 9 else 70, part='sidecar')
+    assert store.series() == [('web', 'memory')]
+    assert ('web', 'memory') in store
+    assert store.query('web', 'memory', '1h') == {'avg': 54, 'p95': 90}
+    restored = MetricsStore.from_dict(store.to_dict())
+    assert restored.query('web', 'memory', '1h') == {'avg': 54, 'p95': 90}
@@ -0,0 +1,57 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from k8s_balancer.core.decision_engine import evaluate_pod, pod_snapshots_from_fixtures
+from k8s_balancer.core.pod_model import PodSnapshot, PodTable, deserialize_metrics, serialize_metrics
+from k8s_balancer.core.sharded_engine import classify_columns, decisions_from_codes
+from k8s_balancer.core.summary_builder import outcome_from_table
+from k8s_balancer.mcp.server import default_fixtures
+
+
+def test_metrics_serializer_round_trips():
+    metrics = default_fixtures()['metrics']
+    assert deserialize_metrics(serialize_metrics(metrics)) == metrics
+
+
+def test_table_rows_match_fixture_snapshots():
+    fixtures = default_fixtures()
+    fixtures['pods']['default'].append('unmetered-service')
+    table = PodTable.from_fixtures(fixtures, 'default')
+
+    expected = pod_snapshots_from_fixtures(fixtures, 'default')
+
+    assert [row.to_dict() for row in table] == expected
+    assert table.row('checkout-service').mem_limit == '1Gi'
+    assert table.row('unmetered-service').cpu_avg is None
+    assert table.metrics_mapping() == fixtures['metrics']
+
+
+def test_engine_columns_classify_like_evaluate_pod():
+    fixtures = default_fixtures()
+    table = PodTable.from_fixtures(fixtures, 'default')
+
+    decisions = decisions_from_codes(table.names, classify_columns(table.engine_columns(), workers=1))
+
+    assert decisions == [evaluate_pod(snapshot) for snapshot in pod_snapshots_from_fixtures(fixtures, 'default')]
+    outcome = outcome_from_table('default', table, decisions)
+    assert outcome['pods_scanned'] == 4
+    # Same shape and planned values as the runner reports for an agent run.
+    assert outcome['pods_rebalanced'] == [
+        {'pod_name': 'checkout-service', 'changed_fields': {'mem_limit': '1.25Gi'}},
+        {'pod_name': 'idle-service', 'changed_fields': {'cpu_request': '320m', 'mem_request': '410Mi'}},
+    ]
+    assert [entry['pod_name'] for entry in outcome['pods_escalated']] == ['recommendation-service']
+    assert [entry['pod_name'] for entry in outcome['pods_skipped']] == ['auth-service']
+
+
+def test_snapshot_uses_slots():
+    snapshot = PodSnapshot.from_dict(pod_snapshots_from_fixtures(default_fixtures(), 'default')[0])
+    with pytest.raises(AttributeError):
+        snapshot.extra = 1
+    assert snapshot.to_dict()['metrics']['memory'] == {'avg': 95, 'p95': 98}
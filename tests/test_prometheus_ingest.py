@@ -0,0 +1,101 @@
+import gzip
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from k8s_balancer.core.metrics_store import MetricsStore
+from k8s_balancer.integrations.prometheus import ingest_file, parse_sample
+from k8s_balancer.mcp.server import default_fixtures, load_prometheus_dump, query_metrics
+
+
+DUMP = '''# HELP container_memory_working_set_bytes Current working set.
+# TYPE container_memory_working_set_bytes gauge
+container_memory_working_set_bytes{namespace="default",pod="api",container="app"} 536870912 1700000000000
+container_memory_working_set_bytes{namespace="default",pod="api",container="app"} 805306368 1700000060000
+container_memory_working_set_bytes{namespace="default",pod="api",container="POD"} 1 1700000060000
+container_memory_working_set_bytes{namespace="staging",pod="other",container="app"} 1 1700000060000
+container_cpu_usage_seconds_total{namespace="default",pod="api",container="app"} 100 1700000000000
+container_cpu_usage_seconds_total{namespace="default",pod="api",container="app"} 115 1700000060000
+container_oom_events_total{namespace="default",pod="api",container="app"} 2 1700000000000
+container_oom_events_total{namespace="default",pod="api",container="app"} 5 1700000060000
+kube_pod_container_resource_limits{namespace="default",pod="api",container="app",resource="memory",unit="byte"} 1073741824
+kube_pod_container_resource_limits{namespace="default",pod="api",container="app",resource="cpu",unit="core"} 0.5
+'''
+
+
+def test_parse_sample_handles_escapes_and_timestamp_units():
+    name, labels, value, timestamp = parse_sample('up{job="a\\"b",path="x\\\\y"} 1 1700000000000')
+    assert (name, labels, value, timestamp) == ('up', {'job': 'a"b', 'path': 'x\\y'}, 1.0, 1700000000.0)
+    assert parse_sample('up 1 1700000000.5')[3] == 1700000000.5
+    assert parse_sample('up NaN')[3] is None
+    assert parse_sample('# TYPE up gauge') is None
+
+
+def test_ingest_maps_series_to_percent_of_limit(tmp_path):
+    path = tmp_path / 'dump.prom.gz'
+    with gzip.open(path, 'wt') as handle:
+        handle.write(DUMP)
+    store = MetricsStore()
+
+    report = ingest_file(path, store, namespace='default')
+
+    assert report['pods'] == {'default': ['api']}
+    assert report['stored'] == 4
+    assert report['samples_per_second'] > 0
+    assert store.query('api', 'memory', '1h') == {'avg': 62.5, 'p95': 75}
+    # 15 cpu-seconds over 60s is 250m against a 500m limit.
+    assert store.query('api', 'cpu', '1h') == {'avg': 50, 'p95': 50}
+    assert store.query('api', 'oom_kills', '24h') == {'avg': 3, 'p95': 3}
+
+
+def test_multi_container_usage_is_summed_against_the_pod_limit(tmp_path):
+    path = tmp_path / 'dump.prom'
+    path.write_text('''container_memory_working_set_bytes{namespace="default",pod="web",container="app"} 268435456 1700000000000
+container_memory_working_set_bytes{namespace="default",pod="web",container="app"} 268435456 1700000060000
+container_memory_working_set_bytes{namespace="default",pod="web",container="sidecar"} 536870912 1700000000000
+container_memory_working_set_bytes{namespace="default",pod="web",container="sidecar"} 805306368 1700000060000
+container_cpu_usage_seconds_total{namespace="default",pod="web",container="app"} 0 1700000000000
+container_cpu_usage_seconds_total{namespace="default",pod="web",container="app"} 30 1700000060000
+container_cpu_usage_seconds_total{namespace="default",pod="web",container="sidecar"} 0 1700000000000
+container_cpu_usage_seconds_total{namespace="default",pod="web",container="sidecar"} 6 1700000060000
+kube_pod_container_resource_limits{namespace="default",pod="web",container="app",resource="memory",unit="byte"} 536870912
+kube_pod_container_resource_limits{namespace="default",pod="web",container="sidecar",resource="memory",unit="byte"} 536870912
+kube_pod_container_resource_limits{namespace="default",pod="web",container="app",resource="cpu",unit="core"} 0.5
+kube_pod_container_resource_limits{namespace="default",pod="web",container="sidecar",resource="cpu",unit="core"} 0.5
+''')
+    store = MetricsStore()
+
+    report = ingest_file(path, store)
+
+    # (256Mi + 512Mi) and (256Mi + 768Mi) of 1Gi; each container is stored as its share of it.
+    assert report['stored'] == 6
+    assert report['series'] == 2
+    assert store.query('web', 'memory', '1h') == {'avg': 87.5, 'p95': 100}
+    # 0.5 + 0.1 cores against the pod's 1 core.
+    assert store.query('web', 'cpu', '1h') == {'avg': 60, 'p95': 60}
+
+
+def test_server_dump_loading_adds_pods_and_serves_windows(tmp_path):
+    path = tmp_path / 'dump.prom'
+    path.write_text(DUMP.replace('pod="api"', 'pod="checkout-service"'))
+    fixtures = default_fixtures()
+    store = MetricsStore()
+
+    load_prometheus_dump(fixtures, store, str(path))
+
+    assert fixtures['pods']['staging'] == ['other']
+    assert fixtures['pods']['default'].count('checkout-service') == 1
+    # The description's 1Gi limit is used; the dump's own limit agrees here.
+    assert query_metrics(fixtures, store, 'checkout-service', 'memory', '6h')['avg'] == 62.5
+
+
+def test_binary_input_is_rejected(tmp_path):
+    path = tmp_path / 'remote-read.bin'
+    path.write_bytes(b'\xff\xfe\x00snappy')
+    with pytest.raises(ValueError, match='protobuf'):
+        ingest_file(path, MetricsStore())
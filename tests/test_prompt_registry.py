@@ -0,0 +1,72 @@
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from k8s_balancer.agent.agent_runner import MCPToolAgentRunner
+from k8s_balancer.core.prompt_loader import PROMPTS_DIR, PromptRegistry, get_prompt, load_prompt_text
+from k8s_balancer.core.run_state import RunState
+
+
+def test_registry_caches_until_mtime_changes(tmp_path):
+    path = tmp_path / 'user.txt'
+    path.write_text('Scan {namespace} and report to {slack_channel}.\n')
+    registry = PromptRegistry(str(tmp_path))
+
+    first = registry.get('user.txt')
+    assert registry.get('user.txt') is first
+    assert first.variables == ('namespace', 'slack_channel')
+    assert first.format(namespace='default', slack_channel='#ops') == 'Scan default and report to #ops.'
+
+    path.write_text('Scan {namespace} only.\n')
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, first.mtime_ns + 1_000_000))
+
+    reloaded = registry.get('user.txt')
+    assert reloaded is not first
+    assert reloaded.version != first.version
+    assert reloaded.static_tokens < first.static_tokens
+    assert registry.versions() == {'user.txt': reloaded.version}
+
+
+def test_missing_prompt_raises(tmp_path):
+    with pytest.raises(RuntimeError, match='Prompt not found'):
+        PromptRegistry(str(tmp_path)).get('absent.txt')
+
+
+def test_default_registry_serves_repo_prompts():
+    prompt = get_prompt('orchestrator_user_prompt.txt')
+    assert load_prompt_text('orchestrator_user_prompt.txt') == prompt.text
+    assert prompt.static_tokens > 0
+
+
+def test_runner_reports_the_prompt_versions_it_ran_with(tmp_path, monkeypatch):
+    for name in (MCPToolAgentRunner.system_prompt_name, MCPToolAgentRunner.user_prompt_name):
+        shutil.copy(os.path.join(PROMPTS_DIR, name), tmp_path / name)
+    registry = PromptRegistry(str(tmp_path))
+    monkeypatch.setattr('k8s_balancer.agent.agent_runner.get_prompt', registry.get)
+    before = registry.get(MCPToolAgentRunner.user_prompt_name)
+    seen = []
+
+    def execute_live(namespace, slack_channel, system_prompt, user_prompt):
+        # The prompt is edited while the agent is still running.
+        path = tmp_path / MCPToolAgentRunner.user_prompt_name
+        path.write_text('Edited mid-run for {namespace} and {slack_channel}.\n')
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, before.mtime_ns + 1_000_000))
+        seen.append(user_prompt)
+        return 'done', RunState({'pods': {}, 'slack_messages': []}), []
+
+    runner = MCPToolAgentRunner(None, client_config={'mcpServers': {'test': {}}}, cassette=None)
+    monkeypatch.setattr(runner, '_execute_live', execute_live)
+    result = runner.execute('default', '#ops')
+
+    assert seen == [before.format(namespace='default', slack_channel='#ops')]
+    assert result.prompt_versions[MCPToolAgentRunner.user_prompt_name] == before.version
+    assert registry.get(MCPToolAgentRunner.user_prompt_name).version != before.version
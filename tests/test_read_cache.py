@@ -0,0 +1,144 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from k8s_balancer.core.read_cache import ReadCache
+from k8s_balancer.integrations.k8s_client import KubernetesMCPClient
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingTransport:
+    def __init__(self):
+        self.calls = []
+        self.status = 'updated'
+
+    def call(self, tool, body):
+        self.calls.append(tool)
+        if tool == 'mcp:k8s.list_workloads':
+            return {'items': [{'workload': 'Deployment/web', 'pods': ['web-1', 'web-2']}]}
+        if tool == 'mcp:k8s.update_resources':
+            return {'status': self.status}
+        if tool == 'mcp:k8s.describe':
+            return {'pod': body['pod'], 'mem_limit': '1Gi'}
+        return {'avg': len(self.calls), 'p95': 90}
+
+
+def _client(cache):
+    client = KubernetesMCPClient.__new__(KubernetesMCPClient)
+    client.client = CountingTransport()
+    client.cache = cache
+    client._workload_pods = {}
+    client._pod_workload = {}
+    return client
+
+
+def test_per_kind_ttls_and_lru_bound():
+    clock = Clock()
+    cache = ReadCache(ttls={'describe': 60, 'metrics': 10}, max_entries=3, clock=clock)
+    loads = []
+
+    def loader(value):
+        return lambda: loads.append(value) or value
+
+    assert cache.get_or_load('describe', 'a', None, loader('a')) == 'a'
+    assert cache.get_or_load('metrics', 'a', ('cpu', '24h'), loader('a-cpu')) == 'a-cpu'
+    clock.now = 11
+    # Metrics expired, the description did not.
+    assert cache.get_or_load('metrics', 'a', ('cpu', '24h'), loader('a-cpu-2')) == 'a-cpu-2'
+    assert cache.get_or_load('describe', 'a', None, loader('x')) == 'a'
+    assert loads == ['a', 'a-cpu', 'a-cpu-2']
+
+    cache.get_or_load('describe', 'b', None, loader('b'))
+    cache.get_or_load('describe', 'a', None, loader('x'))
+    cache.get_or_load('describe', 'c', None, loader('c'))
+    # Least recently used was a's metrics entry.
+    assert len(cache) == 3 and cache.evictions == 1
+    assert cache.get_or_load('describe', 'b', None, loader('x')) == 'b'
+
+    stats = cache.stats()
+    assert stats['kinds']['describe'] == {'hits': 3, 'misses': 3, 'hit_rate': 0.5}
+    assert stats['kinds']['metrics']['misses'] == 2
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_load('describe', 'd', None, lambda: (_ for _ in ()).throw(RuntimeError('down')))
+    assert cache.get_or_load('describe', 'd', None, loader('d')) == 'd'
+
+
+def test_client_reads_through_and_invalidates_on_update():
+    client = _client(ReadCache())
+    transport = client.client
+
+    for _ in range(3):
+        client.describe_pod('web-1')
+        client.query_metrics('web-1', 'memory', '24h')
+    assert transport.calls.count('mcp:k8s.describe') == 1
+    assert transport.calls.count('mcp:k8s.metrics.query') == 1
+    assert client.cache_stats()['kinds']['describe']['hit_rate'] == pytest.approx(2 / 3, abs=1e-4)
+
+    client.update_resources('web-1', {'mem_limit': '1.25Gi'})
+    client.describe_pod('web-1')
+    assert transport.calls.count('mcp:k8s.describe') == 2
+
+    # A workload update drops the cached reads of its replicas, and the reverse.
+    client.list_workloads('default')
+    client.describe_pod('Deployment/web')
+    client.describe_pod('web-2')
+    client.update_resources('Deployment/web', {'mem_limit': '1.25Gi'})
+    client.describe_pod('web-2')
+    client.describe_pod('Deployment/web')
+    client.update_resources('web-2', {'cpu_request': '200m'})
+    client.describe_pod('Deployment/web')
+    assert transport.calls.count('mcp:k8s.describe') == 7
+
+
+def test_held_update_keeps_cached_reads():
+    client = _client(ReadCache())
+    transport = client.client
+    client.describe_pod('web-1')
+    client.query_metrics('web-1', 'memory', '24h')
+
+    transport.status = 'held'
+    assert client.update_resources('web-1', {'cpu_request': '200m'}) == {'status': 'held'}
+    client.describe_pod('web-1')
+    client.query_metrics('web-1', 'memory', '24h')
+
+    assert transport.calls.count('mcp:k8s.describe') == 1
+    assert transport.calls.count('mcp:k8s.metrics.query') == 1
+
+
+def test_invalidation_during_a_load_is_not_overwritten():
+    cache = ReadCache()
+
+    def racing_load():
+        cache.invalidate('a')
+        return 'stale'
+
+    assert cache.get_or_load('describe', 'a', None, racing_load) == 'stale'
+    assert cache.get_or_load('describe', 'a', None, lambda: 'fresh') == 'fresh'
+
+
+def test_cache_can_be_disabled(monkeypatch):
+    monkeypatch.setenv('K8S_BALANCER_CACHE_SIZE', '0')
+    assert ReadCache.from_env() is None
+    monkeypatch.setenv('K8S_BALANCER_CACHE_SIZE', '50')
+    monkeypatch.setenv('K8S_BALANCER_CACHE_TTL_METRICS', '5')
+    cache = ReadCache.from_env()
+    assert cache.max_entries == 50 and cache.ttls == {'describe': 300.0, 'metrics': 5.0}
+
+    client = _client(None)
+    client.describe_pod('web-1')
+    client.describe_pod('web-1')
+    assert client.client.calls.count('mcp:k8s.describe') == 2
+    assert client.cache_stats() is None
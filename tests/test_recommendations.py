@@ -0,0 +1,90 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from k8s_balancer.core.decision_engine import evaluate_pod
+from k8s_balancer.core.recommendations import RightSizer, as_update, recommend_namespace
+from k8s_balancer.core.remediation import plan_namespace, plan_remediation
+from k8s_balancer.mcp.server import default_fixtures
+
+
+def _snapshot(cpu_p95, mem_p95, mem_p99=None, oom=0, name='api'):
+    memory = {'avg': mem_p95 - 5, 'p95': mem_p95}
+    if mem_p99 is not None:
+        memory['p99'] = mem_p99
+    return {
+        'name': name,
+        'metrics': {'cpu': {'avg': cpu_p95 - 5, 'p95': cpu_p95}, 'memory': memory, 'oom_kills': {'avg': oom, 'p95': oom}},
+        'description': {'cpu_request': '800m', 'cpu_limit': '1', 'mem_request': '1Gi', 'mem_limit': '2Gi'},
+    }
+
+
+def test_targets_come_from_percentiles_plus_headroom():
+    recommendation = RightSizer().recommend(_snapshot(cpu_p95=20, mem_p95=10, mem_p99=20))
+    # 200m * 1.15 -> 230m; 204.8Mi * 1.15 -> 240Mi; 409.6Mi * 1.25 -> 512Mi, on 16Mi steps.
+    assert recommendation['changes'] == {'cpu_request': '230m', 'mem_request': '240Mi', 'mem_limit': '512Mi'}
+    assert as_update(recommendation) == {'pod': 'api', 'cpu_request': '230m', 'mem_request': '240Mi', 'mem_limit': '512Mi'}
+    assert recommendation['capped'] == []
+
+    # Within min_change of the current values nothing is recommended.
+    assert RightSizer().recommend(_snapshot(cpu_p95=70, mem_p95=45, mem_p99=80)) is None
+
+
+def test_missing_percentiles_leave_the_field_alone():
+    snapshot = _snapshot(cpu_p95=20, mem_p95=10)
+    snapshot['metrics']['memory'] = {'avg': 50}
+    recommendation = RightSizer().recommend(snapshot)
+    # Only the CPU request has a percentile to size from.
+    assert recommendation['changes'] == {'cpu_request': '230m'}
+
+
+def test_capped_mode_converges_in_two_cycles():
+    sizer = RightSizer(max_change=0.5)
+    snapshot = _snapshot(cpu_p95=20, mem_p95=10, mem_p99=20)
+    first = sizer.recommend(snapshot)
+    assert first['changes'] == {'cpu_request': '400m', 'mem_request': '512Mi', 'mem_limit': '1Gi'}
+    assert set(first['capped']) == {'cpu_request', 'mem_request', 'mem_limit'}
+    assert first['target'] == {'cpu_request': '230m', 'mem_request': '240Mi', 'mem_limit': '512Mi'}
+
+    # Usage is unchanged in absolute terms, so the percentages grow as the limit shrinks.
+    snapshot['description'].update(first['changes'])
+    snapshot['metrics']['memory'].update({'p95': 20, 'p99': 40})
+    second = sizer.recommend(snapshot)
+    assert second['changes'] == {'cpu_request': '230m', 'mem_request': '256Mi', 'mem_limit': '512Mi'}
+    assert second['capped'] == ['mem_request']
+
+    # CPU limits stay put; 256Mi is within min_change of the 240Mi target: converged.
+    snapshot['description'].update(second['changes'])
+    snapshot['metrics']['memory'].update({'p95': 40, 'p99': 80})
+    assert sizer.recommend(snapshot) is None
+
+
+def test_oom_killed_pods_never_get_a_smaller_limit():
+    recommendation = RightSizer().recommend(_snapshot(cpu_p95=50, mem_p95=70, oom=4))
+    assert recommendation['changes']['mem_limit'] == '2.5Gi'
+    # Requests never exceed the limit in force.
+    recommendation = RightSizer(memory_headroom=1.0).recommend(_snapshot(cpu_p95=95, mem_p95=90))
+    assert recommendation['changes']['cpu_request'] == '1'
+    assert recommendation['changes']['mem_request'] == recommendation['changes']['mem_limit']
+
+
+def test_playbook_uses_percentile_targets_in_the_decision_direction():
+    fixtures = default_fixtures()
+    recommendations = {item['pod']: item for item in recommend_namespace(fixtures, 'default')}
+    assert set(recommendations) == {'checkout-service', 'idle-service', 'recommendation-service', 'auth-service'}
+
+    updates = {update['pod']: update for update in plan_namespace(fixtures, 'default', sizer=RightSizer())}
+    # The idle pod jumps straight to its p95-based requests instead of -20%.
+    assert updates['idle-service'] == {'pod': 'idle-service', 'cpu_request': '110m', 'mem_request': '224Mi'}
+    assert updates['checkout-service'] == {'pod': 'checkout-service', 'mem_limit': '1.25Gi'}
+
+    stepped = {update['pod']: update for update in plan_namespace(fixtures, 'default')}
+    assert stepped['idle-service'] == {'pod': 'idle-service', 'cpu_request': '320m', 'mem_request': '410Mi'}
+
+    # A sizer that would grow requests of an idle pod plans nothing for it.
+    snapshot = _snapshot(cpu_p95=95, mem_p95=90)
+    decision = dict(evaluate_pod(snapshot), recommended_action='decrease_requests')
+    assert plan_remediation(decision, snapshot['description'], sizer=RightSizer(), metrics=snapshot['metrics']) is None
@@ -0,0 +1,123 @@
+import contextlib
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from k8s_balancer.agent.event_remediator import EventDrivenRemediator
+from k8s_balancer.core.decision_engine import evaluate_pod, pod_snapshots_from_fixtures
+from k8s_balancer.core.fixture_format import load_binary_fixtures, write_binary_fixtures
+from k8s_balancer.core.quantity import format_cpu, format_memory, parse_cpu, parse_memory
+from k8s_balancer.core.remediation import plan_remediation
+from k8s_balancer.mcp.server import BalancerTools, default_fixtures, due_events
+
+
+def test_quantities_round_trip():
+    assert parse_cpu('250m') == 250
+    assert parse_cpu('1.5') == 1500
+    assert parse_memory('1Gi') == 1024
+    assert parse_memory('512Mi') == 512
+    assert parse_memory('bogus') is None
+    assert format_cpu(2000) == '2'
+    assert format_cpu(199.2) == '200m'
+    assert format_memory(1280) == '1.25Gi'
+    assert format_memory(409.6) == '410Mi'
+
+
+def test_playbook_matches_engine_actions():
+    fixtures = default_fixtures()
+    plans = {}
+    for snapshot in pod_snapshots_from_fixtures(fixtures, 'default'):
+        plans[snapshot['name']] = plan_remediation(evaluate_pod(snapshot), snapshot['description'])
+
+    assert plans['checkout-service'] == ('k8s_update_resources', {'pod': 'checkout-service', 'mem_limit': '1.25Gi'})
+    assert plans['auth-service'] is None
+    tool, arguments = plans['idle-service']
+    assert tool == 'k8s_update_resources'
+    assert set(arguments) > {'pod'}
+    tool, arguments = plans['recommendation-service']
+    assert tool == 'jira_create_issue'
+    assert 'recommendation-service' in arguments['title']
+
+
+def test_due_events_respects_offsets_namespace_and_metric_overrides(tmp_path):
+    fixtures = default_fixtures()
+    fixtures['events'] = [
+        {'at': 0, 'type': 'OOMKilled', 'pod': 'auth-service', 'metrics': {'oom_kills': {'avg': 5, 'p95': 5}}},
+        {'at': 0, 'type': 'Restart', 'pod': 'other', 'namespace': 'staging'},
+        {'at': 30, 'type': 'Evicted', 'pod': 'idle-service'},
+    ]
+    path = tmp_path / 'fixtures.k8sfix'
+    write_binary_fixtures(fixtures, str(path))
+    mapped = load_binary_fixtures(str(path))
+
+    first = due_events(mapped, 'default', 0, elapsed=1)
+    assert [event['pod'] for event in first['events']] == ['auth-service']
+    assert first['cursor'] == 2
+    assert mapped['metrics'][('auth-service', 'oom_kills', '24h')] == {'avg': 5, 'p95': 5}
+
+    assert due_events(mapped, 'default', first['cursor'], elapsed=1)['events'] == []
+    later = due_events(mapped, 'default', first['cursor'], elapsed=31)
+    assert [event['type'] for event in later['events']] == ['Evicted']
+    assert later['cursor'] == 3
+
+
+TOOL_METHODS = {
+    'k8s_triage_namespace': 'triage',
+    'k8s_watch_events': 'watch_events',
+    'k8s_describe_pod': 'describe',
+    'k8s_query_metrics': 'query_metrics',
+    'k8s_update_resources': 'update_resources',
+    'jira_create_issue': 'create_issue',
+    'slack_post_message': 'post_message',
+}
+
+
+def test_remediator_loop_sweeps_then_fixes_each_event_burst_once(monkeypatch):
+    fixtures = default_fixtures()
+    fixtures['events'] = [
+        {'at': 0, 'type': 'OOMKilled', 'pod': 'checkout-service'},
+        {'at': 0.05, 'type': 'OOMKilled', 'pod': 'checkout-service'},
+        {'at': 0.05, 'type': 'Scheduled', 'pod': 'idle-service'},
+        {'at': 0.05, 'type': 'Restart', 'pod': 'idle-service'},
+    ]
+    tools = BalancerTools(fixtures)
+
+    class Session:
+        def __init__(self, client_config):
+            self.client_config = client_config
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc_info):
+            return None
+
+        async def call(self, tool, **arguments):
+            return await getattr(tools, TOOL_METHODS[tool])(**arguments)
+
+    class Runner:
+        @contextlib.contextmanager
+        def server_environment(self):
+            yield {'mcpServers': {'test': {}}}, None
+
+        def _read_state(self, state_path):
+            return {'updates': list(fixtures['updates'])}
+
+    monkeypatch.setattr('k8s_balancer.mcp.tool_session.ToolSession', Session)
+    remediator = EventDrivenRemediator(Runner(), 'default', '#ops', poll_interval=0.01, sweep_interval=3600)
+    report = remediator.run(duration=5, max_events=4)
+
+    # One sweep at start, then one fix per target: the second OOM kill a poll later
+    # is recorded but not remediated again before the next sweep.
+    assert len(report['sweeps']) == 1
+    assert sorted(applied['pod'] for applied in report['sweeps'][0]['applied']) == [
+        'checkout-service', 'idle-service', 'recommendation-service',
+    ]
+    assert [event['seq'] for event in report['events']] == [1, 2, 3, 4]
+    assert [(item['target'], item['event']) for item in report['remediations']] == [
+        ('checkout-service', 'OOMKilled'), ('idle-service', 'Restart'),
+    ]
+    assert len(report['state']['updates']) == 4
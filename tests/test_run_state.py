@@ -0,0 +1,57 @@
+import gc
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from k8s_balancer.agent.agent_runner import MCPToolAgentRunner
+from k8s_balancer.core.run_state import RunState, resources_path
+from k8s_balancer.mcp.server import BalancerTools, default_fixtures
+
+
+def _server_state(tmp_path):
+    state_file = tmp_path / 'state.json'
+    tools = BalancerTools(default_fixtures(), state_file=str(state_file))
+    tools.persist()
+    return state_file
+
+
+def test_state_file_holds_actions_and_sidecar_holds_resources(tmp_path):
+    state_file = _server_state(tmp_path)
+    state = RunState.from_files(str(state_file), resources_path(str(state_file)))
+
+    assert state['updates'] == []
+    assert not state.loaded
+    assert 'metrics' in state and not state.loaded
+    assert state.actions().keys() == {'pods', 'updates', 'slack_messages', 'jira_issues'}
+
+    assert state['descriptions']['auth-service']['mem_limit'] == '1Gi'
+    assert state.loaded
+    assert any(entry['pod'] == 'auth-service' for entry in state['metrics'])
+
+
+def test_runner_keeps_resources_until_result_is_dropped(tmp_path):
+    state_file = _server_state(tmp_path)
+    runner = MCPToolAgentRunner(None, client_config={'mcpServers': {'test': {}}}, fixtures=default_fixtures(), cassette=None)
+
+    state = runner._read_state(str(state_file))
+    sidecar = state.resources
+
+    assert not Path(resources_path(str(state_file))).exists()
+    assert Path(sidecar).exists()
+    del state
+    gc.collect()
+    assert not Path(sidecar).exists()
+
+
+def test_result_is_built_without_loading_metrics(tmp_path):
+    state_file = _server_state(tmp_path)
+    runner = MCPToolAgentRunner(None, client_config={'mcpServers': {'test': {}}}, fixtures=default_fixtures(), cassette=None)
+    state = runner._read_state(str(state_file))
+
+    result = runner._result_from_state('default', state)
+
+    assert result.summary['pods_scanned'] == 4
+    assert not result.state.loaded
@@ -0,0 +1,43 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from k8s_balancer.mcp.server import BalancerTools, default_fixtures
+
+
+def test_concurrent_writes_are_all_persisted(tmp_path):
+    state_file = tmp_path / 'state.json'
+    tools = BalancerTools(default_fixtures(), state_file=str(state_file))
+
+    async def scenario():
+        writes = [tools.update_resources('auth-service', mem_limit='%dMi' % index) for index in range(40)]
+        writes += [tools.post_message('#ops', 'message %d' % index) for index in range(20)]
+        reads = [tools.query_metrics('auth-service', 'cpu', '24h') for _ in range(40)]
+        return await asyncio.gather(*writes, *reads)
+
+    results = asyncio.run(scenario())
+
+    assert results[-1] == {'avg': 42, 'p95': 55}
+    state = json.loads(state_file.read_text())
+    assert sorted(update['mem_limit'] for update in state['updates']) == sorted('%dMi' % index for index in range(40))
+    assert len(state['slack_messages']) == 20
+    assert not list(tmp_path.glob('*.tmp'))
+
+
+def test_readers_keep_a_consistent_snapshot():
+    tools = BalancerTools(default_fixtures())
+
+    async def scenario():
+        before = tools.fixtures['updates']
+        await tools.update_resources('idle-service', cpu_request='100m')
+        return before, tools.fixtures['updates']
+
+    before, after = asyncio.run(scenario())
+
+    assert before == []
+    assert [update['pod'] for update in after] == ['idle-service']
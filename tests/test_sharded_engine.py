@@ -0,0 +1,25 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from benchmarks.synthetic import synthetic_snapshots
+from k8s_balancer.core.decision_engine import evaluate_pod
+from k8s_balancer.core.sharded_engine import classify_sharded
+
+
+def test_sharded_matches_serial_rules_in_pod_order():
+    snapshots = synthetic_snapshots(2000, seed=11)
+    # Fractional memory readings exercise the percent-of-limit conversion.
+    snapshots[0]['metrics']['memory'] = {'avg': 0.95, 'p95': 0.99}
+    expected = [evaluate_pod(snapshot) for snapshot in snapshots]
+
+    decisions = classify_sharded(snapshots, workers=2, min_pods_per_worker=1)
+
+    assert decisions == expected
+
+
+def test_sharded_handles_empty_input():
+    assert classify_sharded([], workers=4) == []
@@ -0,0 +1,188 @@
+import asyncio
+import json
+import sys
+from types import SimpleNamespace
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from k8s_balancer.agent.agent_runner import MCPToolAgentRunner
+from k8s_balancer.core.run_state import RunState
+from k8s_balancer.core.slack_renderer import HEADER, post_messages, render_messages, summarize_outcome
+from k8s_balancer.core.summary_builder import SummaryBuilder
+from k8s_balancer.mcp.server import BalancerTools, default_fixtures
+
+
+def _payload(message):
+    return json.loads(message.split('```')[1][len('json'):])
+
+
+def _large_outcome(rebalanced=300, escalated=40, skipped=4660):
+    return {
+        'namespace': 'default',
+        'pods_scanned': rebalanced + escalated + skipped,
+        'pods_rebalanced': [
+            {'name': 'svc-%04d' % index, 'cpu_limit': '600m', 'mem_limit': '1.25Gi'} for index in range(rebalanced)
+        ],
+        'pods_escalated': [{'name': 'bad-%03d' % index, 'reason': 'inconsistent metrics'} for index in range(escalated)],
+        'pods_skipped': [
+            {'name': 'ok-%05d' % index, 'reason': 'healthy' if index % 10 else 'cooldown'} for index in range(skipped)
+        ],
+    }
+
+
+def test_small_namespace_keeps_documented_shape():
+    outcome = {
+        'namespace': 'default',
+        'pods_scanned': 3,
+        'pods_rebalanced': [{'name': 'checkout-service', 'cpu_limit': '600m', 'mem_limit': '1.2Gi'}],
+        'pods_escalated': [{'name': 'recommendation-service', 'reason': 'inconsistent metrics'}],
+        'pods_skipped': [{'name': 'auth-service', 'reason': 'healthy'}],
+    }
+    issues = [{'url': 'https://jira.test/browse/TEST-1'}]
+    messages = render_messages(summarize_outcome(outcome), issues)
+
+    assert len(messages) == 1
+    assert messages[0].startswith(HEADER + '\n```json\n')
+    assert messages[0].endswith('```\nhttps://jira.test/browse/TEST-1')
+    assert _payload(messages[0]) == outcome
+
+
+def test_large_namespace_collapses_and_chunks():
+    summary = summarize_outcome(_large_outcome())
+    assert summary['pods_skipped'] == [{'reason': 'healthy', 'count': 4194}, {'reason': 'cooldown', 'count': 466}]
+    assert summary['counts'] == {'pods_rebalanced': 300, 'pods_escalated': 40, 'pods_skipped': 4660}
+
+    messages = render_messages(summary, max_chars=3000)
+    assert len(messages) > 1
+    assert all(len(message) <= 3000 for message in messages)
+
+    head = _payload(messages[0])
+    rebalanced = list(head['pods_rebalanced'])
+    escalated = list(head['pods_escalated'])
+    for message in messages[1:]:
+        entries = _payload(message)
+        if message.startswith('↳ pods_rebalanced'):
+            rebalanced.extend(entries)
+        elif message.startswith('↳ pods_escalated'):
+            escalated.extend(entries)
+    assert rebalanced == summary['pods_rebalanced']
+    assert escalated == summary['pods_escalated']
+
+
+def test_truncated_head_reports_totals():
+    outcome = _large_outcome(rebalanced=200, escalated=0, skipped=3)
+    summary = summarize_outcome(outcome)
+    assert 'counts' not in summary
+
+    messages = render_messages(summary, max_chars=2000)
+    assert _payload(messages[0])['counts']['pods_rebalanced'] == 200
+
+
+def test_narrative_is_optional_and_sees_only_counts():
+    outcome = _large_outcome()
+    assert SummaryBuilder().render(outcome, narrative=True) == render_messages(summarize_outcome(outcome))
+
+    seen = []
+
+    class Sequence:
+        def invoke(self, inputs):
+            seen.append(json.loads(inputs['summary_counts']))
+            return SimpleNamespace(content='Most pods were healthy.\nignored second line')
+
+    builder = SummaryBuilder()
+    builder.llm = object()
+    builder._compile = lambda: (Sequence(), 'v1')
+    messages = builder.render(outcome, narrative=True)
+
+    assert messages[0].startswith(HEADER + '\nMost pods were healthy.\n```json\n')
+    assert seen == [{
+        'namespace': 'default', 'pods_scanned': 5000,
+        'pods_rebalanced': 300, 'pods_escalated': 40, 'pods_skipped': 4660,
+    }]
+    assert builder.render(outcome) == render_messages(summarize_outcome(outcome))
+
+
+def test_follow_ups_are_threaded_under_head():
+    tools = BalancerTools(default_fixtures())
+
+    class Session:
+        async def call(self, tool, **arguments):
+            assert tool == 'slack_post_message'
+            return await tools.post_message(**arguments)
+
+    messages = render_messages(summarize_outcome(_large_outcome(rebalanced=100, skipped=0)))
+    responses = asyncio.run(post_messages(Session(), '#ops', messages))
+
+    posted = tools.fixtures['slack_messages']
+    assert len(posted) == len(messages) > 1
+    assert posted[0]['thread_ts'] is None
+    assert all(entry['thread_ts'] == responses[0]['ts'] for entry in posted[1:])
+    assert len({response['ts'] for response in responses}) == len(responses)
+
+
+def test_slack_ts_survives_a_trimmed_message_log():
+    tools = BalancerTools(default_fixtures())
+    first = asyncio.run(tools.post_message('#ops', 'first'))
+    second = asyncio.run(tools.post_message('#ops', 'second'))
+    del tools.fixtures['slack_messages'][0]
+
+    reply = asyncio.run(tools.post_message('#ops', 'reply', thread_ts=second['ts']))
+
+    assert int(first['ts']) < int(second['ts']) < int(reply['ts'])
+    assert [entry['ts'] for entry in tools.fixtures['slack_messages']] == [second['ts'], reply['ts']]
+
+
+def test_server_threads_an_over_size_summary_posted_by_the_agent():
+    tools = BalancerTools(default_fixtures())
+    summary = summarize_outcome(_large_outcome(rebalanced=100, skipped=0))
+    text = '%s\n```json\n%s\n```' % (HEADER, json.dumps(summary, indent=2))
+
+    response = asyncio.run(tools.post_message('#ops', text))
+
+    posted = tools.fixtures['slack_messages']
+    assert response['follow_ups'] == len(posted) - 1 > 0
+    assert all(len(entry['text']) <= 3000 for entry in posted)
+    assert all(entry['thread_ts'] == response['ts'] for entry in posted[1:])
+
+    runner = MCPToolAgentRunner(None, client_config={'mcpServers': {'test': {}}}, cassette=None)
+    result = runner._result_from_state('default', RunState({'pods': {}, 'slack_messages': posted}))
+    assert result.slack_message == posted[0]['text']
+    assert result.slack_follow_ups == [entry['text'] for entry in posted[1:]]
+    assert len(result.summary['pods_rebalanced']) < 100 and result.summary['counts']['pods_rebalanced'] == 100
+
+
+def test_runner_posts_the_rendered_summary_when_the_agent_summary_is_unusable(tmp_path):
+    state_file = str(tmp_path / 'state.json')
+    fixtures = default_fixtures()
+    tools = BalancerTools(fixtures, state_file=state_file)
+
+    class Connector:
+        async def call_tool(self, name, arguments):
+            assert name == 'slack_post_message'
+            payload = await tools.post_message(**arguments)
+            return SimpleNamespace(content=[SimpleNamespace(text=json.dumps(payload))], isError=False)
+
+    class Client:
+        def get_all_active_sessions(self):
+            return {'test': SimpleNamespace(connector=Connector())}
+
+    async def run():
+        for index in range(120):
+            await tools.update_resources('svc-%03d' % index, mem_limit='1.25Gi')
+        await tools.post_message('#ops', 'Done, rebalanced a lot of pods.')
+        config = {'mcpServers': {'test': {'env': {'K8S_BALANCER_STATE_FILE': state_file}}}}
+        return await runner._post_rendered_summary(Client(), config, 'default', '#ops')
+
+    runner = MCPToolAgentRunner(None, client_config={'mcpServers': {'test': {}}}, cassette=None, fixtures=fixtures)
+    responses = asyncio.run(run())
+
+    posted = fixtures['slack_messages']
+    assert len(responses) == len(posted) - 1 > 2
+    assert posted[1]['thread_ts'] is None
+    assert all(entry['thread_ts'] == responses[0]['ts'] for entry in posted[2:])
+    result = runner._result_from_state('default', RunState.from_files(state_file))
+    assert result.summary['counts']['pods_rebalanced'] == 120
+    assert len(result.slack_follow_ups) == len(posted) - 2
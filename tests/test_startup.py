@@ -0,0 +1,41 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from benchmarks.bench_startup import (
+    DRY_RUN_BUDGET_SECONDS,
+    IMPORT_BUDGET_SECONDS,
+    dry_run_modules,
+    measure_dry_run,
+    measure_import,
+)
+
+# Budgets are medians of several fresh interpreters, so one slow start on a loaded
+# host does not fail the run; raise K8S_BALANCER_IMPORT_BUDGET /
+# K8S_BALANCER_DRY_RUN_BUDGET on hosts slower than that.
+
+
+@pytest.mark.parametrize('module', [
+    'k8s_balancer.runner',
+    'k8s_balancer.integrations.k8s_client',
+    'k8s_balancer.integrations.slack_client',
+])
+def test_import_skips_heavy_dependencies(module):
+    assert measure_import(module, repeat=1)['heavy_modules'] == []
+
+
+def test_dry_run_skips_heavy_dependencies():
+    assert dry_run_modules() == []
+
+
+def test_import_stays_within_budget():
+    assert measure_import('k8s_balancer.runner')['median_seconds'] < IMPORT_BUDGET_SECONDS
+
+
+def test_dry_run_stays_within_budget():
+    assert measure_dry_run()['median_seconds'] < DRY_RUN_BUDGET_SECONDS
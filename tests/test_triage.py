@@ -0,0 +1,66 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from k8s_balancer.core.decision_engine import evaluate_pod, pod_snapshots_from_fixtures
+from k8s_balancer.core.triage_queue import deferred_entries, severity_score
+from k8s_balancer.mcp.server import default_fixtures, triage_namespace
+
+
+def test_triage_returns_only_actionable_pods():
+    fixtures = default_fixtures()
+    fixtures['pods']['default'].append('new-service')
+
+    result = triage_namespace(fixtures, 'default')
+
+    assert result['pods_scanned'] == 5
+    assert result['healthy_count'] == 1
+    assert result['pods_without_metrics'] == ['new-service']
+    by_pod = {entry['pod']: entry for entry in result['actionable']}
+    assert set(by_pod) == {'checkout-service', 'idle-service', 'recommendation-service'}
+    assert by_pod['checkout-service']['resources']['mem_limit'] == '1Gi'
+    assert by_pod['checkout-service']['metrics']['oom_kills'] == {'avg': 4, 'p95': 4}
+    for snapshot in pod_snapshots_from_fixtures(fixtures, 'default')[:4]:
+        expected = evaluate_pod(snapshot)
+        if expected['classification'] != 'healthy':
+            assert by_pod[snapshot['name']]['recommended_action'] == expected['recommended_action']
+
+
+def test_triage_unknown_namespace_is_empty():
+    result = triage_namespace(default_fixtures(), 'missing')
+    assert result['pods_scanned'] == 0
+    assert result['actionable'] == []
+
+
+def test_queue_orders_by_severity_and_defers_past_budget():
+    fixtures = default_fixtures()
+
+    result = triage_namespace(fixtures, 'default', max_pods=2)
+
+    assert [entry['pod'] for entry in result['actionable']] == ['checkout-service', 'recommendation-service']
+    assert result['deferred'] == ['idle-service']
+
+
+def test_previously_deferred_pods_go_first():
+    result = triage_namespace(default_fixtures(), 'default', priority_pods=['idle-service'])
+    assert [entry['pod'] for entry in result['actionable']][0] == 'idle-service'
+
+
+def test_severity_counts_oom_memory_and_spread():
+    assert severity_score({'oom_kills': {'avg': 4}, 'memory': {'avg': 95, 'p95': 98}}) > severity_score(
+        {'memory': {'avg': 15, 'p95': 93}, 'cpu': {'avg': 18, 'p95': 92}}
+    )
+    # Fractional memory readings are scaled against the limit.
+    assert severity_score({'memory': {'avg': 0.5}}, {'mem_limit': '1Mi'}) == severity_score({'memory': {'avg': 50}})
+
+
+def test_unacted_actionable_pods_are_deferred():
+    fixtures = default_fixtures()
+    state = {'updates': [{'pod': 'checkout-service'}], 'jira_issues': []}
+
+    deferred = deferred_entries(fixtures, state, 'default')
+
+    assert [entry['name'] for entry in deferred] == ['recommendation-service', 'idle-service']
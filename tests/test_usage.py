@@ -0,0 +1,73 @@
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from k8s_balancer.core.usage import (
+    BudgetExceeded,
+    UsageTracker,
+    _token_usage,
+    budget_exhausted,
+    current_tracker,
+    usage_scope,
+)
+
+
+def test_records_roll_up_per_pod_and_component():
+    tracker = UsageTracker(run_id='run-1')
+    with tracker.activate():
+        with usage_scope('decision_engine', pod='checkout-service'):
+            tracker.record('gpt-4o-mini', 1000, 200, 0.5)
+        with usage_scope('summary_builder'):
+            tracker.record('gpt-4o-mini-2024-07-18', 500, 100, 0.25)
+        tracker.record('gpt-4o-mini', 2000, 300, 1.0)
+    assert current_tracker() is None
+
+    totals = tracker.totals()
+    assert totals['calls'] == 3
+    assert totals['total_tokens'] == 4100
+    assert totals['cost_usd'] == pytest.approx((3500 * 0.15 + 600 * 0.60) / 1_000_000)
+    assert set(tracker.by_component()) == {'agent', 'decision_engine', 'summary_builder'}
+    by_pod = tracker.by_pod()
+    assert by_pod['checkout-service']['total_tokens'] == 1200
+    assert by_pod['(run)']['calls'] == 2
+
+
+def test_budget_exhaustion_is_visible_in_context():
+    tracker = UsageTracker(max_tokens=1000)
+    with tracker.activate():
+        assert not budget_exhausted()
+        tracker.record('gpt-4o', 900, 150, 0.1)
+        assert budget_exhausted()
+        with pytest.raises(BudgetExceeded):
+            tracker.check()
+    assert not budget_exhausted()
+    assert tracker.summary()['budget'] == {'max_tokens': 1000, 'max_cost': None, 'exhausted': True}
+
+
+def test_export_appends_json_lines(tmp_path):
+    tracker = UsageTracker(run_id='run-2')
+    tracker.record('gpt-4.1', 10, 5, 0.01, component='agent')
+    path = tmp_path / 'usage.jsonl'
+    tracker.export(str(path))
+    tracker.export(str(path))
+    rows = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(rows) == 2
+    assert rows[0]['run_id'] == 'run-2' and rows[0]['model'] == 'gpt-4.1'
+
+
+def test_token_usage_reads_openai_and_message_metadata():
+    openai_style = SimpleNamespace(
+        llm_output={'token_usage': {'prompt_tokens': 12, 'completion_tokens': 3}, 'model_name': 'gpt-4o'},
+        generations=[],
+    )
+    assert _token_usage(openai_style) == ('gpt-4o', 12, 3)
+    message = SimpleNamespace(usage_metadata={'input_tokens': 7, 'output_tokens': 2}, response_metadata={'model_name': 'gpt-4.1-mini'})
+    metadata_style = SimpleNamespace(llm_output=None, generations=[[SimpleNamespace(message=message)]])
+    assert _token_usage(metadata_style) == ('gpt-4.1-mini', 7, 2)
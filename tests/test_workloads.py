@@ -0,0 +1,80 @@
+import asyncio
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from k8s_balancer.core.triage_queue import acted_on_pods, triage_namespace
+from k8s_balancer.core.workloads import group_workloads, owner_of
+from k8s_balancer.mcp.server import BalancerTools, default_fixtures
+
+
+REPLICA_SET = [{'kind': 'ReplicaSet', 'name': 'checkout-7d9f8b6c4', 'controller': True}]
+
+
+def _replicated_fixtures():
+    fixtures = default_fixtures()
+    template = {'cpu_request': '500m', 'cpu_limit': '750m', 'mem_request': '512Mi', 'mem_limit': '1Gi'}
+    replicas = ['checkout-7d9f8b6c4-%s' % suffix for suffix in ('x2k9z', 'b7wq4', 'mm5rd')]
+    fixtures['pods']['default'] = replicas + ['auth-service']
+    for index, pod in enumerate(replicas):
+        fixtures['descriptions'][pod] = dict(template, owner_references=REPLICA_SET)
+        hot = index == 1
+        fixtures['metrics'][(pod, 'cpu', '24h')] = {'avg': 30 + index * 10, 'p95': 50}
+        fixtures['metrics'][(pod, 'memory', '24h')] = {'avg': 95 if hot else 40, 'p95': 98 if hot else 55}
+        fixtures['metrics'][(pod, 'oom_kills', '24h')] = {'avg': 0, 'p95': 0}
+    return fixtures, replicas
+
+
+def test_owner_references_fold_replica_sets_into_deployments():
+    assert owner_of('checkout-7d9f8b6c4-x2k9z', {'owner_references': REPLICA_SET}) == ('Deployment', 'checkout')
+    assert owner_of('db-0', {'owner_references': [{'kind': 'StatefulSet', 'name': 'db'}]}) == ('StatefulSet', 'db')
+    assert owner_of('job-pod', {'owner_references': [{'kind': 'ReplicaSet', 'name': 'manual-rs'}]}) == ('ReplicaSet', 'manual-rs')
+    assert owner_of('auth-service', {}) == ('Pod', 'auth-service')
+
+    fixtures, replicas = _replicated_fixtures()
+    groups = group_workloads(fixtures['pods']['default'], fixtures['descriptions'])
+    assert groups == {'Deployment/checkout': replicas, 'auth-service': ['auth-service']}
+
+
+def test_triage_decides_once_per_workload():
+    fixtures, replicas = _replicated_fixtures()
+    per_pod = triage_namespace(fixtures, 'default')
+    per_workload = triage_namespace(fixtures, 'default', by_workload=True)
+
+    assert [entry['pod'] for entry in per_pod['actionable']] == [replicas[1]]
+    assert per_workload['pods_scanned'] == 4
+    assert per_workload['workloads_scanned'] == 2
+    [entry] = per_workload['actionable']
+    assert entry['pod'] == 'Deployment/checkout'
+    assert entry['replicas'] == replicas
+    assert entry['recommended_action'] == 'increase_memory_limit'
+    # CPU averages pool across replicas, memory keeps the hottest replica.
+    assert entry['metrics']['cpu']['avg'] == 40
+    assert entry['metrics']['memory'] == {'avg': 95, 'p95': 98}
+
+
+def test_server_reads_and_updates_whole_workloads():
+    fixtures, replicas = _replicated_fixtures()
+    tools = BalancerTools(fixtures)
+
+    async def scenario():
+        listed = await tools.list_workloads('default')
+        memory = await tools.query_metrics('Deployment/checkout', 'memory', '24h')
+        description = await tools.describe('Deployment/checkout')
+        await tools.update_resources('Deployment/checkout', mem_limit='1.25Gi')
+        return listed, memory, description
+
+    listed, memory, description = asyncio.run(scenario())
+    assert [(item['workload'], item['replicas']) for item in listed['items']] == [
+        ('Deployment/checkout', 3), ('auth-service', 1),
+    ]
+    assert memory == {'avg': 95, 'p95': 98}
+    assert description['mem_limit'] == '1Gi' and description['replicas'] == 3
+
+    [update] = fixtures['updates']
+    assert update['pod'] == 'Deployment/checkout'
+    assert update['pods'] == replicas
+    assert acted_on_pods(fixtures, fixtures['pods']['default']) >= set(replicas)